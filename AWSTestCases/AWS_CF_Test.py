@@ -1,11 +1,20 @@
 # Standard library modules
+import os
+import sys
 
+# Running this file directly puts AWSTestCases/ on sys.path instead of the repo root;
+# imported as AWSTestCases.AWS_CF_Test, sys.path is left alone.
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Third-party modules
 import boto3
 import json
 from botocore.exceptions import ClientError
 
+from iac_test_framework.validators.aws_client import get_client_pool
+from iac_test_framework.validators.waiters import wait_for_stack
+
 AWS_REGION = "us-west-1"
 
 SG_STACK_NAME = "simple-sg-stack"
@@ -77,9 +86,9 @@ Outputs:
 class CFClient:
     def __init__(self, AWS_REGION):
         self.AWS_REGION = AWS_REGION
-        self.client = boto3.client('cloudformation', region_name=self.AWS_REGION)
-        self.s3Client = boto3.client('s3', region_name=self.AWS_REGION)
-        self.ec2Client = boto3.client('ec2', region_name=self.AWS_REGION)
+        self.client = get_client_pool().client('cloudformation', region_name=self.AWS_REGION)
+        self.s3Client = get_client_pool().client('s3', region_name=self.AWS_REGION)
+        self.ec2Client = get_client_pool().client('ec2', region_name=self.AWS_REGION)
         self.resource = boto3.resource('cloudformation', region_name=self.AWS_REGION)
 
     def create_simple_instance(self):
@@ -99,6 +108,7 @@ class CFClient:
                 "ParameterValue": "0.0.0.0/0"
             }
         ])
+        self.wait_for_stack(SG_STACK_NAME)
         response = self.client.describe_stacks()
         print("Stacks", response)
         stack_info = response["Stacks"]
@@ -133,6 +143,7 @@ class CFClient:
             StackName="linked-depends-on-test",
             TemplateBody=gTemplatex
         )
+        self.wait_for_stack("linked-depends-on-test")
 
         response = self.client.describe_stacks()
         print("Stacks", response)
@@ -145,6 +156,9 @@ class CFClient:
         ]
         print(gbucket)
 
+    def wait_for_stack(self, stack_name, status='CREATE_COMPLETE', timeout=600):
+        return wait_for_stack(self.client, stack_name, status, timeout)
+
     def getAclperm(self):
         result = self.s3Client.list_table_buckets(Bucket="test-bucket-0-us-east-1")
         print(result)
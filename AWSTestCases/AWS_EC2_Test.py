@@ -1,10 +1,20 @@
+import os
+import sys
+
 import boto3
 
+# Running this file directly puts AWSTestCases/ on sys.path instead of the repo root;
+# imported as AWSTestCases.AWS_EC2_Test, sys.path is left alone.
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iac_test_framework.validators.aws_client import get_client_pool
+
 
 class EC2Client:
     def __init__(self, AWS_REGION):
         self.AWS_REGION = AWS_REGION
-        self.client = boto3.client('ec2', region_name=self.AWS_REGION)
+        self.client = get_client_pool().client('ec2', region_name=self.AWS_REGION)
         self.resource = boto3.resource('ec2', region_name=self.AWS_REGION)
 
     def describe_instance(self, instance_id):
@@ -1,10 +1,10 @@
 import pytest
-import boto3
 
 from AWSTestCases.AWS_IAM_Test import aws_iam_check_if_policy_exist, aws_iam_check_if_role_exist
+from iac_test_framework.validators.aws_client import get_client_pool
 
 # Create IAM client
-iam = boto3.client('iam')
+iam = get_client_pool().client('iam')
 
 
 def test_aws_iam_check_if_policy_exist():
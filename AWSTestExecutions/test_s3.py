@@ -1,11 +1,11 @@
 import pytest
-import boto3
 import uuid
 from botocore.exceptions import ClientError
 from AWSTestCases.AWS_S3_Test import aws_s3_check_if_buckets_exist
+from iac_test_framework.validators.aws_client import get_client_pool
 
 # Create S3 client
-s3 = boto3.client('s3')
+s3 = get_client_pool().client('s3')
 
 
 def test_aws_s3_check_if_buckets_exist():
@@ -296,7 +296,10 @@ for key_tree, value in group_desc_matches:
     print("Path:", key_tree, "-> Value:", value)'''
 
 import yaml
-import re
+
+from iac_test_framework.validators.query import to_subscript
+from iac_test_framework.validators.template_cache import get_template_cache
+from iac_test_framework.validators.template_index import TemplateIndex
 
 
 # --- Custom Loader to handle the !Ref tag ---
@@ -315,141 +318,27 @@ CustomLoader.add_constructor('!Select', ref_constructor)
 CustomLoader.add_constructor('!Join', ref_constructor)
 
 
-# --- Helper Function 1: Find all values for a given key ---
-def find_values(target_key, data):
-    """
-    Recursively search the nested data for all values of target_key.
-    Returns a flat list of values.
-    """
-    results = []
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if key == target_key:
-                results.append(value)
-            if isinstance(value, (dict, list)):
-                results.extend(find_values(target_key, value))
-    elif isinstance(data, list):
-        for item in data:
-            results.extend(find_values(target_key, item))
-    return results
-
-
-# --- Helper Function 2: Find all paths (as lists of keys) for a given key ---
-def find_key_paths(data, target_key, current_path=None):
-    """
-    Recursively find all paths (each as a list of keys) to occurrences of target_key.
-    Returns a list of tuples (path_list, value).
-    """
-    if current_path is None:
-        current_path = []
-    matches = []
-    if isinstance(data, dict):
-        for key, value in data.items():
-            new_path = current_path + [key]
-            if key == target_key:
-                matches.append((new_path, value))
-            if isinstance(value, (dict, list)):
-                matches.extend(find_key_paths(value, target_key, new_path))
-    elif isinstance(data, list):
-        for index, item in enumerate(data):
-            new_path = current_path + [f"[{index}]"]
-            matches.extend(find_key_paths(item, target_key, new_path))
-    return matches
-
-
-# --- Helper Function 3: Reconstruct the minimal branch along a given path ---
-def build_minimal_branch(data, path_list):
-    """
-    Given the original data and a path (list of keys) that leads to the target,
-    build a minimal dictionary branch that includes:
-      - All scalar keys at the current level (to keep context),
-      - And for the key in the path, only the branch leading to the target.
-    """
-    print('************************************************************1')
-    print(data, path_list)
-    if not path_list:
-        return data
-    key = path_list[0]
-    if isinstance(data, dict) and key in data:
-        branch = {}
-        # Include all scalar keys (non-dict, non-list) at this level as context.
-        for k, v in data.items():
-            if not isinstance(v, (dict, list)):
-                branch[k] = v
-        # Recurse only for the key that is on the branch.
-        branch[key] = build_minimal_branch(data[key], path_list[1:])
-        print('**********************************************************2:', branch)
-        return branch
-
-    else:
-        return None
-
-
-def find_values_with_paths(target_key, data, path=None):
-    """
-    Recursively search for all occurrences of `target_key` in a nested data structure,
-    and return a list of tuples, each containing:
-      - The full key path as a string (with keys separated by '>').
-      - The corresponding value.
-    """
-    if path is None:
-        path = []
-    matches = []
-    if isinstance(data, dict):
-        for key, value in data.items():
-            # Append the current key to the path
-            new_path = path + [key]
-            if key == target_key or (isinstance(target_key, str) and isinstance(key, str) and target_key in key):
-                # When a match is found, join the key path and save with the value.
-                matches.append((">".join(new_path), value))
-            # Recursively search if the value is a dict or list.
-            if isinstance(value, (dict, list)):
-                matches.extend(find_values_with_paths(target_key, value, new_path))
-    elif isinstance(data, list):
-        # For lists, you might include an index in the path for clarity.
-        for index, item in enumerate(data):
-            new_path = path + [f"[{index}]"]
-            matches.extend(find_values_with_paths(target_key, item, new_path))
-    return matches
-
-
-def getconvertion(abc):
-    # Step 1: Split by '>' while keeping indexes intact
-    parts = re.split(r'>(?=\[|\w)', abc)
-
-    # Step 2: Format each part correctly
-    formatted_parts = []
-    for part in parts:
-        if re.match(r'^\[\d+\]$', part):  # If it's an index like [0]
-            formatted_parts.append(part)
-        else:  # It's a key, so wrap it in quotes
-            formatted_parts.append(f"['{part}']")
-
-    # Step 3: Join formatted parts into a single expression
-    bac = ''.join(formatted_parts)
-    return bac
-
-
 # --- Main Execution ---
 file1 = 'ec2xx.yaml'
-# Load the YAML file using the custom loader.
-with open(file1, 'r') as file:
-    yaml_data = yaml.load(file, Loader=CustomLoader)
+# Load the YAML file using the custom loader; unchanged files come from the parse cache.
+yaml_data = get_template_cache().load(file1, CustomLoader)
+# Index every key once; each lookup below only touches its own matches.
+index = TemplateIndex(yaml_data)
 
 # Requirement 1: Get all values for key "Type"
-type_values = find_values('ImageId', yaml_data)
+type_values = index.values('ImageId')
 print("Values for key 'Type':", type_values)
 # Expected output: ['AWS::EC2::Instance', 'AWS::EC2::SecurityGroup']
 
 # Requirement 2: Get all values for key "GroupDescription"
-group_desc_values = find_values('ImageId', yaml_data)
+group_desc_values = index.values('ImageId')
 print("Values for key 'Network':", group_desc_values)
 # Expected output: ['Enable SSH access via port 22 via anywhere']
 '''
 # Requirement 3: For key "GroupDescription", get the minimal branch (key tree).
 # The YAML structure is: Resources -> ResourceName -> Properties -> GroupDescription.
 # For demonstration, we remove the top-level "Resources" key to focus on the resource.
-paths = find_key_paths(yaml_data, 'ImageId')
+paths = index.paths('ImageId')
 print(paths)
 minimal_branches = []
 for path, value in paths:
@@ -463,11 +352,11 @@ for path, value in paths:
             # Build the minimal branch from the resource dictionary
             # using the remaining path (e.g. ["Properties", "GroupDescription"]).
             print(resource_dict, path, path[2:])
-            branch = build_minimal_branch(resource_dict, path[2:])
+            branch = minimal_branch(resource_dict, path[2:])
             minimal_branches.append(branch)
     else:
         # If "Resources" is not part of the path, use the full branch.
-        branch = build_minimal_branch(yaml_data, path)
+        branch = minimal_branch(yaml_data, path)
         minimal_branches.append(branch)
 
 print("Minimal branches for key 'SubnetId':")
@@ -476,12 +365,11 @@ for branch in minimal_branches:
 '''
 
 # Example 2 & 3: Find all values for key "GroupDescription" along with their key tree
-group_desc_matches = find_values_with_paths("Name", yaml_data)
+group_desc_matches = index.search("Name")
 print("\nMatches for key 'GroupDescription':")
-for key_tree, value in group_desc_matches:
-    # print("Path:", key_tree, "-> Value:", value)
-    getcnt = getconvertion(abc='Reservations>'+key_tree)
-    print(getcnt, "-> Value:", value)
+for path, value in group_desc_matches:
+    # print("Path:", format_path(path), "-> Value:", value)
+    print(to_subscript(('Reservations',) + path), "-> Value:", value)
 
 # For your sample YAML, the expected minimal branch for "GroupDescription" is:
 # {
@@ -490,6 +378,5 @@ for key_tree, value in group_desc_matches:
 #         "GroupDescription": "Enable SSH access via port 22 via anywhere"
 #    }
 # }
-#abc = "Reservations>[0]>Instances>[0]>NetworkInterfaces>[0]>Groups>[0]>GroupId"
-#getcnt = getconvertion(abc=abc)
-#print(getcnt)
\ No newline at end of file
+#query = compile_query("Reservations[0].Instances[0].NetworkInterfaces[0].Groups[0].GroupId")
+#print(query.first(describe_instances_response))
\ No newline at end of file
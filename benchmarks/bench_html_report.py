@@ -0,0 +1,84 @@
+"""Times the streaming HTML report at growing sizes and compares its peak memory with building the page in memory.
+
+    python -m benchmarks.bench_html_report --tests 10000 50000 100000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+import test_2
+from report_writer import ReportWriter
+
+STATUSES = ["Passed", "Failed", "Skipped"]
+
+
+def build_suites(test_count, suite_count=10, versions=2):
+    per_version = max(1, test_count // (suite_count * versions))
+    suites = {}
+    for s in range(suite_count):
+        suites[f"Suite {s}"] = [
+            (f"{v}.0", [{"test_name": f"test_{s}_{v}_{t}", "status": STATUSES[t % 3], "execution_time": "0.1",
+                         "expected_results": "Instance is running", "actual_results": "Instance is running",
+                         "remarks": "OK" if t % 10 else "Traceback (most recent call last): timeout after 300s"}
+                        for t in range(per_version)])
+            for v in range(versions)]
+    return suites
+
+
+class _InMemoryReport:
+    """open_report replacement that keeps the whole page in memory and writes it once, as the reports used to."""
+
+    def __init__(self, output_file, buffer_size=None):
+        self.output_file = output_file
+        self.buffer = io.StringIO()
+
+    def __enter__(self):
+        return ReportWriter(self.buffer)
+
+    def __exit__(self, *exc_info):
+        with open(self.output_file, "w", encoding="utf-8") as file:
+            file.write(self.buffer.getvalue())
+
+
+def run(suites, output_file, in_memory=False, trace=False):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with mock.patch('builtins.print'):
+        if in_memory:
+            with mock.patch.object(test_2, 'open_report', _InMemoryReport):
+                test_2.generate_html_report(suites, output_file=output_file)
+        else:
+            test_2.generate_html_report(suites, output_file=output_file)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, nargs='+', default=[10000, 50000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "report.html")
+        for test_count in args.tests:
+            suites = build_suites(test_count)
+            streamed, _ = run(suites, output_file)
+            size = os.path.getsize(output_file)
+            _, streamed_peak = run(suites, output_file, trace=True)
+            _, in_memory_peak = run(suites, output_file, in_memory=True, trace=True)
+            print(f"{test_count:>7} tests  {size / 2 ** 20:6.1f} MiB  {streamed * 1000:8.1f} ms "
+                  f"({streamed / test_count * 1e6:.2f} us/test)  peak: streamed {streamed_peak / 2 ** 20:6.1f} MiB, "
+                  f"in memory {in_memory_peak / 2 ** 20:6.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
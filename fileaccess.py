@@ -33,20 +33,10 @@ with open("output.yaml", "w") as output_file:
 
 print("Rendered YAML saved to output.yaml")'''
 
-import yaml
-from jinja2 import Environment, FileSystemLoader
-
-# Load vars.yaml
-with open("vars.yaml", "r") as vars_file:
-    vars_data = yaml.safe_load(vars_file) or {}
+from renderer import Renderer, load_vars
 
-# Extract all values from _defaults if it exists
-if "_defaults" in vars_data:
-    for key, value in vars_data["_defaults"].items():
-        vars_data[key] = value  # Move key-value pairs to the main level
-
-# Debug print to check loaded data
-print("DEBUG: Loaded Variables from vars.yaml ->", vars_data)
+# Load vars.yaml; entries of _defaults are moved to the main level
+vars_data = load_vars("vars.yaml")
 
 # Ensure required variables exist
 #required_keys = ["InstanceType", "Namex"]
@@ -55,18 +45,7 @@ print("DEBUG: Loaded Variables from vars.yaml ->", vars_data)
 #    print(f"ERROR: Missing keys in vars.yaml: {missing_keys}")
  #   exit(1)
 
-# Configure Jinja2
-env = Environment(loader=FileSystemLoader("."), trim_blocks=True, lstrip_blocks=True)
-template = env.get_template("component.yaml")
-
-# Render template with vars.yaml data
-rendered_yaml = template.render(vars=vars_data)
-
-# Debug print to check rendered YAML
-print("DEBUG: Rendered YAML Content ->\n", rendered_yaml)
-
-# Save the output
-with open("output.yaml", "w") as output_file:
-    output_file.write(rendered_yaml)
+# Render component.yaml with vars.yaml data, streaming it into output.yaml
+Renderer(".").render_to("component.yaml", vars_data, "output.yaml")
 
 print("Rendered YAML saved to output.yaml")
@@ -5,14 +5,16 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
 
+from report_results import ReportResults, Status
+
 
 def generate_pdf_report(test_suites, report_title="AMI Test Report(QA)", output_file="qa_test_report.pdf"):
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     def get_status_color(status):
         """Returns color for status"""
-        status_colors = {"pass": colors.lightgreen, "fail": colors.red, "skip": colors.orange}
-        return status_colors.get(status.lower(), colors.black)
+        status_colors = {Status.PASS: colors.lightgreen, Status.FAIL: colors.red, Status.SKIP: colors.orange}
+        return status_colors.get(Status.of(status), colors.black)
 
     def wrap_long_text(text, max_length=15):
         """Inserts soft hyphens into long text to enable wrapping"""
@@ -47,12 +49,9 @@ def generate_pdf_report(test_suites, report_title="AMI Test Report(QA)", output_
             test_no += 1
         return table_data
 
-    def prepare_summary(test_results, styles):
+    def prepare_summary(counts, styles):
         """Prepares the summary row of pass/fail/skip counts"""
-        total = len(test_results)
-        passed = sum(1 for test in test_results if test["status"].lower() == "pass")
-        failed = sum(1 for test in test_results if test["status"].lower() == "fail")
-        skipped = sum(1 for test in test_results if test["status"].lower() == "skip")
+        total, passed, failed, skipped = counts.total, counts.passed, counts.failed, counts.skipped
         return [
             [
                 Paragraph("Pass", styles['Normal']), Paragraph(str(passed), styles['Normal']),
@@ -62,15 +61,10 @@ def generate_pdf_report(test_suites, report_title="AMI Test Report(QA)", output_
             ]
         ]
 
-    def prepare_overall_summary(test_suites, styles):
+    def prepare_overall_summary(results, styles):
         """Prepares overall summary across all suites"""
-        total = passed = failed = skipped = 0
-        for suite_name, versions in test_suites.items():
-            for version, test_results in versions:
-                total += len(test_results)
-                passed += sum(1 for test in test_results if test["status"].lower() == "pass")
-                failed += sum(1 for test in test_results if test["status"].lower() == "fail")
-                skipped += sum(1 for test in test_results if test["status"].lower() == "skip")
+        overall = results.overall
+        total, passed, failed, skipped = overall.total, overall.passed, overall.failed, overall.skipped
 
         return [
             [
@@ -96,8 +90,11 @@ def generate_pdf_report(test_suites, report_title="AMI Test Report(QA)", output_
     title = Paragraph(title_text, styles['Title'])
     elements.append(title)
 
+    # Counts per version, per suite and overall, in one pass over the tests
+    results = ReportResults.from_suites(test_suites)
+
     # Overall Summary
-    overall_summary_data = prepare_overall_summary(test_suites, styles)
+    overall_summary_data = prepare_overall_summary(results, styles)
     overall_summary_table = Table(overall_summary_data, colWidths=[70, 50, 70, 50, 70, 50, 70, 50])
     overall_summary_table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
@@ -114,9 +111,9 @@ def generate_pdf_report(test_suites, report_title="AMI Test Report(QA)", output_
     for suite_name, versions in test_suites.items():
         elements.append(Paragraph(f"<b>Test Suite: {suite_name}</b>", styles['Heading2']))
 
-        for version, test_results in versions:
+        for index, (version, test_results) in enumerate(versions):
             elements.append(Paragraph(f"<b>Version: {version}</b>", styles['Heading3']))
-            summary_data = prepare_summary(test_results, styles)
+            summary_data = prepare_summary(results.version(suite_name, index), styles)
 
             # Summary table
             summary_table = Table(summary_data, colWidths=[60, 40, 60, 40, 60, 40, 60, 40])
@@ -149,10 +146,10 @@ def generate_pdf_report(test_suites, report_title="AMI Test Report(QA)", output_
 
             # Add row-specific background colors
             for i, test in enumerate(test_results, 1):
-                status = test["status"].lower()
-                bg_color = colors.lightgreen if status == "pass" else \
-                    colors.lightcoral if status == "fail" else \
-                        colors.lightyellow if status == "skip" else colors.beige
+                status = Status.of(test["status"])
+                bg_color = colors.lightgreen if status is Status.PASS else \
+                    colors.lightcoral if status is Status.FAIL else \
+                        colors.lightyellow if status is Status.SKIP else colors.beige
                 table_style.add('BACKGROUND', (0, i), (-1, i), bg_color)
 
             table.setStyle(table_style)
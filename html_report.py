@@ -1,6 +1,9 @@
 import os
 import datetime
 
+from report_results import ReportResults, Status
+from report_writer import open_report
+
 def generate_html_report(test_result_sets, report_title="QA Test Report", output_file="qa_test_report.html"):
     """
     Generates a customizable QA HTML report for multiple test result sets with a sidebar for navigation.
@@ -10,6 +13,18 @@ def generate_html_report(test_result_sets, report_title="QA Test Report", output
     """
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    def render_row(test):
+        status_class = Status.of(test['status']).value or "skip"
+        return f"""
+           <tr class='{status_class}'>
+                <td class="test-name-column">{test['test_name']}</td>
+                <td class="status-column">{test['status']}</td>
+                <td class="expected-results-column" style="white-space: normal;">{test['expected_results']}</td>
+                <td class="actual-results-column" style="white-space: normal;">{test['actual_results']}</td>
+                <td class="remarks-column">{test['remarks']}</td>
+            </tr>
+            """
+
     html_template = f"""
     <!DOCTYPE html>
     <html lang="en">
@@ -145,18 +160,21 @@ def generate_html_report(test_result_sets, report_title="QA Test Report", output
             <h3 style="text-align:center;">Test Suites</h3>
     """
 
+    # Counts for every set and overall, in one pass over the tests
+    results = ReportResults.from_sets(test_result_sets)
+
     # Adding Overall Test Results Circle
-    overall_pass = overall_fail = overall_skip = 0
-    for _, _, test_results in test_result_sets:
-        overall_pass += sum(1 for test in test_results if test['status'].lower() == 'pass')
-        overall_fail += sum(1 for test in test_results if test['status'].lower() == 'fail')
-        overall_skip += sum(1 for test in test_results if test['status'].lower() == 'skip')
+    overall_pass = results.overall.passed
+    overall_fail = results.overall.failed
+    overall_skip = results.overall.skipped
 
     total_tests = overall_pass + overall_fail + overall_skip
     overall_pass_percentage = (overall_pass / total_tests) * 100 if total_tests > 0 else 0
     overall_fail_percentage = (overall_fail / total_tests) * 100 if total_tests > 0 else 0
     overall_skip_percentage = (overall_skip / total_tests) * 100 if total_tests > 0 else 0
-    html_template += f"""
+    with open_report(output_file) as out:
+        out.write(html_template)
+        out.write(f"""
         <div style="text-align:center; margin-top: 20px;">
             <h3>Overall Test Results</h3>
             <div class="circle total-circle">{total_tests}</div>
@@ -164,28 +182,27 @@ def generate_html_report(test_result_sets, report_title="QA Test Report", output
             <div class="circle fail-circle">{overall_fail}</div>
             <div class="circle skip-circle">{overall_skip}</div>
         </div>
-    """
+    """)
 
-    # Sidebar links for each test set
-    for i, (set_name, version, _) in enumerate(test_result_sets):
-        html_template += f"<a href='#' onclick='showReport(\"report_{i}\")'>{set_name} - v{version}</a>"
+        # Sidebar links for each test set
+        for i, (set_name, version, _) in enumerate(test_result_sets):
+            out.write(f"<a href='#' onclick='showReport(\"report_{i}\")'>{set_name} - v{version}</a>")
 
-    html_template += """
+        out.write("""
         </div>
         <div class="content">
             <div class="container">
                 <h2>{}</h2>
                 <p>Generated on: {}</p>
-    """.format(report_title, timestamp)
+    """.format(report_title, timestamp))
 
-    # Add metrics for individual test suites
-    for i, (set_name, version, test_results) in enumerate(test_result_sets):
-        pass_count = sum(1 for test in test_results if test['status'].lower() == 'pass')
-        fail_count = sum(1 for test in test_results if test['status'].lower() == 'fail')
-        skip_count = sum(1 for test in test_results if test['status'].lower() == 'skip')
-        total_count = pass_count + fail_count + skip_count
-        # Display test suite pass/fail metrics as circles
-        html_template += f"""
+        # Add metrics for individual test suites
+        for i, (set_name, version, test_results) in enumerate(test_result_sets):
+            counts = results.version(set_name, i)
+            pass_count, fail_count, skip_count = counts.passed, counts.failed, counts.skipped
+            total_count = pass_count + fail_count + skip_count
+            # Display test suite pass/fail metrics as circles
+            out.write(f"""
         <div id='report_{i}' class='report-section'>
         <div style="text-align:center;">
                 <div class="circle total-circle">{total_count}</div>
@@ -202,34 +219,22 @@ def generate_html_report(test_result_sets, report_title="QA Test Report", output
                     <th class="actual-results-column">Actual Results</th>
                     <th class="remarks-column">Remarks</th>
                 </tr>
-        """
+        """)
 
-        for test in test_results:
-            status_class = "pass" if test['status'].lower() == "pass" else "fail" if test['status'].lower() == "fail" else "skip"
-            html_template += f"""
-           <tr class='{status_class}'>
-                <td class="test-name-column">{test['test_name']}</td>
-                <td class="status-column">{test['status']}</td>
-                <td class="expected-results-column" style="white-space: normal;">{test['expected_results']}</td>
-                <td class="actual-results-column" style="white-space: normal;">{test['actual_results']}</td>
-                <td class="remarks-column">{test['remarks']}</td>
-            </tr>
-            """
+            # Rows go straight to the file instead of growing one string per test
+            out.write_rows(test_results, render_row)
 
-        html_template += """
+            out.write("""
             </table>
         </div>
-        """
+        """)
 
-    html_template += """
+        out.write("""
             </div>
         </div>
     </body>
     </html>
-    """
-
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write(html_template)
+    """)
 
     print(f"Report generated successfully: {output_file}")
 
@@ -258,4 +263,5 @@ test_result_sets = [
     ])
 ]
 
-generate_html_report(test_result_sets)
+if __name__ == '__main__':
+    generate_html_report(test_result_sets)
@@ -0,0 +1,67 @@
+"""Compares template loading with the pure-Python yaml.Loader against CloudFormationLoader.
+
+    cd iac_test_framework && python -m benchmarks.bench_parser --resources 400
+"""
+import argparse
+import timeit
+
+import yaml
+
+from validators.parser import (CloudFormationLoader, getatt_constructor, importvalue_constructor,
+                               intrinsic_constructor, ref_constructor, sub_constructor)
+
+
+class PurePythonLoader(yaml.Loader):
+    """The loader parse_yaml used before: pure-Python yaml.Loader with the same tag constructors."""
+
+
+PurePythonLoader.add_constructor('!Ref', ref_constructor)
+PurePythonLoader.add_constructor('!GetAtt', getatt_constructor)
+PurePythonLoader.add_constructor('!ImportValue', importvalue_constructor)
+PurePythonLoader.add_constructor('!Sub', sub_constructor)
+PurePythonLoader.add_multi_constructor('!', intrinsic_constructor)
+
+RESOURCE = """  Subnet{i}:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref Vpc
+      CidrBlock: !Select [{i}, !Cidr [!GetAtt Vpc.CidrBlock, 256, 8]]
+      AvailabilityZone: !Select
+        - {az}
+        - !GetAZs ''
+      MapPublicIpOnLaunch: true
+      Tags:
+        - Key: Name
+          Value: !Sub '${{AWS::StackName}}-subnet-{i}'
+        - Key: Tier
+          Value: !Join ['-', [app, !Ref Environment]]
+"""
+
+
+def build_template(resource_count):
+    header = ("AWSTemplateFormatVersion: '2010-09-09'\n"
+              "Parameters:\n  Environment:\n    Type: String\n"
+              "Resources:\n  Vpc:\n    Type: AWS::EC2::VPC\n    Properties:\n      CidrBlock: 10.0.0.0/16\n")
+    return header + "".join(RESOURCE.format(i=i, az=i % 3) for i in range(resource_count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resources', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    template = build_template(args.resources)
+    assert yaml.load(template, Loader=PurePythonLoader) == yaml.load(template, Loader=CloudFormationLoader)
+    print(f"{args.resources} resources, {len(template) / 1024:.0f} KiB, "
+          f"CloudFormationLoader base: {CloudFormationLoader.__bases__[0].__name__}")
+
+    results = {}
+    for name, loader in [('yaml.Loader', PurePythonLoader), ('CloudFormationLoader', CloudFormationLoader)]:
+        results[name] = min(timeit.repeat(lambda: yaml.load(template, Loader=loader), number=1, repeat=args.repeat))
+        print(f"{name:22} {results[name] * 1000:8.1f} ms")
+    print(f"speedup: {results['yaml.Loader'] / results['CloudFormationLoader']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Compares a full load against streaming extraction of a few keys from a large describe capture.
+
+    cd iac_test_framework && python -m benchmarks.bench_stream_extract --megabytes 20
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from validators.parser import CloudFormationLoader
+from validators.stream_extract import extract_file
+from validators.template_index import TemplateIndex
+
+INSTANCE = """    - InstanceId: i-{i:017x}
+      ImageId: ami-053a45fff0a704a47
+      InstanceType: t3.micro
+      LaunchTime: '2024-01-01T00:00:00+00:00'
+      PrivateIpAddress: 10.0.{a}.{b}
+      State: {{Code: 16, Name: running}}
+      SubnetId: subnet-{a:08x}
+      NetworkInterfaces:
+        - NetworkInterfaceId: eni-{i:017x}
+          PrivateIpAddresses:
+            - Primary: true
+              PrivateIpAddress: 10.0.{a}.{b}
+          Groups:
+            - GroupId: sg-{a:08x}
+              GroupName: default
+      Tags:
+        - Key: Name
+          Value: instance-{i}
+        - Key: Environment
+          Value: test
+"""
+
+
+def write_capture(path, megabytes):
+    with open(path, 'w') as f:
+        f.write("Reservations:\n")
+        size = 0
+        i = 0
+        while size < megabytes * 1024 * 1024:
+            if i % 50 == 0:
+                chunk = f"- ReservationId: r-{i:08x}\n  Instances:\n"
+                f.write(chunk)
+                size += len(chunk)
+            chunk = INSTANCE.format(i=i, a=i // 256 % 256, b=i % 256)
+            f.write(chunk)
+            size += len(chunk)
+            i += 1
+    return i
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=20)
+    parser.add_argument('--keys', nargs='+', default=['ImageId', 'SubnetId'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.yaml')
+        count = write_capture(path, args.megabytes)
+        print(f"{count} instances, {os.path.getsize(path) / 1024 / 1024:.1f} MiB, keys {args.keys}")
+
+        def full_load():
+            with open(path, 'rb') as f:
+                data = yaml.load(f, Loader=CloudFormationLoader)
+            index = TemplateIndex(data)
+            return [value for key in args.keys for value in index.values(key)]
+
+        def streamed():
+            return [value for _, value in extract_file(path, args.keys)]
+
+        loaded, load_time, load_peak = measure(full_load)
+        extracted, stream_time, stream_peak = measure(streamed)
+        assert sorted(map(str, loaded)) == sorted(map(str, extracted))
+        print(f"full load  {load_time:7.2f} s  peak {load_peak / 1024 / 1024:8.1f} MiB")
+        print(f"streaming  {stream_time:7.2f} s  peak {stream_peak / 1024 / 1024:8.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
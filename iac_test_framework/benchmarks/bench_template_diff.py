@@ -0,0 +1,61 @@
+"""Times TemplateDiff on two large generated templates that differ in a handful of places.
+
+    cd iac_test_framework && python -m benchmarks.bench_template_diff --resources 10000
+"""
+import argparse
+import copy
+import time
+
+from validators.parser import GetAtt, Ref
+from validators.template_diff import diff, format_change
+
+
+def build_template(resource_count):
+    resources = {'Vpc': {'Type': 'AWS::EC2::VPC', 'Properties': {'CidrBlock': '10.0.0.0/16'}}}
+    for i in range(resource_count):
+        resources[f'Subnet{i}'] = {
+            'Type': 'AWS::EC2::Subnet',
+            'Properties': {
+                'VpcId': Ref('Vpc'),
+                'CidrBlock': f'10.{i // 256}.{i % 256}.0/24',
+                'AvailabilityZone': f'eu-west-1{"abc"[i % 3]}',
+                'Tags': [{'Key': 'Name', 'Value': f'subnet-{i}'}, {'Key': 'Tier', 'Value': 'app'}],
+            },
+        }
+    outputs = {f'Subnet{i}Id': {'Value': Ref(f'Subnet{i}')} for i in range(0, resource_count, 10)}
+    return {'AWSTemplateFormatVersion': '2010-09-09', 'Resources': resources, 'Outputs': outputs}
+
+
+def modify(template, resource_count):
+    new = copy.deepcopy(template)
+    resources = new['Resources']
+    middle = resource_count // 2
+    resources[f'Subnet{middle}']['Properties']['CidrBlock'] = '192.168.0.0/24'
+    resources['Subnet1']['Properties']['Tags'].reverse()
+    resources['Subnet2']['Properties']['Tags'][1]['Value'] = 'db'
+    resources['Subnet3']['Properties']['VpcId'] = GetAtt('Vpc', 'VpcId')
+    del resources[f'Subnet{resource_count - 1}']
+    resources['Extra'] = {'Type': 'AWS::EC2::InternetGateway'}
+    return new
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resources', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    old = build_template(args.resources)
+    new = modify(old, args.resources)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        changes = diff(old, new)
+        timings.append(time.perf_counter() - start)
+    for change in changes:
+        print(format_change(change))
+    print(f"{args.resources} resources, {len(changes)} changes, best of {args.repeat}: {min(timings) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+from validators.aws_client import get_client_pool
+from validators.orchestrator import StackOrchestrator
+from validators.snapshot import StackSnapshot
+from validators.stack_cache import StackCache
+from validators.waiters import wait_stats
+
+
+@pytest.fixture(scope="session")
+def client_pool():
+    return get_client_pool()
+
+
+@pytest.fixture(scope="session")
+def stack_orchestrator(client_pool):
+    """Deploys stacks concurrently and tears all of them down in parallel at session end."""
+    orchestrator = StackOrchestrator(client_pool.client('cloudformation'))
+    yield orchestrator
+    orchestrator.teardown()
+
+
+@pytest.fixture(scope="session")
+def stack_cache(stack_orchestrator):
+    """One stack per unique template and parameters, shared by every test.
+
+    IAC_KEEP_STACKS=1 keeps the stacks for the next session; IAC_IN_PLACE_STACKS=1
+    instead keeps one long-lived stack per template and updates it through change sets.
+    """
+    cache = StackCache(stack_orchestrator, keep=os.environ.get('IAC_KEEP_STACKS') == '1',
+                       in_place=os.environ.get('IAC_IN_PLACE_STACKS') == '1')
+    yield cache
+    cache.wait()
+
+
+@pytest.fixture(scope="session")
+def session_stacks(request, stack_cache):
+    """Starts deploying every stack the session's tests parametrize deployed_stack with, as one batch."""
+    specs = []
+    for item in request.session.items:
+        param = item.callspec.params.get('deployed_stack') if hasattr(item, 'callspec') else None
+        if param is not None:
+            specs.append((param['template_path'], param.get('parameters', [])))
+    stack_cache.deploy_all(specs)
+    return stack_cache
+
+
+@pytest.fixture
+def deployed_stack(request, session_stacks):
+    """The stack deployed for this test's spec, as soon as it is ready; shared by every test using the spec."""
+    return session_stacks.get(request.param['template_path'], request.param.get('parameters', []))
+
+
+@pytest.fixture(scope="session")
+def stack_snapshots():
+    return {}
+
+
+@pytest.fixture
+def stack_snapshot(deployed_stack, stack_snapshots):
+    """One StackSnapshot per deployed stack, shared by every test that reads it."""
+    stack_id = deployed_stack['StackId']
+    if stack_id not in stack_snapshots:
+        stack_snapshots[stack_id] = StackSnapshot.capture(deployed_stack['StackName'])
+    return stack_snapshots[stack_id]
+
+
+def pytest_terminal_summary(terminalreporter):
+    summary = wait_stats.summary()
+    if summary:
+        terminalreporter.write_sep("-", "stack and execution waits")
+        terminalreporter.write_line(summary)
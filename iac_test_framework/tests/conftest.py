@@ -1,12 +1,13 @@
 import pytest
 from validators.aws_client import AWSClient
+from validators.engine import ValidationEngine
 from validators.parser import parse_yaml
 from validators.utils import load_resource_config
 
 
 @pytest.fixture(scope="session")
-def aws_client():
-    return AWSClient()
+def aws_client(client_pool):
+    return AWSClient(pool=client_pool)
 
 
 @pytest.fixture(scope="session")
@@ -14,6 +15,11 @@ def resource_config():
     return load_resource_config()
 
 
+@pytest.fixture(scope="session")
+def validation_engine(resource_config):
+    return ValidationEngine(resource_config, max_workers=16)
+
+
 @pytest.fixture
 def stack_details():
     return {
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+pytest.importorskip("aiobotocore")
+
+from validators.async_client import AsyncAWSClient
+from validators.events import StackFailedError
+from validators.waiters import REPLAY_BACKOFF, WaitStats
+
+STACK_ID = 'arn:aws:cloudformation:us-east-1:123456789012:stack/app/1'
+
+
+def stack_event(event_id, status, logical_id='app', resource_type='AWS::CloudFormation::Stack'):
+    physical_id = STACK_ID if resource_type == 'AWS::CloudFormation::Stack' else f'{logical_id}-1'
+    return {'EventId': str(event_id), 'StackId': STACK_ID, 'LogicalResourceId': logical_id,
+            'PhysicalResourceId': physical_id, 'ResourceType': resource_type, 'ResourceStatus': status}
+
+
+class FakeCloudFormation:
+    """Stands in for an aiobotocore CloudFormation client; each poll reveals the next batch of events."""
+
+    def __init__(self, history, batches, status='CREATE_COMPLETE'):
+        self.events = list(reversed(history))
+        self.batches = list(batches)
+        self.status = status
+        self.deleted = False
+
+    def get_paginator(self, operation):
+        assert operation == 'describe_stack_events'
+        return self
+
+    async def paginate(self, StackName):
+        if self.deleted:
+            raise ClientError({'Error': {'Code': 'ValidationError', 'Message': f'Stack {StackName} does not exist'}},
+                              'DescribeStackEvents')
+        if self.batches:
+            batch = self.batches.pop(0)
+            if batch is None:
+                self.deleted = True
+            else:
+                self.events[:0] = reversed(batch)
+        # Two events per page, newest first, as describe_stack_events pages them
+        for start in range(0, len(self.events), 2):
+            yield {'StackEvents': self.events[start:start + 2]}
+
+    async def describe_stacks(self, StackName):
+        return {'Stacks': [{'StackName': StackName, 'StackStatus': self.status}]}
+
+
+def wait(client, *args, **kwargs):
+    async def run():
+        aws = AsyncAWSClient(region_name='us-east-1')
+        aws._clients['cloudformation'] = client
+        aws._semaphores['cloudformation'] = asyncio.BoundedSemaphore(1)
+        return await aws.wait_for_stack('app', *args, backoff=REPLAY_BACKOFF, stats=WaitStats(), **kwargs)
+    return asyncio.run(run())
+
+
+PREVIOUS_DEPLOYMENT = [stack_event(1, 'CREATE_IN_PROGRESS'), stack_event(2, 'CREATE_FAILED', 'Bucket', 'AWS::S3::Bucket'),
+                       stack_event(3, 'UPDATE_IN_PROGRESS'), stack_event(4, 'UPDATE_COMPLETE')]
+
+
+def test_wait_for_stack_returns_described_stack_once_update_completes():
+    client = FakeCloudFormation(PREVIOUS_DEPLOYMENT, [
+        [],
+        [stack_event(5, 'UPDATE_IN_PROGRESS'), stack_event(6, 'UPDATE_IN_PROGRESS', 'Bucket', 'AWS::S3::Bucket')],
+        [stack_event(7, 'UPDATE_COMPLETE', 'Bucket', 'AWS::S3::Bucket'), stack_event(8, 'UPDATE_COMPLETE')],
+    ], status='UPDATE_COMPLETE')
+    stack = wait(client, 'UPDATE_COMPLETE', after_event_id='4')
+    assert stack['StackStatus'] == 'UPDATE_COMPLETE'
+    assert client.batches == []
+
+
+def test_wait_for_stack_ignores_the_previous_deployment():
+    # Without after_event_id the first poll still sees the update that ended before this delete began.
+    client = FakeCloudFormation(PREVIOUS_DEPLOYMENT, [[], [stack_event(5, 'DELETE_IN_PROGRESS')], None])
+    assert wait(client, 'DELETE_COMPLETE') is None
+    assert client.deleted
+
+
+def test_wait_for_stack_fails_fast():
+    client = FakeCloudFormation([], [
+        [stack_event(1, 'CREATE_IN_PROGRESS')],
+        [stack_event(2, 'CREATE_FAILED', 'Bucket', 'AWS::S3::Bucket')],
+        [stack_event(3, 'ROLLBACK_COMPLETE')],
+    ])
+    with pytest.raises(StackFailedError, match='Bucket'):
+        wait(client, 'CREATE_COMPLETE')
+    assert len(client.batches) == 1
+
+
+def test_wait_for_stack_reports_unexpected_terminal_status():
+    client = FakeCloudFormation([], [
+        [stack_event(1, 'CREATE_IN_PROGRESS')],
+        [stack_event(2, 'CREATE_FAILED', 'Bucket', 'AWS::S3::Bucket'), stack_event(3, 'ROLLBACK_COMPLETE')],
+    ])
+    with pytest.raises(Exception, match='ROLLBACK_COMPLETE'):
+        wait(client, 'CREATE_COMPLETE', fail_fast=False)
@@ -0,0 +1,46 @@
+import datetime
+
+import boto3
+from botocore.stub import Stubber
+
+from validators.aws_client import ClientPool
+from validators.cassette import RECORD, REPLAY_REGION, Cassette
+
+CREATED = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+STACK_ID = 'arn:aws:cloudformation:us-east-1:123456789012:stack/app/1'
+
+
+def stack(status):
+    return {'Stacks': [{'StackName': 'app', 'StackId': STACK_ID, 'CreationTime': CREATED, 'StackStatus': status}]}
+
+
+def record(path):
+    cassette = Cassette(path, RECORD)
+    client = boto3.client('cloudformation', region_name='us-east-1',
+                          aws_access_key_id='testing', aws_secret_access_key='testing')
+    cassette.attach(client)
+    with Stubber(client) as stubber:
+        stubber.add_response('create_stack', {'StackId': STACK_ID})
+        stubber.add_response('describe_stacks', stack('CREATE_IN_PROGRESS'))
+        stubber.add_response('describe_stacks', stack('CREATE_COMPLETE'))
+        client.create_stack(StackName='app', TemplateBody='{}', ClientRequestToken='first')
+        client.describe_stacks(StackName='app')
+        client.describe_stacks(StackName='app')
+    cassette.save()
+
+
+def test_replay_round_trip_without_credentials_or_region(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cassette.json.gz')
+    record(path)
+    for name in ('AWS_DEFAULT_REGION', 'AWS_REGION', 'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_PROFILE'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('AWS_CONFIG_FILE', str(tmp_path / 'missing-config'))
+    monkeypatch.setenv('AWS_SHARED_CREDENTIALS_FILE', str(tmp_path / 'missing-credentials'))
+
+    client = ClientPool(cassette=Cassette(path)).client('cloudformation')
+
+    assert client.meta.region_name == REPLAY_REGION
+    assert client.create_stack(StackName='app', TemplateBody='{}', ClientRequestToken='second')['StackId'] == STACK_ID
+    statuses = [client.describe_stacks(StackName='app')['Stacks'][0]['StackStatus'] for _ in range(3)]
+    assert statuses == ['CREATE_IN_PROGRESS', 'CREATE_COMPLETE', 'CREATE_COMPLETE']
+    assert client.describe_stacks(StackName='app')['Stacks'][0]['CreationTime'] == CREATED
@@ -0,0 +1,69 @@
+import yaml
+
+from validators.parser import GetAtt, ImportValue, Intrinsic, Ref, Sub, collect_references, load_template
+
+TEMPLATE = """
+Resources:
+  Subnet:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref Vpc
+      CidrBlock: !GetAtt Vpc.CidrBlock
+      AvailabilityZone: !Select
+        - 0
+        - !GetAZs ''
+      Name: !Sub '${AWS::StackName}-subnet'
+      Export: !ImportValue shared-vpc
+      Tier: !If [IsProd, !Join ['-', [a, b]], !Ref AWS::NoValue]
+    Condition: !Condition IsProd
+"""
+
+
+def test_intrinsic_tags_become_typed_nodes():
+    properties = load_template(TEMPLATE)['Resources']['Subnet']['Properties']
+    assert properties['VpcId'] == Ref('Vpc')
+    assert properties['CidrBlock'] == GetAtt('Vpc', 'CidrBlock')
+    assert properties['AvailabilityZone'] == Intrinsic('Fn::Select', [0, Intrinsic('Fn::GetAZs', '')])
+    assert properties['Name'] == Sub('${AWS::StackName}-subnet')
+    assert properties['Export'] == ImportValue('shared-vpc')
+    assert properties['Tier'] == Intrinsic('Fn::If', ['IsProd', Intrinsic('Fn::Join', ['-', ['a', 'b']]),
+                                                      Ref('AWS::NoValue')])
+
+
+def test_getatt_sequence_form():
+    assert load_template("a: !GetAtt [Instance, PrivateIp]") == {'a': GetAtt('Instance', 'PrivateIp')}
+
+
+def test_loader_leaves_global_loaders_untouched():
+    load_template(TEMPLATE)
+    for loader in (yaml.Loader, yaml.SafeLoader):
+        assert '!Ref' not in loader.yaml_constructors
+        assert '!' not in loader.yaml_multi_constructors
+
+
+def test_collect_references_in_nested_intrinsics():
+    template = load_template("""
+Cidr: !Select [0, !Cidr [!GetAtt Vpc.CidrBlock, 4, 8]]
+Tier: !If [IsProd, !Join ['-', [!Ref Env, b]], !Ref AWS::NoValue]
+Export: !ImportValue {'Fn::Sub': '${Network}-vpc'}
+""")
+    assert list(collect_references(template)) == [GetAtt('Vpc', 'CidrBlock'), Ref('Env'), Ref('AWS::NoValue'),
+                                                  Ref('Network')]
+
+
+def test_collect_references_in_sub():
+    template = load_template("""
+Name: !Sub '${AWS::StackName}-${Bucket}-${Role.Arn}-${!Literal}'
+Url: !Sub
+  - 'https://${Domain}/${Path}'
+  - Domain: !GetAtt Distribution.DomainName
+""")
+    assert list(collect_references(template)) == [Ref('AWS::StackName'), Ref('Bucket'), GetAtt('Role', 'Arn'),
+                                                  Ref('Path'), GetAtt('Distribution', 'DomainName')]
+
+
+def test_collect_references_long_form():
+    template = {'A': {'Ref': 'Vpc'}, 'B': {'Fn::GetAtt': ['Role', 'Arn']}, 'C': {'Fn::GetAtt': 'Queue.Url'},
+                'D': {'Fn::Join': ['', [{'Ref': 'Bucket'}]]}}
+    assert list(collect_references(template)) == [Ref('Vpc'), GetAtt('Role', 'Arn'), GetAtt('Queue', 'Url'),
+                                                  Ref('Bucket')]
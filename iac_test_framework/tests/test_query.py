@@ -0,0 +1,80 @@
+import pytest
+
+from validators.parser import GetAtt, Ref, load_template
+from validators.query import Query, QuerySyntaxError, compile_query, minimal_branch, query, to_subscript
+
+TEMPLATE = load_template("""
+Resources:
+  Vpc:
+    Type: AWS::EC2::VPC
+    Properties:
+      CidrBlock: 10.0.0.0/16
+  PublicSubnet:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref Vpc
+      CidrBlock: 10.0.0.0/24
+      Tags:
+        - Key: Name
+          Value: public
+        - Key: Tier
+          Value: web
+  PrivateSubnet:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref Vpc
+      CidrBlock: 10.0.1.0/24
+Outputs:
+  VpcCidr:
+    Value: !GetAtt Vpc.CidrBlock
+""")
+
+RESPONSE = {'Reservations': [{'Instances': [
+    {'InstanceId': 'i-1', 'SecurityGroups': [{'GroupName': 'default', 'GroupId': 'sg-1'},
+                                             {'GroupName': 'web', 'GroupId': 'sg-2'}]},
+    {'InstanceId': 'i-2', 'SecurityGroups': []},
+]}]}
+
+
+def test_wildcard_and_filter():
+    assert query(TEMPLATE, 'Resources.*[Type=AWS::EC2::Subnet].Properties.CidrBlock') == ['10.0.0.0/24',
+                                                                                          '10.0.1.0/24']
+    assert query(TEMPLATE, 'Resources.*[Type!=AWS::EC2::Subnet].Properties.CidrBlock') == ['10.0.0.0/16']
+
+
+def test_filters_select_list_items():
+    assert query(TEMPLATE, 'Resources.PublicSubnet.Properties.Tags[Key=Tier].Value') == ['web']
+    assert query(RESPONSE, 'Reservations[*].Instances[*].SecurityGroups[GroupName=web].GroupId') == ['sg-2']
+
+
+def test_indices_and_paths():
+    assert compile_query('Reservations[0].Instances[-1].InstanceId').find_paths(RESPONSE) == [
+        (('Reservations', 0, 'Instances', 1, 'InstanceId'), 'i-2')]
+    assert query(RESPONSE, 'Reservations[0].Instances[5].InstanceId') == []
+
+
+def test_descendants_keep_intrinsics():
+    assert query(TEMPLATE, '**.VpcId') == [Ref('Vpc'), Ref('Vpc')]
+    assert compile_query('Outputs.*.Value').first(TEMPLATE) == GetAtt('Vpc', 'CidrBlock')
+
+
+def test_compiled_queries_are_cached():
+    assert compile_query('Resources.*.Type') is compile_query('Resources.*.Type')
+
+
+def test_projection_keeps_scalar_context():
+    assert compile_query('Resources.*[Type=AWS::EC2::VPC].Properties.CidrBlock').project(TEMPLATE) == [
+        {'Resources': {'Vpc': {'Type': 'AWS::EC2::VPC', 'Properties': {'CidrBlock': '10.0.0.0/16'}}}}]
+    assert minimal_branch(RESPONSE, ('Reservations', 0, 'Instances', 0, 'InstanceId')) == {
+        'Reservations': [{'Instances': [{'InstanceId': 'i-1'}]}]}
+    assert minimal_branch(RESPONSE, ('Missing',)) is None
+
+
+def test_to_subscript():
+    assert to_subscript(('Reservations', 0, 'Instances')) == "['Reservations'][0]['Instances']"
+
+
+@pytest.mark.parametrize('expression', ['a..b', 'a[0', 'a.', 'a]', 'a[?]'])
+def test_syntax_errors(expression):
+    with pytest.raises(QuerySyntaxError):
+        Query(expression)
@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+from validators.parser import GetAtt, Ref
+from validators.stream_extract import extract
+
+TEMPLATE = """
+Resources:
+  Vpc:
+    Type: AWS::EC2::VPC
+    Properties:
+      CidrBlock: 10.0.0.0/16
+  Subnet:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref Vpc
+      Tags:
+        - Key: Name
+          Value: !GetAtt Vpc.CidrBlock
+"""
+
+
+def extracted(text, keys):
+    return list(extract(io.StringIO(text), keys))
+
+
+def test_yields_paths_and_values_of_matching_keys():
+    assert extracted(TEMPLATE, ['CidrBlock', 'Tags']) == [
+        (('Resources', 'Vpc', 'Properties', 'CidrBlock'), '10.0.0.0/16'),
+        (('Resources', 'Subnet', 'Properties', 'Tags'), [{'Key': 'Name', 'Value': GetAtt('Vpc', 'CidrBlock')}]),
+    ]
+
+
+def test_nested_matches_are_part_of_the_outer_match():
+    assert extracted(TEMPLATE, ['Properties', 'VpcId']) == [
+        (('Resources', 'Vpc', 'Properties'), {'CidrBlock': '10.0.0.0/16'}),
+        (('Resources', 'Subnet', 'Properties'),
+         {'VpcId': Ref('Vpc'), 'Tags': [{'Key': 'Name', 'Value': GetAtt('Vpc', 'CidrBlock')}]}),
+    ]
+
+
+def test_alias_to_anchor_outside_the_match():
+    text = """
+Defaults: &tags
+  - Key: Team
+    Value: platform
+Resources:
+  Bucket:
+    Tags: *tags
+"""
+    assert extracted(text, ['Tags']) == [(('Resources', 'Bucket', 'Tags'), [{'Key': 'Team', 'Value': 'platform'}])]
+
+
+def test_matches_inside_anchored_and_aliased_values():
+    text = """
+Base: &base
+  Type: AWS::S3::Bucket
+Resources:
+  Bucket: *base
+"""
+    assert extracted(text, ['Type']) == [(('Base', 'Type'), 'AWS::S3::Bucket'),
+                                         (('Resources', 'Bucket', 'Type'), 'AWS::S3::Bucket')]
+
+
+def test_undefined_alias_is_reported():
+    with pytest.raises(ValueError, match=r"\*missing"):
+        extracted("Resources:\n  Bucket:\n    Tags: *missing\n", ['Tags'])
@@ -0,0 +1,64 @@
+import os
+
+import yaml
+
+from validators.parser import CloudFormationLoader, GetAtt
+from validators.template_cache import TemplateCache
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_key_depends_on_content_and_loader():
+    assert TemplateCache.key(b'a: 1', yaml.SafeLoader) == TemplateCache.key(b'a: 1', yaml.SafeLoader)
+    assert TemplateCache.key(b'a: 1', yaml.SafeLoader) != TemplateCache.key(b'a: 2', yaml.SafeLoader)
+    assert TemplateCache.key(b'a: 1', yaml.SafeLoader) != TemplateCache.key(b'a: 1', CloudFormationLoader)
+
+
+def test_same_content_is_parsed_once_per_loader(tmp_path):
+    cache = TemplateCache()
+    first = write(tmp_path / 'first.yaml', 'a: !GetAtt Vpc.CidrBlock')
+    second = write(tmp_path / 'second.yaml', 'a: !GetAtt Vpc.CidrBlock')
+    tree = cache.load(first, CloudFormationLoader)
+    assert tree == {'a': GetAtt('Vpc', 'CidrBlock')}
+    assert cache.load(second, CloudFormationLoader) is tree
+    plain = write(tmp_path / 'plain.yaml', 'a: 1')
+    cache.load(plain)
+    cache.load(plain, yaml.Loader)
+    assert cache.stats() == {'hits': 1, 'disk_hits': 0, 'misses': 3, 'entries': 3}
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = TemplateCache(max_entries=2)
+    paths = [write(tmp_path / f'{name}.yaml', f'name: {name}') for name in ('a', 'b', 'c')]
+    cache.load(paths[0])
+    cache.load(paths[1])
+    cache.load(paths[0])
+    cache.load(paths[2])
+    assert cache.stats()['entries'] == 2
+    cache.load(paths[0])
+    assert cache.stats()['misses'] == 3
+    cache.load(paths[1])
+    assert cache.stats()['misses'] == 4
+
+
+def test_disk_layer_is_shared_between_caches(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    path = write(tmp_path / 'template.yaml', 'a: !GetAtt Vpc.CidrBlock')
+    tree = TemplateCache(cache_dir=cache_dir).load(path, CloudFormationLoader)
+    assert [name for name in os.listdir(cache_dir) if not name.endswith('.pickle')] == []
+
+    cache = TemplateCache(cache_dir=cache_dir)
+    assert cache.load(path, CloudFormationLoader) == tree
+    assert cache.stats() == {'hits': 0, 'disk_hits': 1, 'misses': 0, 'entries': 1}
+
+
+def test_changed_content_is_parsed_again(tmp_path):
+    cache = TemplateCache(cache_dir=str(tmp_path / 'cache'))
+    path = write(tmp_path / 'template.yaml', 'a: 1')
+    assert cache.load(path) == {'a': 1}
+    write(tmp_path / 'template.yaml', 'a: 2')
+    assert cache.load(path) == {'a': 2}
+    assert cache.stats()['misses'] == 2
@@ -0,0 +1,94 @@
+from validators.parser import GetAtt, Ref, load_template
+from validators.template_diff import Change, diff
+
+OLD = load_template("""
+Resources:
+  Subnet:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref Vpc
+      CidrBlock: 10.0.0.0/24
+      Tags:
+        - Key: Name
+          Value: public
+        - Key: Tier
+          Value: web
+  Bucket:
+    Type: AWS::S3::Bucket
+""")
+
+
+def test_identical_templates_have_no_changes():
+    assert diff(OLD, load_template("""
+Resources:
+  Bucket: {Type: AWS::S3::Bucket}
+  Subnet:
+    Properties:
+      Tags: [{Value: web, Key: Tier}, {Key: Name, Value: public}]
+      CidrBlock: 10.0.0.0/24
+      VpcId: !Ref Vpc
+    Type: AWS::EC2::Subnet
+""")) == []
+
+
+def test_list_items_matched_by_identity_key():
+    new = load_template("""
+Resources:
+  Subnet:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref Vpc
+      CidrBlock: 10.0.0.0/24
+      Tags:
+        - Key: Tier
+          Value: db
+        - Key: Owner
+          Value: team
+  Bucket:
+    Type: AWS::S3::Bucket
+""")
+    tags = ('Resources', 'Subnet', 'Properties', 'Tags')
+    assert diff(OLD, new) == [
+        Change('changed', tags + (0, 'Value'), 'web', 'db'),
+        Change('added', tags + (1,), None, {'Key': 'Owner', 'Value': 'team'}),
+        Change('removed', tags + (0,), {'Key': 'Name', 'Value': 'public'}, None),
+    ]
+
+
+def test_unkeyed_lists_ignore_order_of_equal_items():
+    assert diff({'Subnets': [Ref('A'), Ref('B'), 'x']}, {'Subnets': ['x', Ref('B'), Ref('A')]}) == []
+    assert diff({'Ports': [80, 443, 22]}, {'Ports': [443, 8080, 80]}) == [
+        Change('changed', ('Ports', 1), 22, 8080)]
+
+
+def test_typed_nodes_and_resources():
+    new = load_template("""
+Resources:
+  Subnet:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !GetAtt Vpc.VpcId
+      CidrBlock: 10.0.0.0/24
+      Tags:
+        - Key: Name
+          Value: public
+        - Key: Tier
+          Value: web
+  Queue:
+    Type: AWS::SQS::Queue
+""")
+    assert diff(OLD, new) == [
+        Change('changed', ('Resources', 'Subnet', 'Properties', 'VpcId'), Ref('Vpc'), GetAtt('Vpc', 'VpcId')),
+        Change('removed', ('Resources', 'Bucket'), {'Type': 'AWS::S3::Bucket'}, None),
+        Change('added', ('Resources', 'Queue'), None, {'Type': 'AWS::SQS::Queue'}),
+    ]
+
+
+def test_scalar_types_are_distinguished():
+    assert diff({'Port': 1}, {'Port': True}) == [Change('changed', ('Port',), 1, True)]
+
+
+def test_hash_collisions_are_not_taken_for_equality():
+    # hash(-1) == hash(-2) in CPython
+    assert diff({'a': -1}, {'a': -2}) == [Change('changed', ('a',), -1, -2)]
+    assert diff({'Ports': [-1]}, {'Ports': [-2]}) == [Change('changed', ('Ports', 0), -1, -2)]
@@ -0,0 +1,43 @@
+from validators.template_index import TemplateIndex, format_path
+
+TEMPLATE = {
+    'Resources': {
+        'Web': {'Type': 'AWS::EC2::Instance',
+                'Properties': {'Tags': [{'Key': 'Name', 'Value': 'web'}, {'Key': 'Tier', 'Value': 'front'}]}},
+        'Bucket': {'Type': 'AWS::S3::Bucket', 'Properties': {'BucketName': 'logs'}},
+    },
+    'Outputs': {'WebId': {'Value': 'web'}},
+}
+
+
+def test_format_path():
+    assert format_path(('Resources', 'Web', 'Properties', 'Tags', 0, 'Key')) == 'Resources>Web>Properties>Tags>[0]>Key'
+    assert format_path(('a', 1), separator='.') == 'a.[1]'
+    assert format_path(()) == ''
+
+
+def test_paths_keep_document_order():
+    index = TemplateIndex(TEMPLATE)
+    assert index.paths('Key') == [(('Resources', 'Web', 'Properties', 'Tags', 0, 'Key'), 'Name'),
+                                  (('Resources', 'Web', 'Properties', 'Tags', 1, 'Key'), 'Tier')]
+    assert index.values('Type') == ['AWS::EC2::Instance', 'AWS::S3::Bucket']
+    assert index.values('Value') == ['web', 'front', 'web']
+    assert index.paths('Missing') == []
+
+
+def test_keys_include_every_level():
+    assert set(TemplateIndex(TEMPLATE).keys()) == {'Resources', 'Web', 'Type', 'Properties', 'Tags', 'Key', 'Value',
+                                                   'Bucket', 'BucketName', 'Outputs', 'WebId'}
+
+
+def test_search_matches_substrings_in_document_order():
+    index = TemplateIndex(TEMPLATE)
+    assert [format_path(path) for path, _ in index.search('Web')] == ['Resources>Web', 'Outputs>WebId']
+    assert index.search('Name') == [(('Resources', 'Bucket', 'Properties', 'BucketName'), 'logs')]
+
+
+def test_non_string_keys_and_nested_lists():
+    index = TemplateIndex({1: [[{'a': 1}], 'skip'], 'b': {2: 'two'}})
+    assert index.paths('a') == [((1, 0, 0, 'a'), 1)]
+    assert index.values(2) == ['two']
+    assert index.search(2) == [(('b', 2), 'two')]
@@ -0,0 +1,46 @@
+import os
+
+from validators.utils import load_resource_config
+from validators.validator import get_validator
+
+CONFIG = """
+AWS::EC2::Instance:
+  client: ec2
+  describe_method: describe_instances
+  id_param: InstanceIds
+  response_key: Reservations.Instances
+  id_key: InstanceId
+  batch_size: {batch_size}
+"""
+
+
+def write_config(path, batch_size, mtime):
+    path.write_text(CONFIG.format(batch_size=batch_size))
+    os.utime(path, ns=(mtime, mtime))
+    return str(path)
+
+
+def test_config_is_reread_only_when_mtime_changes(tmp_path):
+    path = write_config(tmp_path / 'resources.yaml', 100, 1_000_000_000)
+    config = load_resource_config(path)
+    assert load_resource_config(path) is config
+
+    # Same mtime: the file is not read again, whatever it now holds.
+    write_config(tmp_path / 'resources.yaml', 50, 1_000_000_000)
+    assert load_resource_config(path) is config
+
+    write_config(tmp_path / 'resources.yaml', 50, 2_000_000_000)
+    reloaded = load_resource_config(path)
+    assert reloaded is not config
+    assert reloaded['AWS::EC2::Instance']['batch_size'] == 50
+
+
+def test_validator_is_rebuilt_when_its_config_reloads(tmp_path):
+    path = write_config(tmp_path / 'resources.yaml', 100, 1_000_000_000)
+    validator = get_validator('AWS::EC2::Instance', load_resource_config(path))
+    assert get_validator('AWS::EC2::Instance', load_resource_config(path)) is validator
+
+    write_config(tmp_path / 'resources.yaml', 50, 2_000_000_000)
+    rebuilt = get_validator('AWS::EC2::Instance', load_resource_config(path))
+    assert rebuilt is not validator
+    assert rebuilt.config['batch_size'] == 50
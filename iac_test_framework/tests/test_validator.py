@@ -0,0 +1,132 @@
+import os
+
+import boto3
+from botocore.stub import Stubber
+
+from validators import validator
+from validators.engine import ValidationEngine
+from validators.parser import GetAtt
+from validators.utils import load_resource_config
+from validators.validator import GenericValidator, describe_batches, matches_default, response_items
+
+RESOURCE_CONFIG = load_resource_config(os.path.join(os.path.dirname(__file__), '..', 'config', 'aws_resources.yaml'))
+LISTENER_ARN = 'arn:aws:elasticloadbalancing:us-east-1:123456789012:listener/app/web/1/2'
+TARGET_GROUP_ARN = 'arn:aws:elasticloadbalancing:us-east-1:123456789012:targetgroup/web/3'
+
+
+class StubbedPool:
+    """Hands out one botocore-stubbed client per service in place of a ClientPool."""
+
+    def __init__(self):
+        self.clients = {}
+
+    def client(self, service_name):
+        if service_name not in self.clients:
+            self.clients[service_name] = boto3.client(service_name, region_name='us-east-1',
+                                                      aws_access_key_id='testing', aws_secret_access_key='testing')
+        return self.clients[service_name]
+
+
+def compare(resource_type, expected_properties, actual_details):
+    return GenericValidator(RESOURCE_CONFIG[resource_type]).compare(expected_properties, actual_details, {})
+
+
+def test_describe_batches_deduplicates_and_chunks_at_batch_size():
+    config = dict(RESOURCE_CONFIG['AWS::EC2::Instance'], batch_size=2)
+    assert list(describe_batches(config, ['i-1', 'i-2', 'i-1', 'i-3'])) == [
+        {'InstanceIds': ['i-1', 'i-2']}, {'InstanceIds': ['i-3']}]
+
+
+def test_response_items_follows_dotted_response_key():
+    config = RESOURCE_CONFIG['AWS::EC2::Instance']
+    response = {'Reservations': [{'Instances': [{'InstanceId': 'i-1'}, {'InstanceId': 'i-2'}]},
+                                 {'Instances': [{'InstanceId': 'i-3'}]}, {}]}
+    assert [item['InstanceId'] for item in response_items(config, response)] == ['i-1', 'i-2', 'i-3']
+    assert response_items(config, {}) == []
+
+
+def test_get_resource_details_many_describes_one_call_per_batch():
+    pool = StubbedPool()
+    config = dict(RESOURCE_CONFIG['AWS::EC2::Instance'], batch_size=2)
+    generic = GenericValidator(config, pool=pool)
+    with Stubber(pool.client('ec2')) as stubber:
+        stubber.add_response('describe_instances',
+                             {'Reservations': [{'Instances': [{'InstanceId': 'i-1'}]},
+                                               {'Instances': [{'InstanceId': 'i-2'}]}]},
+                             {'InstanceIds': ['i-1', 'i-2']})
+        stubber.add_response('describe_instances', {'Reservations': [{'Instances': [{'InstanceId': 'i-3'}]}]},
+                             {'InstanceIds': ['i-3']})
+        details = generic.get_resource_details_many(['i-1', 'i-2', 'i-3', 'i-2'])
+        stubber.assert_no_pending_responses()
+    assert details == {'i-1': {'InstanceId': 'i-1'}, 'i-2': {'InstanceId': 'i-2'}, 'i-3': {'InstanceId': 'i-3'}}
+
+
+def test_get_resource_details_many_follows_pages():
+    pool = StubbedPool()
+    generic = GenericValidator(RESOURCE_CONFIG['AWS::AutoScaling::AutoScalingGroup'], pool=pool)
+    group = {'MinSize': 1, 'MaxSize': 2, 'DesiredCapacity': 1, 'DefaultCooldown': 300, 'AvailabilityZones': [],
+             'HealthCheckType': 'EC2', 'CreatedTime': '2024-01-01T00:00:00Z'}
+    with Stubber(pool.client('autoscaling')) as stubber:
+        stubber.add_response('describe_auto_scaling_groups',
+                             {'AutoScalingGroups': [dict(group, AutoScalingGroupName='web')], 'NextToken': 'more'},
+                             {'AutoScalingGroupNames': ['web', 'worker']})
+        stubber.add_response('describe_auto_scaling_groups',
+                             {'AutoScalingGroups': [dict(group, AutoScalingGroupName='worker')]},
+                             {'AutoScalingGroupNames': ['web', 'worker'], 'NextToken': 'more'})
+        details = generic.get_resource_details_many(['web', 'worker'])
+        stubber.assert_no_pending_responses()
+    assert sorted(details) == ['web', 'worker']
+
+
+def test_list_default_matches_items_on_the_keys_it_names():
+    actual = {'ListenerArn': LISTENER_ARN, 'Port': 80,
+              'DefaultActions': [{'Type': 'forward', 'TargetGroupArn': TARGET_GROUP_ARN, 'Order': 1}]}
+    assert compare('AWS::ElasticLoadBalancingV2::Listener', {}, actual) == []
+
+
+def test_list_default_reports_missing_item():
+    actions = [{'Type': 'redirect', 'Order': 1}]
+    assert compare('AWS::ElasticLoadBalancingV2::Listener', {}, {'DefaultActions': actions}) == [
+        ('Default mismatch', 'DefaultActions', [{'Type': 'forward'}], actions)]
+
+
+def test_dict_and_scalar_defaults():
+    assert compare('AWS::EC2::Instance', {}, {'Monitoring': {'State': 'disabled'}}) == []
+    assert compare('AWS::EC2::Instance', {}, {'Monitoring': {'State': 'enabled'}}) == [
+        ('Default mismatch', 'Monitoring', {'State': 'disabled'}, {'State': 'enabled'})]
+    assert compare('AWS::AutoScaling::AutoScalingGroup', {}, {'HealthCheckType': 'ELB'}) == [
+        ('Default mismatch', 'HealthCheckType', 'EC2', 'ELB')]
+
+
+def test_missing_actual_value_is_not_checked():
+    assert compare('AWS::AutoScaling::AutoScalingGroup', {}, {}) == []
+    assert compare('AWS::ElasticLoadBalancingV2::LoadBalancer', {}, {'Type': None}) == []
+
+
+def test_matches_default_nested():
+    assert matches_default({'A': [{'B': 1}]}, {'A': [{'B': 1, 'C': 2}], 'D': 3})
+    assert not matches_default({'A': [{'B': 1}]}, {'A': [{'B': 2}]})
+    assert not matches_default({'A': 1}, {})
+    assert not matches_default([{'Type': 'forward'}], {'Type': 'forward'})
+
+
+def test_engine_describes_each_type_once_per_stack(monkeypatch):
+    calls = []
+
+    def describe(resource_config, resources):
+        calls.append(sorted(resources))
+        return {physical_id: {'InstanceId': physical_id, 'InstanceType': 't3.micro', 'PrivateIpAddress': '10.0.0.1'}
+                for _, physical_id in resources}
+
+    monkeypatch.setattr(validator, 'describe_physical_resources', describe)
+    resources = {
+        'Web': {'Type': 'AWS::EC2::Instance', 'Properties': {'InstanceType': 't3.micro'}},
+        'Worker': {'Type': 'AWS::EC2::Instance',
+                   'Properties': {'InstanceType': 't3.micro', 'UserData': GetAtt('Web', 'PrivateIp')}},
+    }
+    stack_resources = {logical_id: {'ResourceType': 'AWS::EC2::Instance', 'PhysicalResourceId': f'i-{logical_id}'}
+                       for logical_id in resources}
+    engine = ValidationEngine(RESOURCE_CONFIG)
+    report = engine.validate_stack(resources, stack_resources, 'app')
+    assert calls == [[('AWS::EC2::Instance', 'i-Web'), ('AWS::EC2::Instance', 'i-Worker')]]
+    assert sorted(report.validated) == ['Web', 'Worker']
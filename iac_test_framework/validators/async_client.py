@@ -0,0 +1,240 @@
+import asyncio
+import json
+from contextlib import AsyncExitStack, aclosing
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import AioSession
+from botocore.exceptions import ClientError
+
+from .events import StackEventTailer, is_deployment_start, unseen_events
+from .engine import ResourceMismatch, ValidationReport, expected_properties_for
+from .parser import GetAtt, collect_references
+from .utils import load_resource_config
+from .validator import StackResolver, describe_batches, get_validator, response_items
+from .waiters import EXECUTION_BACKOFF, PENDING, STACK_BACKOFF, StackWait, poll_until_async, wait_stats
+
+
+class AsyncAWSClient:
+    """asyncio counterpart of AWSClient and the stack lifecycle helpers.
+
+    Clients are created lazily, one per service, and share aiohttp connection
+    pools sized by max_pool_connections. Calls to each service are bounded by
+    their own semaphore, and waits poll with asyncio.sleep, so one event loop
+    can validate many stacks and wait on many deployments at once. Pass
+    endpoint_url to point every service at a local stand-in such as moto server.
+
+        async with AsyncAWSClient(endpoint_url='http://localhost:5000') as aws:
+            stacks = await asyncio.gather(*(aws.wait_for_stack(n, 'CREATE_COMPLETE') for n in names))
+    """
+
+    def __init__(self, region_name=None, profile_name=None, endpoint_url=None, max_concurrency=10,
+                 max_pool_connections=50):
+        self.session = AioSession(profile=profile_name)
+        self.region_name = region_name
+        self.endpoint_url = endpoint_url
+        self.max_concurrency = max_concurrency
+        self.config = AioConfig(max_pool_connections=max_pool_connections)
+        self._exit_stack = AsyncExitStack()
+        self._clients = {}
+        self._semaphores = {}
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self._exit_stack.aclose()
+        self._clients.clear()
+        self._semaphores.clear()
+
+    async def get_service_client(self, service_name):
+        async with self._lock:
+            if service_name not in self._clients:
+                self._clients[service_name] = await self._exit_stack.enter_async_context(
+                    self.session.create_client(service_name, region_name=self.region_name,
+                                               endpoint_url=self.endpoint_url, config=self.config))
+                self._semaphores[service_name] = asyncio.BoundedSemaphore(self.max_concurrency)
+        return self._clients[service_name]
+
+    async def call(self, service_name, operation, **params):
+        client = await self.get_service_client(service_name)
+        async with self._semaphores[service_name]:
+            return await getattr(client, operation)(**params)
+
+    async def paginate(self, service_name, operation, **params):
+        """Yields every page of a paginated operation, holding one service slot while it runs."""
+        client = await self.get_service_client(service_name)
+        async with self._semaphores[service_name]:
+            async for page in client.get_paginator(operation).paginate(**params):
+                yield page
+
+    # Stack queries (AWSClient)
+
+    async def list_stack_resources(self, stack_name):
+        async for page in self.paginate('cloudformation', 'list_stack_resources', StackName=stack_name):
+            for resource in page['StackResourceSummaries']:
+                yield resource
+
+    async def get_stack_resources(self, stack_name):
+        return {res['LogicalResourceId']: res async for res in self.list_stack_resources(stack_name)}
+
+    async def get_stack_status(self, stack_name):
+        response = await self.call('cloudformation', 'describe_stacks', StackName=stack_name)
+        return response['Stacks'][0]['StackStatus']
+
+    async def iter_stack_events(self, stack_name, since=None, until=None, last_deployment=False):
+        """Async form of AWSClient.iter_stack_events, with the same early stop."""
+        # aclosing releases the service slot held by paginate() as soon as we stop early
+        async with aclosing(self.paginate('cloudformation', 'describe_stack_events', StackName=stack_name)) as pages:
+            async for page in pages:
+                for event in page['StackEvents']:
+                    if since is not None and event['Timestamp'] < since:
+                        return
+                    if until is not None and event['Timestamp'] > until:
+                        continue
+                    yield event
+                    if last_deployment and is_deployment_start(event):
+                        return
+
+    async def get_stack_events(self, stack_name):
+        return [event async for event in self.iter_stack_events(stack_name)]
+
+    async def iter_log_groups(self, stack_name):
+        async for page in self.paginate('logs', 'describe_log_groups',
+                                        logGroupNamePrefix=f"/aws/cloudformation/{stack_name}"):
+            for log_group in page['logGroups']:
+                yield log_group
+
+    async def get_log_groups(self, stack_name):
+        return [log_group async for log_group in self.iter_log_groups(stack_name)]
+
+    async def describe_instances(self, **params):
+        response = await self.call('ec2', 'describe_instances', **params)
+        return [instance for reservation in response['Reservations'] for instance in reservation['Instances']]
+
+    # Resource descriptions (GenericValidator)
+
+    async def get_resource_details_many(self, config, physical_ids):
+        """Describes physical_ids of one resource type, all batches concurrently, keyed by physical ID."""
+        async def describe(params):
+            client = await self.get_service_client(config['client'])
+            if client.can_paginate(config['describe_method']):
+                return [page async for page in self.paginate(config['client'], config['describe_method'], **params)]
+            return [await self.call(config['client'], config['describe_method'], **params)]
+
+        details = {}
+        for responses in await asyncio.gather(*(describe(params) for params in describe_batches(config, physical_ids))):
+            for response in responses:
+                for item in response_items(config, response):
+                    details[item[config['id_key']]] = item
+        return details
+
+    async def describe_physical_resources(self, resource_config, resources):
+        ids_by_type = {}
+        for resource_type, physical_id in resources:
+            if resource_type in resource_config:
+                ids_by_type.setdefault(resource_type, []).append(physical_id)
+        details = {}
+        for described in await asyncio.gather(*(self.get_resource_details_many(resource_config[resource_type], ids)
+                                                for resource_type, ids in ids_by_type.items())):
+            details.update(described)
+        return details
+
+    async def validate_stack(self, resources, stack_name, resource_config=None):
+        """Describes a stack's resources and GetAtt targets in bulk, then compares them offline."""
+        resource_config = resource_config or load_resource_config()
+        stack_resources = await self.get_stack_resources(stack_name)
+        logical_ids = set(resources)
+        logical_ids.update(ref.logical_id for ref in collect_references(resources) if isinstance(ref, GetAtt))
+        logical_ids &= set(stack_resources)
+        described = await self.describe_physical_resources(
+            resource_config,
+            [(stack_resources[logical_id]['ResourceType'], stack_resources[logical_id]['PhysicalResourceId'])
+             for logical_id in logical_ids])
+        # Seed misses too (as None) so the resolver never falls back to a blocking describe call.
+        resolver = StackResolver(stack_resources, resource_config)
+        resolver.seed({logical_id: described.get(stack_resources[logical_id]['PhysicalResourceId'])
+                       for logical_id in logical_ids})
+
+        report = ValidationReport(stack_name)
+        for logical_id, resource_def in resources.items():
+            resource_type = resource_def['Type']
+            if resource_type not in resource_config:
+                report.skipped[logical_id] = f"No configuration for {resource_type}"
+                continue
+            try:
+                actual_details = resolver.details(logical_id)
+                if actual_details is None:
+                    raise LookupError(f"{logical_id} was not returned by the {resource_type} describe call")
+                mismatches = get_validator(resource_type, resource_config).compare(
+                    expected_properties_for(resource_def), actual_details, stack_resources, resolver)
+            except Exception as e:
+                report.errors[logical_id] = f"{type(e).__name__}: {e}"
+                continue
+            report.mismatches.extend(ResourceMismatch(logical_id, resource_type, *m) for m in mismatches)
+            report.validated.append(logical_id)
+        return report
+
+    # Stack lifecycle (stackValid / stepfuncts)
+
+    async def deploy_stack(self, template_path, parameters, stack_name, capabilities=('CAPABILITY_IAM',)):
+        with open(template_path, 'r') as f:
+            template_body = f.read()
+        return await self.call('cloudformation', 'create_stack', StackName=stack_name, TemplateBody=template_body,
+                               Parameters=parameters, Capabilities=list(capabilities))
+
+    async def delete_stack(self, stack_name):
+        return await self.call('cloudformation', 'delete_stack', StackName=stack_name)
+
+    async def poll_stack_events(self, tailer, stack_name):
+        """Async form of tailer.poll(stack_name): the stack's events since the previous poll, oldest first."""
+        new_events = []
+        async with aclosing(self.paginate('cloudformation', 'describe_stack_events', StackName=stack_name)) as pages:
+            async for page in pages:
+                events, reached = unseen_events(page['StackEvents'], tailer.last_event_ids.get(stack_name))
+                new_events.extend(events)
+                if reached:
+                    break
+        return tailer.record(stack_name, new_events)
+
+    async def wait_for_stack(self, stack_name, status, timeout=600, backoff=STACK_BACKOFF, fail_fast=True,
+                             stats=wait_stats, after_event_id=None):
+        """waiters.wait_for_stack without blocking the event loop, deciding from events the same way."""
+        tailer = StackEventTailer(None, [stack_name])
+        stack_wait = StackWait(tailer, stack_name, status, fail_fast, after_event_id)
+
+        async def check():
+            try:
+                events = await self.poll_stack_events(tailer, stack_name)
+            except ClientError as e:
+                if stack_wait.deleted(e):
+                    return None
+                raise
+            if stack_wait.update(events) is PENDING:
+                return PENDING
+            if status == 'DELETE_COMPLETE':
+                return None
+            return (await self.call('cloudformation', 'describe_stacks', StackName=stack_name))['Stacks'][0]
+
+        return await poll_until_async(check, stack_name, timeout, backoff, stats)
+
+    async def start_step_function_execution(self, state_machine_arn, execution_input=None):
+        response = await self.call('stepfunctions', 'start_execution', stateMachineArn=state_machine_arn,
+                                   input=json.dumps(execution_input or {"example": "input"}))
+        return response['executionArn']
+
+    async def wait_for_step_function_execution(self, execution_arn, timeout=300, backoff=EXECUTION_BACKOFF,
+                                               stats=wait_stats):
+        async def check():
+            response = await self.call('stepfunctions', 'describe_execution', executionArn=execution_arn)
+            status = response['status']
+            if status == 'SUCCEEDED':
+                return response
+            elif status in ['FAILED', 'TIMED_OUT', 'ABORTED']:
+                raise Exception(f"Execution {execution_arn} failed with status {status}")
+            return PENDING
+
+        return await poll_until_async(check, execution_arn, timeout, backoff, stats)
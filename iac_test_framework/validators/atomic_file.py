@@ -0,0 +1,33 @@
+import contextlib
+import os
+import tempfile
+
+
+def _file_mode():
+    """The mode open() would give a new file; mkstemp files start out 0600."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# Read once at import: the umask can only be read by setting it, which would race with other threads.
+FILE_MODE = _file_mode()
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w', **kwargs):
+    """File object for path that replaces it only once the with block completes.
+
+    Writes go to a temporary file in the same directory, which is given
+    FILE_MODE and renamed over path, so readers never see a partial file and
+    a failure part way through leaves any previous path in place.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
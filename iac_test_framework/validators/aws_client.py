@@ -1,26 +1,141 @@
+import threading
+
 import boto3
+import botocore.session
+
+from .cassette import REPLAY, REPLAY_REGION, Cassette
+from .events import StackEventTailer, is_deployment_start
+
+
+class ClientPool:
+    """Process-wide cache of boto3 clients.
+
+    Clients are keyed by (service, region, profile, config) and built from one
+    botocore session per profile, so service models and endpoint data are only
+    loaded once. boto3 clients are thread-safe once created; creation itself is
+    serialized behind a lock because sessions are not. With a cassette, every
+    client the pool hands out records to it or replays from it; replayed
+    clients default to REPLAY_REGION when no region is configured.
+    """
+
+    def __init__(self, cassette=None):
+        self.cassette = cassette
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._clients = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _session(self, profile_name):
+        session = self._sessions.get(profile_name)
+        if session is None:
+            core_session = botocore.session.Session(profile=profile_name)
+            session = boto3.session.Session(botocore_session=core_session)
+            self._sessions[profile_name] = session
+        return session
+
+    @staticmethod
+    def _config_key(config):
+        if config is None:
+            return None
+        return repr(sorted(config._user_provided_options.items()))
+
+    def client(self, service_name, region_name=None, profile_name=None, config=None):
+        key = (service_name, region_name, profile_name, self._config_key(config))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            self.misses += 1
+            session = self._session(profile_name)
+            if region_name is None and self.cassette is not None and self.cassette.mode == REPLAY:
+                region_name = session.region_name or REPLAY_REGION
+            client = session.client(service_name, region_name=region_name, config=config)
+            if self.cassette is not None:
+                self.cassette.attach(client)
+            self._clients[key] = client
+            return client
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'clients': len(self._clients)}
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._sessions.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_client_pool():
+    """The shared ClientPool, recording or replaying when IAC_CASSETTE is set."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool(cassette=Cassette.from_env())
+        return _default_pool
 
 
 class AWSClient:
-    def __init__(self):
-        self.cfn_client = boto3.client('cloudformation')
-        self.logs_client = boto3.client('logs')
+    def __init__(self, region_name=None, profile_name=None, pool=None):
+        self.pool = pool or get_client_pool()
+        self.region_name = region_name
+        self.profile_name = profile_name
+        self.cfn_client = self.get_service_client('cloudformation')
+        self.logs_client = self.get_service_client('logs')
+
+    def list_stack_resources(self, stack_name):
+        """Yields every resource summary of a stack, one page at a time."""
+        paginator = self.cfn_client.get_paginator('list_stack_resources')
+        for page in paginator.paginate(StackName=stack_name):
+            yield from page['StackResourceSummaries']
 
     def get_stack_resources(self, stack_name):
-        response = self.cfn_client.describe_stack_resources(StackName=stack_name)
-        return {res['LogicalResourceId']: res for res in response['StackResources']}
+        return {res['LogicalResourceId']: res for res in self.list_stack_resources(stack_name)}
 
     def get_stack_status(self, stack_name):
         response = self.cfn_client.describe_stacks(StackName=stack_name)
         return response['Stacks'][0]['StackStatus']
 
+    def iter_stack_events(self, stack_name, since=None, until=None, last_deployment=False):
+        """Yields stack events newest first, optionally limited to a time window.
+
+        Paging stops as soon as an event older than `since` appears or, with
+        last_deployment, once the event that started the latest deployment has
+        been yielded, so older history is never fetched.
+        """
+        paginator = self.cfn_client.get_paginator('describe_stack_events')
+        for page in paginator.paginate(StackName=stack_name):
+            for event in page['StackEvents']:
+                if since is not None and event['Timestamp'] < since:
+                    return
+                if until is not None and event['Timestamp'] > until:
+                    continue
+                yield event
+                if last_deployment and is_deployment_start(event):
+                    return
+
     def get_stack_events(self, stack_name):
-        response = self.cfn_client.describe_stack_events(StackName=stack_name)
-        return response['StackEvents']
+        return list(self.iter_stack_events(stack_name))
+
+    def tail_stack_events(self, stack_names):
+        """Returns a StackEventTailer that yields only new events for each of stack_names."""
+        return StackEventTailer(self.cfn_client, stack_names)
+
+    def get_service_client(self, service_name, config=None):
+        return self.pool.client(service_name, region_name=self.region_name,
+                                profile_name=self.profile_name, config=config)
 
-    def get_service_client(self, service_name):
-        return boto3.client(service_name)
+    def iter_log_groups(self, stack_name):
+        paginator = self.logs_client.get_paginator('describe_log_groups')
+        for page in paginator.paginate(logGroupNamePrefix=f"/aws/cloudformation/{stack_name}"):
+            yield from page['logGroups']
 
     def get_log_groups(self, stack_name):
-        response = self.logs_client.describe_log_groups(logGroupNamePrefix=f"/aws/cloudformation/{stack_name}")
-        return response['logGroups']
+        return list(self.iter_log_groups(stack_name))
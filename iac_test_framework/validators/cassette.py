@@ -0,0 +1,141 @@
+import atexit
+import base64
+import datetime
+import gzip
+import json
+import os
+import threading
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+# Parameters that differ on every call without changing what is asked for.
+VOLATILE_PARAMS = {'ClientRequestToken', 'ClientToken', 'IdempotencyToken'}
+
+# Replayed clients still need a region to resolve endpoints; nothing is sent there.
+REPLAY_REGION = 'us-east-1'
+
+
+class ReplayedResponse:
+    """Just enough of an HTTP response for botocore to finish a replayed call."""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = b''
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Cannot record a value of type {type(value).__name__}")
+
+
+def _decode(obj):
+    if '__datetime__' in obj:
+        return datetime.datetime.fromisoformat(obj['__datetime__'])
+    if '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+def normalize_params(params):
+    """Drops idempotency tokens and orders keys so equal requests produce equal keys."""
+    if isinstance(params, dict):
+        return {key: normalize_params(value) for key, value in sorted(params.items()) if key not in VOLATILE_PARAMS}
+    if isinstance(params, (list, tuple)):
+        return [normalize_params(value) for value in params]
+    return params
+
+
+class Cassette:
+    """Recorded AWS responses keyed by service, operation and normalized parameters.
+
+    attach() hooks a botocore client's event system. In record mode every
+    response (errors included) is stored as it comes back; in replay mode
+    calls are answered from the cassette before any request is signed or
+    sent, so no credentials or network are needed. Identical calls repeated
+    during recording (e.g. polling describe_stacks) are replayed in the same
+    order, the last response repeating once they run out.
+    """
+
+    def __init__(self, path, mode=REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.interactions = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self.load()
+
+    @classmethod
+    def from_env(cls):
+        """Cassette configured by IAC_CASSETTE (path) and IAC_CASSETTE_MODE, or None."""
+        path = os.environ.get('IAC_CASSETTE')
+        if not path:
+            return None
+        cassette = cls(path, os.environ.get('IAC_CASSETTE_MODE', REPLAY))
+        if cassette.mode == RECORD:
+            atexit.register(cassette.save)
+        return cassette
+
+    @staticmethod
+    def key(service_id, operation_name, params):
+        return json.dumps([service_id, operation_name, normalize_params(params)], sort_keys=True,
+                          separators=(',', ':'), default=str)
+
+    def attach(self, client):
+        events = client.meta.events
+        events.register('before-parameter-build.*.*', self._remember_key)
+        if self.mode == RECORD:
+            events.register('after-call.*.*', self._record)
+        else:
+            events.register('before-call.*.*', self._replay)
+
+    def _remember_key(self, params, model, context, **kwargs):
+        context['cassette_key'] = self.key(model.service_model.service_id.hyphenize(), model.name, params)
+
+    def _record(self, http_response, parsed, model, context, **kwargs):
+        # Streamed bodies (e.g. s3 get_object) can only be read once, so they are not recorded.
+        if model.has_streaming_output or 'cassette_key' not in context:
+            return
+        parsed = {key: value for key, value in parsed.items() if key != 'ResponseMetadata'}
+        with self._lock:
+            self.interactions.setdefault(context['cassette_key'], []).append(
+                {'status': http_response.status_code, 'response': parsed})
+
+    def _replay(self, model, context, **kwargs):
+        key = context.get('cassette_key')
+        with self._lock:
+            responses = self.interactions.get(key)
+            if not responses:
+                raise LookupError(f"No recorded response for {model.name} in {self.path}: {key}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            interaction = responses[min(position, len(responses) - 1)]
+        parsed = dict(interaction['response'])
+        parsed['ResponseMetadata'] = {'HTTPStatusCode': interaction['status']}
+        return ReplayedResponse(interaction['status']), parsed
+
+    def rewind(self):
+        with self._lock:
+            self._positions.clear()
+
+    def _open(self, mode):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, mode + 't', encoding='utf-8')
+        return open(self.path, mode, encoding='utf-8')
+
+    def load(self):
+        with self._open('r') as f:
+            self.interactions = json.load(f, object_hook=_decode)
+        self.rewind()
+
+    def save(self):
+        with self._lock:
+            with self._open('w') as f:
+                json.dump(self.interactions, f, separators=(',', ':'), default=_encode)
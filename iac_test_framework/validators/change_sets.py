@@ -0,0 +1,94 @@
+import hashlib
+import json
+
+from botocore.exceptions import ClientError
+
+from .waiters import EXECUTION_BACKOFF, PENDING, latest_event_id, poll_until, wait_for_stack, wait_stats
+
+EMPTY_CHANGE_SET_REASONS = ("didn't contain changes", "No updates are to be performed")
+UNUSABLE_STATUSES = {'ROLLBACK_COMPLETE', 'ROLLBACK_FAILED', 'DELETE_FAILED'}
+
+
+def spec_hash(template_body, parameters):
+    """Content hash of a template body and its parameters; parameter order does not matter."""
+    digest = hashlib.sha256(template_body.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(json.dumps(sorted(parameters, key=lambda p: p['ParameterKey']), sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _describe_stack(cf_client, stack_name):
+    try:
+        return cf_client.describe_stacks(StackName=stack_name)['Stacks'][0]
+    except ClientError as e:
+        if 'does not exist' in str(e):
+            return None
+        raise
+
+
+def wait_for_change_set(cf_client, stack_name, change_set_name, timeout=300, stats=wait_stats):
+    """Waits for a change set to be computed and returns its changes, or [] when it is empty."""
+    def check():
+        response = cf_client.describe_change_set(StackName=stack_name, ChangeSetName=change_set_name)
+        status = response['Status']
+        if status == 'FAILED':
+            reason = response.get('StatusReason', '')
+            if any(empty in reason for empty in EMPTY_CHANGE_SET_REASONS):
+                return []
+            raise Exception(f"Change set {change_set_name} for {stack_name} failed: {reason}")
+        if status != 'CREATE_COMPLETE':
+            return PENDING
+        changes = list(response['Changes'])
+        while response.get('NextToken'):
+            response = cf_client.describe_change_set(StackName=stack_name, ChangeSetName=change_set_name,
+                                                     NextToken=response['NextToken'])
+            changes.extend(response['Changes'])
+        return changes
+
+    return poll_until(check, f"{stack_name}/{change_set_name}", timeout, EXECUTION_BACKOFF, stats)
+
+
+def deploy_with_change_set(cf_client, template_path, parameters, stack_name,
+                           capabilities=('CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM'), timeout=1800):
+    """Creates or updates a long-lived stack through a change set and returns (stack, changes).
+
+    An empty change set is deleted without being executed, so an unchanged
+    template costs a couple of API calls instead of a deployment. A stack
+    left in a state that cannot be updated is deleted and created again.
+    The change set is named after the template and parameters, not the
+    clock, so recorded sessions replay.
+    """
+    with open(template_path, 'r') as f:
+        template_body = f.read()
+
+    stack = _describe_stack(cf_client, stack_name)
+    if stack is not None and stack['StackStatus'] in UNUSABLE_STATUSES:
+        after_event_id = latest_event_id(cf_client, stack_name)
+        cf_client.delete_stack(StackName=stack_name)
+        wait_for_stack(cf_client, stack_name, 'DELETE_COMPLETE', timeout, after_event_id=after_event_id)
+        stack = None
+    # A stack in REVIEW_IN_PROGRESS only holds an unexecuted CREATE change set.
+    creating = stack is None or stack['StackStatus'] == 'REVIEW_IN_PROGRESS'
+
+    change_set_name = f"{stack_name}-{spec_hash(template_body, parameters)[:12]}"
+    request = dict(StackName=stack_name, ChangeSetName=change_set_name,
+                   ChangeSetType='CREATE' if creating else 'UPDATE', TemplateBody=template_body,
+                   Parameters=parameters, Capabilities=list(capabilities))
+    try:
+        cf_client.create_change_set(**request)
+    except ClientError as e:
+        if 'AlreadyExists' not in str(e):
+            raise
+        # Left behind by an earlier run that stopped before executing it.
+        cf_client.delete_change_set(StackName=stack_name, ChangeSetName=change_set_name)
+        cf_client.create_change_set(**request)
+    changes = wait_for_change_set(cf_client, stack_name, change_set_name)
+    if not changes:
+        cf_client.delete_change_set(StackName=stack_name, ChangeSetName=change_set_name)
+        return stack, changes
+
+    after_event_id = None if creating else latest_event_id(cf_client, stack_name)
+    cf_client.execute_change_set(StackName=stack_name, ChangeSetName=change_set_name)
+    stack = wait_for_stack(cf_client, stack_name, 'CREATE_COMPLETE' if creating else 'UPDATE_COMPLETE', timeout,
+                           after_event_id=after_event_id)
+    return stack, changes
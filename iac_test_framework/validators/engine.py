@@ -0,0 +1,151 @@
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from botocore.exceptions import ClientError
+
+from .parser import collect_references
+from .utils import load_resource_config
+from .validator import StackResolver, get_validator
+
+THROTTLING_ERRORS = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestLimitExceeded',
+    'RequestThrottled', 'RequestThrottledException', 'TooManyRequestsException', 'SlowDown',
+}
+
+ResourceMismatch = namedtuple('ResourceMismatch', ['logical_id', 'resource_type', 'kind', 'key', 'expected', 'actual'])
+
+
+class ValidationReport:
+    """Every mismatch, error and skip found while validating one stack."""
+
+    def __init__(self, stack_name=None):
+        self.stack_name = stack_name
+        self.validated = []
+        self.skipped = {}
+        self.errors = {}
+        self.mismatches = []
+
+    @property
+    def ok(self):
+        return not self.mismatches and not self.errors
+
+    def format(self):
+        lines = [f"Stack {self.stack_name}: {len(self.validated)} validated, {len(self.skipped)} skipped, "
+                 f"{len(self.mismatches)} mismatches, {len(self.errors)} errors"]
+        for m in sorted(self.mismatches, key=lambda m: (m.logical_id, m.kind, str(m.key))):
+            lines.append(f"  {m.logical_id} ({m.resource_type}): {m.kind} for {m.key}: "
+                         f"expected {m.expected}, got {m.actual}")
+        for logical_id, error in sorted(self.errors.items()):
+            lines.append(f"  {logical_id}: {error}")
+        return "\n".join(lines)
+
+
+def build_dependency_graph(resources):
+    """Maps each logical ID to the template resources it references through Ref/GetAtt."""
+    return {
+        logical_id: {ref.logical_id for ref in collect_references(resource_def)
+                     if ref.logical_id in resources and ref.logical_id != logical_id}
+        for logical_id, resource_def in resources.items()
+    }
+
+
+def dependency_levels(graph):
+    """Groups logical IDs into waves where every resource follows the resources it references."""
+    remaining = {logical_id: set(deps) for logical_id, deps in graph.items()}
+    levels = []
+    while remaining:
+        level = sorted(logical_id for logical_id, deps in remaining.items() if not deps)
+        if not level:
+            # Reference cycle; validate what is left together rather than never.
+            level = sorted(remaining)
+        levels.append(level)
+        for logical_id in level:
+            del remaining[logical_id]
+        for deps in remaining.values():
+            deps.difference_update(level)
+    return levels
+
+
+def expected_properties_for(resource_def):
+    resource_type = resource_def['Type']
+    expected = dict(resource_def.get('Properties', {}))
+    if 'Configuration' in resource_def:
+        expected.update(
+            resource_def['Configuration'].get(resource_type.split('::')[-1], {}).get('Properties', {}))
+    return expected
+
+
+class ValidationEngine:
+    """Validates the resources of a stack on a bounded thread pool.
+
+    The stack's resources and GetAtt targets are described once up front
+    through one StackResolver (one task per resource type), then compared
+    concurrently in dependency order. Throttled API calls are retried with
+    exponential backoff and jitter.
+    """
+
+    def __init__(self, resource_config=None, max_workers=8, max_attempts=6, base_delay=0.5, max_delay=20):
+        self.resource_config = resource_config or load_resource_config()
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _with_backoff(self, func, *args):
+        for attempt in range(self.max_attempts):
+            try:
+                return func(*args)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in THROTTLING_ERRORS or attempt == self.max_attempts - 1:
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+                time.sleep(random.uniform(delay / 2, delay))
+
+    def _validate_resource(self, resolver, logical_id, resource_def):
+        resource_type = resource_def['Type']
+        actual_details = resolver.details(logical_id)
+        if actual_details is None:
+            raise LookupError(f"{resolver.stack_resources[logical_id]['PhysicalResourceId']} "
+                              f"was not returned by the {resource_type} describe call")
+        validator = get_validator(resource_type, self.resource_config)
+        return [ResourceMismatch(logical_id, resource_type, *mismatch)
+                for mismatch in validator.compare(expected_properties_for(resource_def), actual_details,
+                                                  resolver.stack_resources, resolver)]
+
+    def validate_stack(self, resources, stack_resources, stack_name=None, resolver=None):
+        """Validates every template resource against the deployed stack and returns a ValidationReport.
+
+        Pass a resolver (e.g. StackSnapshot.resolver()) to validate against
+        details captured earlier instead of describing the stack again.
+        """
+        report = ValidationReport(stack_name)
+        resolver = resolver or StackResolver(stack_resources, self.resource_config)
+        to_validate = {}
+        for logical_id, resource_def in resources.items():
+            if resource_def['Type'] not in self.resource_config:
+                report.skipped[logical_id] = f"No configuration for {resource_def['Type']}"
+            elif logical_id not in stack_resources:
+                report.errors[logical_id] = "Resource is not part of the deployed stack"
+            else:
+                to_validate[logical_id] = resource_def
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            try:
+                self._with_backoff(resolver.prefetch, to_validate, pool)
+            except Exception:
+                # Resources left undescribed retry on their own in _validate_resource and report the error there.
+                pass
+            for level in dependency_levels(build_dependency_graph(to_validate)):
+                futures = {pool.submit(self._with_backoff, self._validate_resource, resolver, logical_id,
+                                       to_validate[logical_id]): logical_id
+                           for logical_id in level}
+                for future in as_completed(futures):
+                    logical_id = futures[future]
+                    try:
+                        report.mismatches.extend(future.result())
+                        report.validated.append(logical_id)
+                    except Exception as e:
+                        report.errors[logical_id] = f"{type(e).__name__}: {e}"
+        return report
@@ -0,0 +1,117 @@
+import time
+
+from botocore.exceptions import ClientError
+
+DEPLOYMENT_START_STATUSES = {'CREATE_IN_PROGRESS', 'UPDATE_IN_PROGRESS', 'DELETE_IN_PROGRESS', 'IMPORT_IN_PROGRESS'}
+
+
+class StackFailedError(Exception):
+    def __init__(self, stack_name, event):
+        self.stack_name = stack_name
+        self.event = event
+        super().__init__(f"Stack {stack_name} failed: {event['LogicalResourceId']} ({event['ResourceType']}) "
+                         f"{event['ResourceStatus']}: {event.get('ResourceStatusReason', '')}")
+
+
+def is_stack_event(event):
+    return event['ResourceType'] == 'AWS::CloudFormation::Stack' and event.get('PhysicalResourceId') == event['StackId']
+
+
+def is_deployment_start(event):
+    """True for the stack's own event that opens a create/update/delete/import operation."""
+    return is_stack_event(event) and event['ResourceStatus'] in DEPLOYMENT_START_STATUSES
+
+
+def is_terminal_status(status):
+    return status.endswith('_COMPLETE') or status.endswith('_FAILED')
+
+
+def unseen_events(events, last_event_id):
+    """Splits a newest-first page of events at already-seen history; returns (unseen events, reached).
+
+    reached is True once last_event_id (or, without one, the latest
+    deployment start) was found, so older pages need not be fetched.
+    """
+    unseen = []
+    for event in events:
+        if event['EventId'] == last_event_id:
+            return unseen, True
+        unseen.append(event)
+        if last_event_id is None and is_deployment_start(event):
+            return unseen, True
+    return unseen, False
+
+
+class StackEventTailer:
+    """Follows the event streams of one or more stacks, returning only events not seen before.
+
+    The last seen EventId is remembered per stack, so each poll pages through
+    describe_stack_events only until it reaches already-seen history. The
+    first poll of a stack starts at its latest deployment.
+    """
+
+    def __init__(self, cfn_client, stack_names):
+        self.cfn_client = cfn_client
+        self.stack_names = list(stack_names)
+        self.last_event_ids = {}
+        self.stack_statuses = {}
+        self.failures = {stack_name: [] for stack_name in self.stack_names}
+
+    def _unseen_events(self, stack_name, last_event_id):
+        paginator = self.cfn_client.get_paginator('describe_stack_events')
+        for page in paginator.paginate(StackName=stack_name):
+            events, reached = unseen_events(page['StackEvents'], last_event_id)
+            yield from events
+            if reached:
+                return
+
+    def poll(self, stack_name):
+        """Returns the events of stack_name that arrived since the previous poll, oldest first."""
+        return self.record(stack_name, list(self._unseen_events(stack_name, self.last_event_ids.get(stack_name))))
+
+    def record(self, stack_name, new_events):
+        """Remembers new_events (newest first, as fetched) as seen and returns them oldest first."""
+        if new_events:
+            self.last_event_ids[stack_name] = new_events[0]['EventId']
+        new_events.reverse()
+        for event in new_events:
+            if event['ResourceStatus'].endswith('_FAILED'):
+                self.failures.setdefault(stack_name, []).append(event)
+            if is_stack_event(event):
+                self.stack_statuses[stack_name] = event['ResourceStatus']
+        return new_events
+
+    def poll_all(self):
+        """Yields (stack_name, event) for every new event across all tailed stacks."""
+        for stack_name in self.stack_names:
+            for event in self.poll(stack_name):
+                yield stack_name, event
+
+    def watch(self, interval=5, timeout=600, fail_fast=True):
+        """Yields (stack_name, event) as events arrive until every stack reaches a terminal status.
+
+        With fail_fast, StackFailedError is raised at the first *_FAILED event
+        instead of waiting for the rollback to finish.
+        """
+        pending = set(self.stack_names)
+        deadline = time.time() + timeout
+        while pending:
+            for stack_name in sorted(pending):
+                try:
+                    events = self.poll(stack_name)
+                except ClientError as e:
+                    if 'does not exist' in str(e):
+                        self.stack_statuses[stack_name] = 'DELETE_COMPLETE'
+                        pending.discard(stack_name)
+                        continue
+                    raise
+                for event in events:
+                    yield stack_name, event
+                    if fail_fast and event['ResourceStatus'].endswith('_FAILED'):
+                        raise StackFailedError(stack_name, event)
+                if is_terminal_status(self.stack_statuses.get(stack_name, '')):
+                    pending.discard(stack_name)
+            if pending:
+                if time.time() >= deadline:
+                    raise TimeoutError(f"Stacks {sorted(pending)} did not finish within {timeout} seconds")
+                time.sleep(interval)
@@ -0,0 +1,180 @@
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .aws_client import get_client_pool
+from .parser import ImportValue, Sub, iter_nodes, parse_yaml
+from .waiters import latest_event_id, wait_for_stack
+
+
+class StackSpec:
+    """A template plus the parameters to deploy it with."""
+
+    def __init__(self, template_path, parameters=None, stack_name=None,
+                 capabilities=('CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM'), tags=None):
+        self.template_path = template_path
+        self.parameters = list(parameters or [])
+        self.stack_name = stack_name or f"test-stack-{uuid.uuid4().hex[:12]}"
+        self.capabilities = list(capabilities)
+        self.tags = dict(tags or {})
+        self._template_body = None
+        self._template = None
+
+    @property
+    def template_body(self):
+        if self._template_body is None:
+            with open(self.template_path, 'r') as f:
+                self._template_body = f.read()
+        return self._template_body
+
+    @property
+    def template(self):
+        if self._template is None:
+            self._template = parse_yaml(self.template_path) or {}
+        return self._template
+
+    def exports(self):
+        """Export names declared in the template's Outputs."""
+        names = set()
+        for output in (self.template.get('Outputs') or {}).values():
+            name = _literal((output.get('Export') or {}).get('Name'), self.stack_name)
+            if name is not None:
+                names.add(name)
+        return names
+
+    def imports(self):
+        """Export names this template reads with Fn::ImportValue."""
+        names = set()
+        for value in _import_values(self.template):
+            name = _literal(value, self.stack_name)
+            if name is not None:
+                names.add(name)
+        return names
+
+    def __repr__(self):
+        return f"StackSpec({self.template_path!r}, stack_name={self.stack_name!r})"
+
+
+def _literal(value, stack_name):
+    # Only plain strings and !Sub over ${AWS::StackName} can be resolved before deployment
+    if isinstance(value, dict) and 'Fn::Sub' in value:
+        value = Sub(value['Fn::Sub'])
+    if isinstance(value, Sub) and isinstance(value.template, str) and not value.variables:
+        value = value.template.replace('${AWS::StackName}', stack_name)
+        return None if '${' in value else value
+    return value if isinstance(value, str) else None
+
+
+def _import_values(node):
+    for item in iter_nodes(node):
+        if isinstance(item, ImportValue):
+            yield item.export_name
+        elif isinstance(item, dict) and 'Fn::ImportValue' in item:
+            yield item['Fn::ImportValue']
+
+
+def dependency_map(specs):
+    """Maps each spec to the specs exporting values it imports."""
+    exporters = {}
+    for spec in specs:
+        for name in spec.exports():
+            exporters[name] = spec
+    return {spec: {exporters[name] for name in spec.imports() if name in exporters and exporters[name] is not spec}
+            for spec in specs}
+
+
+def _run_in_order(specs, prerequisites, action, max_concurrency):
+    """Runs action(spec) on a thread pool once every prerequisite of spec has succeeded.
+
+    Yields (spec, result) as each finishes. Specs whose prerequisites failed
+    are never started; all errors are raised together at the end.
+    """
+    pending = list(specs)
+    succeeded, failed, errors = set(), set(), {}
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        running = {}
+        while pending or running:
+            for spec in list(pending):
+                if prerequisites[spec] & failed:
+                    pending.remove(spec)
+                    failed.add(spec)
+                    errors[spec] = "skipped because a dependency failed"
+                elif prerequisites[spec] <= succeeded:
+                    pending.remove(spec)
+                    running[pool.submit(action, spec)] = spec
+            if not running:
+                if pending:
+                    raise ValueError(f"Cyclic export/import dependencies between {pending}")
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                spec = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed.add(spec)
+                    errors[spec] = e
+                    continue
+                succeeded.add(spec)
+                yield spec, result
+    if errors:
+        raise Exception("; ".join(f"{spec.stack_name}: {error}" for spec, error in errors.items()))
+
+
+class StackOrchestrator:
+    """Creates stacks concurrently in export/import order and tears them all down together.
+
+    deploy() yields each stack as soon as it reaches CREATE_COMPLETE; stacks
+    are remembered so teardown() can delete everything in parallel, deleting
+    importers before the stacks they import from.
+    """
+
+    def __init__(self, cf_client=None, max_concurrency=4, timeout=1800):
+        self.cf_client = cf_client or get_client_pool().client('cloudformation')
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.deployed = []
+        self._lock = threading.Lock()
+
+    def _create(self, spec):
+        self.cf_client.create_stack(
+            StackName=spec.stack_name,
+            TemplateBody=spec.template_body,
+            Parameters=spec.parameters,
+            Capabilities=spec.capabilities,
+            Tags=[{'Key': key, 'Value': value} for key, value in spec.tags.items()]
+        )
+        with self._lock:
+            self.deployed.append(spec)
+        return wait_for_stack(self.cf_client, spec.stack_name, 'CREATE_COMPLETE', self.timeout)
+
+    def _delete(self, spec):
+        after_event_id = latest_event_id(self.cf_client, spec.stack_name)
+        self.cf_client.delete_stack(StackName=spec.stack_name)
+        return wait_for_stack(self.cf_client, spec.stack_name, 'DELETE_COMPLETE', self.timeout,
+                              after_event_id=after_event_id)
+
+    def deploy(self, specs):
+        """Creates every spec, at most max_concurrency at a time, yielding (spec, stack) as each is ready."""
+        specs = list(specs)
+        yield from _run_in_order(specs, dependency_map(specs), self._create, self.max_concurrency)
+
+    def deploy_one(self, spec):
+        for _, stack in self.deploy([spec]):
+            return stack
+
+    def release(self, spec):
+        """Leaves spec's stack out of teardown(), e.g. so it can be reused by a later session."""
+        with self._lock:
+            self.deployed = [deployed for deployed in self.deployed if deployed is not spec]
+
+    def teardown(self):
+        """Deletes every stack this orchestrator created, importers before exporters."""
+        with self._lock:
+            specs, self.deployed = self.deployed, []
+        importers = {spec: set() for spec in specs}
+        for spec, exporters in dependency_map(specs).items():
+            for exporter in exporters:
+                importers[exporter].add(spec)
+        for _ in _run_in_order(specs, importers, self._delete, self.max_concurrency):
+            pass
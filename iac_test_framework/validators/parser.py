@@ -1,30 +1,212 @@
+import re
+
 import yaml
 
+from .template_cache import get_template_cache
+
+try:
+    from yaml import CSafeLoader as _BaseLoader
+except ImportError:
+    from yaml import SafeLoader as _BaseLoader
+
 
 class Ref:
     def __init__(self, logical_id):
         self.logical_id = logical_id
 
+    def __eq__(self, other):
+        return type(other) is Ref and other.logical_id == self.logical_id
+
+    def __hash__(self):
+        return hash(('Ref', self.logical_id))
+
+    def __repr__(self):
+        return f"Ref({self.logical_id!r})"
+
 
 class GetAtt:
     def __init__(self, logical_id, attribute):
         self.logical_id = logical_id
         self.attribute = attribute
 
+    def __eq__(self, other):
+        return type(other) is GetAtt and (other.logical_id, other.attribute) == (self.logical_id, self.attribute)
+
+    def __hash__(self):
+        return hash(('GetAtt', self.logical_id, self.attribute))
+
+    def __repr__(self):
+        return f"GetAtt({self.logical_id!r}, {self.attribute!r})"
+
+
+class ImportValue:
+    def __init__(self, export_name):
+        self.export_name = export_name
+
+    def __eq__(self, other):
+        return type(other) is ImportValue and other.export_name == self.export_name
+
+    def __repr__(self):
+        return f"ImportValue({self.export_name!r})"
+
+
+class Sub:
+    def __init__(self, template, variables=None):
+        self.template = template
+        self.variables = variables or {}
+
+    def __eq__(self, other):
+        return type(other) is Sub and (other.template, other.variables) == (self.template, self.variables)
+
+    def __repr__(self):
+        return f"Sub({self.template!r}, {self.variables!r})"
+
+
+class Intrinsic:
+    """Any other intrinsic function, e.g. !Join [',', [a, b]] -> Intrinsic('Fn::Join', [',', ['a', 'b']])."""
+
+    def __init__(self, function, value):
+        self.function = function
+        self.value = value
+
+    def __eq__(self, other):
+        return type(other) is Intrinsic and (other.function, other.value) == (self.function, self.value)
+
+    def __repr__(self):
+        return f"Intrinsic({self.function!r}, {self.value!r})"
+
+
+def _construct(loader, node):
+    if isinstance(node, yaml.ScalarNode):
+        return loader.construct_scalar(node)
+    if isinstance(node, yaml.SequenceNode):
+        return loader.construct_sequence(node, deep=True)
+    return loader.construct_mapping(node, deep=True)
+
 
 def ref_constructor(loader, node):
     return Ref(loader.construct_scalar(node))
 
 
 def getatt_constructor(loader, node):
-    values = loader.construct_sequence(node)
+    if isinstance(node, yaml.ScalarNode):
+        # Short form: !GetAtt Resource.Attribute
+        logical_id, _, attribute = loader.construct_scalar(node).partition('.')
+        return GetAtt(logical_id, attribute)
+    values = loader.construct_sequence(node, deep=True)
     return GetAtt(values[0], values[1])
 
 
-yaml.add_constructor('!Ref', ref_constructor)
-yaml.add_constructor('!GetAtt', getatt_constructor)
+def importvalue_constructor(loader, node):
+    return ImportValue(_construct(loader, node))
+
+
+def sub_constructor(loader, node):
+    if isinstance(node, yaml.ScalarNode):
+        return Sub(loader.construct_scalar(node))
+    values = loader.construct_sequence(node, deep=True)
+    return Sub(values[0], values[1] if len(values) > 1 else None)
+
+
+def intrinsic_constructor(loader, tag_suffix, node):
+    # !Condition is the only short form without the Fn:: prefix
+    function = tag_suffix if tag_suffix == 'Condition' else f"Fn::{tag_suffix}"
+    return Intrinsic(function, _construct(loader, node))
+
+
+class CloudFormationLoader(_BaseLoader):
+    """Safe YAML loader for CloudFormation templates, backed by libyaml when it is installed.
+
+    Every short-form intrinsic tag is constructed into a typed node. The
+    constructors are registered on this class only, so yaml.Loader and
+    yaml.SafeLoader are left as they are.
+    """
+
+
+CloudFormationLoader.add_constructor('!Ref', ref_constructor)
+CloudFormationLoader.add_constructor('!GetAtt', getatt_constructor)
+CloudFormationLoader.add_constructor('!ImportValue', importvalue_constructor)
+CloudFormationLoader.add_constructor('!Sub', sub_constructor)
+CloudFormationLoader.add_multi_constructor('!', intrinsic_constructor)
+
+
+# ${Name} or ${Resource.Attribute} in a !Sub template; ${!Literal} is escaped text.
+_SUB_VARIABLE = re.compile(r"\$\{([^!}][^}]*)\}")
+
+
+def iter_nodes(node):
+    """Yields node and every node beneath it in document order, including intrinsic function arguments."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, Intrinsic):
+            stack.append(node.value)
+        elif isinstance(node, Sub):
+            stack.extend([node.variables, node.template])
+        elif isinstance(node, ImportValue):
+            stack.append(node.export_name)
+
+
+def _sub_references(sub):
+    for name in _SUB_VARIABLE.findall(sub.template):
+        name = name.strip()
+        if name in sub.variables:
+            continue
+        logical_id, _, attribute = name.partition('.')
+        if attribute and not name.startswith('AWS::'):
+            yield GetAtt(logical_id, attribute)
+        else:
+            yield Ref(name)
+
+
+def _long_form(node):
+    # JSON-style {'Ref': ...}, {'Fn::GetAtt': ...} and {'Fn::Sub': ...} as the equivalent typed node.
+    (function, value), = node.items()
+    if function == 'Ref' and isinstance(value, str):
+        return Ref(value)
+    if function == 'Fn::GetAtt':
+        if isinstance(value, str):
+            logical_id, _, attribute = value.partition('.')
+            return GetAtt(logical_id, attribute)
+        if isinstance(value, list) and len(value) == 2:
+            return GetAtt(value[0], value[1])
+    if function == 'Fn::Sub':
+        if isinstance(value, list) and value:
+            return Sub(value[0], value[1] if len(value) > 1 and isinstance(value[1], dict) else None)
+        return Sub(value)
+    return None
+
+
+def collect_references(node):
+    """Yields every Ref and GetAtt found anywhere under a parsed template node.
+
+    References nested in other intrinsics (!Select [0, !GetAtt Vpc.CidrBlock])
+    are included, as are the ${Name} and ${Resource.Attribute} variables of
+    !Sub templates that its variables map does not define. Long-form
+    {'Ref': ...}, {'Fn::GetAtt': ...} and {'Fn::Sub': ...} mappings count too.
+    """
+    for item in iter_nodes(node):
+        if isinstance(item, dict) and len(item) == 1:
+            item = _long_form(item)
+        if isinstance(item, (Ref, GetAtt)):
+            yield item
+        elif isinstance(item, Sub) and isinstance(item.template, str):
+            yield from _sub_references(item)
+
+
+def load_template(stream):
+    """Parses a template from a string or open file."""
+    return yaml.load(stream, Loader=CloudFormationLoader)
+
 
+def parse_yaml(file_path, cache=None):
+    """Parses a template file, reusing the cached tree while its content is unchanged.
 
-def parse_yaml(file_path):
-    with open(file_path, 'r') as file:
-        return yaml.load(file, Loader=yaml.Loader)
+    The returned tree may be shared with other callers; copy it before changing it.
+    """
+    return (cache or get_template_cache()).load(file_path, CloudFormationLoader)
@@ -0,0 +1,200 @@
+import functools
+import re
+
+_NAME = re.compile(r"[^.\[\]]+")
+_FILTER = re.compile(r"\s*([^=!\]]+?)\s*(!?=)\s*(.*?)\s*$")
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+class _Child:
+    def __init__(self, name):
+        self.name = name
+
+    def apply(self, path, value):
+        if isinstance(value, dict) and self.name in value:
+            yield path + (self.name,), value[self.name]
+
+
+class _Wildcard:
+    def apply(self, path, value):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                yield path + (key,), child
+        elif isinstance(value, list):
+            for index, child in enumerate(value):
+                yield path + (index,), child
+
+
+class _Descendants:
+    def apply(self, path, value):
+        stack = [(path, value)]
+        while stack:
+            path, value = stack.pop()
+            yield path, value
+            if isinstance(value, dict):
+                stack.extend(reversed([(path + (key,), child) for key, child in value.items()]))
+            elif isinstance(value, list):
+                stack.extend(reversed([(path + (index,), child) for index, child in enumerate(value)]))
+
+
+class _Index:
+    def __init__(self, index):
+        self.index = index
+
+    def apply(self, path, value):
+        if isinstance(value, list) and -len(value) <= self.index < len(value):
+            yield path + (self.index % len(value),), value[self.index]
+
+
+class _Filter:
+    def __init__(self, key_path, negate, expected):
+        self.key_path = key_path
+        self.negate = negate
+        self.expected = expected
+
+    def matches(self, value):
+        for key in self.key_path:
+            if not isinstance(value, dict) or key not in value:
+                return self.negate
+            value = value[key]
+        equal = value == self.expected or str(value) == self.expected
+        return equal != self.negate
+
+    def apply(self, path, value):
+        # On a list the filter selects items; on anything else it keeps or drops the node itself.
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                if self.matches(item):
+                    yield path + (index,), item
+        elif self.matches(value):
+            yield path, value
+
+
+def _parse_bracket(content):
+    content = content.strip()
+    if content == '*':
+        return _Wildcard()
+    if re.fullmatch(r"-?\d+", content):
+        return _Index(int(content))
+    match = _FILTER.match(content)
+    if not match:
+        raise QuerySyntaxError(f"Unsupported selector [{content}]")
+    key, operator, expected = match.groups()
+    if len(expected) >= 2 and expected[0] == expected[-1] and expected[0] in "'\"":
+        expected = expected[1:-1]
+    return _Filter(tuple(key.split('.')), operator == '!=', expected)
+
+
+def _parse(expression):
+    steps = []
+    position = 0
+    expect_name = True
+    while position < len(expression):
+        char = expression[position]
+        if char == '.':
+            if expect_name:
+                raise QuerySyntaxError(f"Empty segment at {position} in {expression!r}")
+            expect_name = True
+            position += 1
+        elif char == '[':
+            end = expression.find(']', position)
+            if end < 0:
+                raise QuerySyntaxError(f"Unclosed [ at {position} in {expression!r}")
+            steps.append(_parse_bracket(expression[position + 1:end]))
+            expect_name = False
+            position = end + 1
+        else:
+            match = _NAME.match(expression, position)
+            if match is None:
+                raise QuerySyntaxError(f"Unexpected {char!r} at {position} in {expression!r}")
+            name = match.group(0)
+            if name == '*':
+                steps.append(_Wildcard())
+            elif name == '**':
+                steps.append(_Descendants())
+            else:
+                steps.append(_Child(name))
+            expect_name = False
+            position = match.end()
+    if expect_name and steps:
+        raise QuerySyntaxError(f"Trailing '.' in {expression!r}")
+    return steps
+
+
+class Query:
+    """A compiled path expression over parsed templates or boto3 responses.
+
+    Segments are separated by dots: a key name, * for every child of a
+    mapping or list, and ** for a node and all of its descendants. Brackets
+    follow a segment: [0] or [-1] index a list, [*] expands it, and
+    [Key=Value] / [Key!=Value] filter (list items, or the node itself):
+
+        Resources.*[Type=AWS::EC2::Subnet].Properties.CidrBlock
+        Reservations[*].Instances[*].SecurityGroups[GroupName=default].GroupId
+        **.ImageId
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.steps = _parse(expression)
+
+    def find_paths(self, data):
+        """(path, value) for every match, path being a tuple of keys and list indices."""
+        matches = [((), data)]
+        for step in self.steps:
+            matches = [match for path, value in matches for match in step.apply(path, value)]
+        return matches
+
+    def find(self, data):
+        return [value for _, value in self.find_paths(data)]
+
+    def first(self, data, default=None):
+        for _, value in self.find_paths(data):
+            return value
+        return default
+
+    def project(self, data):
+        """The minimal branch of data leading to each match (see minimal_branch)."""
+        return [minimal_branch(data, path) for path, _ in self.find_paths(data)]
+
+    def __repr__(self):
+        return f"Query({self.expression!r})"
+
+
+@functools.lru_cache(maxsize=512)
+def compile_query(expression):
+    return Query(expression)
+
+
+def query(data, expression):
+    return compile_query(expression).find(data)
+
+
+def minimal_branch(data, path):
+    """Rebuilds data along path only, keeping the scalar siblings at each level as context.
+
+    Lists along the path keep only the item on the path. Returns None when
+    path does not exist in data.
+    """
+    if not path:
+        return data
+    key, rest = path[0], path[1:]
+    if isinstance(data, dict) and key in data:
+        child = minimal_branch(data[key], rest)
+        if child is None and rest:
+            return None
+        branch = {k: v for k, v in data.items() if not isinstance(v, (dict, list))}
+        branch[key] = child
+        return branch
+    if isinstance(data, list) and isinstance(key, int) and -len(data) <= key < len(data):
+        child = minimal_branch(data[key], rest)
+        return None if child is None and rest else [child]
+    return None
+
+
+def to_subscript(path):
+    """Python subscript text for a path, e.g. ['Reservations'][0]['Instances']."""
+    return ''.join(f"[{part}]" if isinstance(part, int) else f"[{part!r}]" for part in path)
@@ -0,0 +1,116 @@
+import json
+import time
+
+from .aws_client import get_client_pool
+from .utils import load_resource_config
+from .validator import GenericValidator, StackResolver, describe_physical_resources
+
+# Security groups are captured for the instances that use them, not validated
+# as template resources, so they stay out of config/aws_resources.yaml.
+SECURITY_GROUP_CONFIG = {
+    'client': 'ec2',
+    'describe_method': 'describe_security_groups',
+    'id_param': 'GroupIds',
+    'response_key': 'SecurityGroups',
+    'id_key': 'GroupId',
+    'batch_size': 200,
+}
+
+
+class StackSnapshot:
+    """A single capture of a stack: metadata, outputs, resources and their described details.
+
+    capture() fetches everything in bulk (one describe_stacks, one paginated
+    list_stack_resources and one batched describe per resource type), after
+    which every query is answered from memory. save()/load() keep a snapshot
+    on disk so a stack can be re-validated later without AWS access.
+    """
+
+    def __init__(self, stack, resources, physical_resources, captured_at=None):
+        self.stack = stack
+        self.resources = resources
+        self.physical_resources = physical_resources
+        self.captured_at = captured_at if captured_at is not None else time.time()
+
+    @classmethod
+    def capture(cls, stack_name, resource_config=None, pool=None):
+        pool = pool or get_client_pool()
+        resource_config = resource_config or load_resource_config()
+        cf_client = pool.client('cloudformation')
+
+        stack = cf_client.describe_stacks(StackName=stack_name)['Stacks'][0]
+        resources = {}
+        for page in cf_client.get_paginator('list_stack_resources').paginate(StackName=stack_name):
+            for resource in page['StackResourceSummaries']:
+                resources[resource['LogicalResourceId']] = resource
+        physical_resources = describe_physical_resources(
+            resource_config,
+            [(resource['ResourceType'], resource['PhysicalResourceId'])
+             for resource in resources.values() if resource.get('PhysicalResourceId')])
+
+        group_ids = [resource['PhysicalResourceId'] for resource in resources.values()
+                     if resource['ResourceType'] == 'AWS::EC2::SecurityGroup' and resource.get('PhysicalResourceId')]
+        group_ids.extend(group['GroupId'] for details in physical_resources.values()
+                         for group in details.get('SecurityGroups', []) if 'GroupId' in group)
+        if group_ids:
+            physical_resources.update(
+                GenericValidator(SECURITY_GROUP_CONFIG, pool).get_resource_details_many(group_ids))
+        return cls(stack, resources, physical_resources)
+
+    @property
+    def stack_name(self):
+        return self.stack['StackName']
+
+    @property
+    def status(self):
+        return self.stack['StackStatus']
+
+    @property
+    def outputs(self):
+        return {output['OutputKey']: output['OutputValue'] for output in self.stack.get('Outputs', [])}
+
+    @property
+    def resource_types(self):
+        return {resource['ResourceType'] for resource in self.resources.values()}
+
+    def physical_id(self, logical_id):
+        return self.resources[logical_id]['PhysicalResourceId']
+
+    def details(self, logical_id):
+        """Described details of a stack resource, or None when its type is not captured."""
+        return self.physical_resources.get(self.physical_id(logical_id))
+
+    def instance(self, instance_id):
+        return self.physical_resources[instance_id]
+
+    def security_group(self, group_id):
+        return self.physical_resources[group_id]
+
+    def resolver(self, resource_config=None):
+        """A StackResolver answering every describe from this snapshot instead of AWS."""
+        resolver = StackResolver(self.resources, resource_config)
+        resolver.seed({logical_id: self.physical_resources.get(resource.get('PhysicalResourceId'))
+                       for logical_id, resource in self.resources.items()})
+        return resolver
+
+    def to_dict(self):
+        return {
+            'stack': self.stack,
+            'resources': self.resources,
+            'physical_resources': self.physical_resources,
+            'captured_at': self.captured_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['stack'], data['resources'], data['physical_resources'], data.get('captured_at'))
+
+    def save(self, path):
+        # Timestamps come back from botocore as datetimes and are stored as strings.
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
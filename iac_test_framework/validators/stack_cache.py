@@ -0,0 +1,141 @@
+import os
+import re
+import threading
+from concurrent.futures import Future
+
+from botocore.exceptions import ClientError
+
+from .change_sets import deploy_with_change_set, spec_hash
+from .orchestrator import StackSpec
+from .waiters import latest_event_id, wait_for_stack
+
+SPEC_HASH_TAG = 'iac-test:spec-hash'
+REUSABLE_STATUSES = {'CREATE_COMPLETE', 'UPDATE_COMPLETE'}
+
+
+class StackCache:
+    """Deploys each unique (template, parameters) at most once and hands the same stack to every caller.
+
+    Stacks are created through the orchestrator and torn down with it at the
+    end of the session. With keep=True they are instead named and tagged after
+    their hash, left running, and reused by later sessions for as long as the
+    template and parameters hash the same. With in_place=True each template
+    and parameter set gets one long-lived stack named after the template
+    file, brought up to date with a change set that is only executed when it
+    is not empty.
+    """
+
+    def __init__(self, orchestrator, keep=False, in_place=False, prefix='iac-test'):
+        self.orchestrator = orchestrator
+        self.keep = keep
+        self.in_place = in_place
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._stacks = {}
+        # spec hash -> Future of a stack deployed by deploy_all()
+        self._batched = {}
+        self._batches = []
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _key(self, template_path, parameters):
+        with open(template_path, 'r') as f:
+            template_body = f.read()
+        key = spec_hash(template_body, parameters)
+        with self._lock:
+            return key, self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, template_path, parameters=None):
+        """Returns the described stack for template_path and parameters, deploying it on first use."""
+        parameters = list(parameters or [])
+        key, key_lock = self._key(template_path, parameters)
+        future = self._batched.get(key)
+        if future is not None:
+            self.hits += 1
+            return future.result()
+        with key_lock:
+            if key in self._stacks:
+                self.hits += 1
+                return self._stacks[key]
+            self.misses += 1
+            self._stacks[key] = self._deploy(template_path, parameters, key)
+            return self._stacks[key]
+
+    def deploy_all(self, requests):
+        """Starts deploying every (template_path, parameters) in requests that is not cached yet, and returns.
+
+        The specs go to the orchestrator as one batch in the background, so
+        independent stacks are created in parallel and importers wait for their
+        exporters. get() for one of them waits only for that stack, and
+        re-raises the batch's error if it failed. Kept and in-place stacks are
+        left to get(), one at a time.
+        """
+        if self.keep or self.in_place:
+            return
+        specs = {}
+        for template_path, parameters in requests:
+            parameters = list(parameters or [])
+            key, key_lock = self._key(template_path, parameters)
+            with key_lock:
+                if key not in self._stacks and key not in self._batched:
+                    specs[StackSpec(template_path, parameters)] = key
+                    self._batched[key] = Future()
+        if specs:
+            batch = threading.Thread(target=self._deploy_batch, args=(specs,), daemon=True)
+            self._batches.append(batch)
+            batch.start()
+
+    def _deploy_batch(self, specs):
+        try:
+            for spec, stack in self.orchestrator.deploy(specs):
+                self.misses += 1
+                self._stacks[specs[spec]] = stack
+                self._batched[specs[spec]].set_result(stack)
+        except Exception as e:
+            for key in specs.values():
+                if not self._batched[key].done():
+                    self._batched[key].set_exception(e)
+
+    def wait(self):
+        """Waits for every batch started by deploy_all(), e.g. before the stacks are torn down."""
+        for batch in self._batches:
+            batch.join()
+
+    def _describe(self, stack_name):
+        try:
+            return self.orchestrator.cf_client.describe_stacks(StackName=stack_name)['Stacks'][0]
+        except ClientError as e:
+            if 'does not exist' in str(e):
+                return None
+            raise
+
+    def _deploy(self, template_path, parameters, key):
+        if self.in_place:
+            stem = re.sub(r'[^A-Za-z0-9-]', '-', os.path.splitext(os.path.basename(template_path))[0])
+            stack_name = f"{self.prefix}-{stem}-{spec_hash('', parameters)[:8]}"
+            stack, _ = deploy_with_change_set(self.orchestrator.cf_client, template_path, parameters, stack_name,
+                                              timeout=self.orchestrator.timeout)
+            return stack
+        if not self.keep:
+            return self.orchestrator.deploy_one(StackSpec(template_path, parameters))
+
+        spec = StackSpec(template_path, parameters, stack_name=f"{self.prefix}-{key[:16]}", tags={SPEC_HASH_TAG: key})
+        existing = self._describe(spec.stack_name)
+        if existing is not None:
+            tags = {tag['Key']: tag['Value'] for tag in existing.get('Tags', [])}
+            if tags.get(SPEC_HASH_TAG) == key and existing['StackStatus'] in REUSABLE_STATUSES:
+                return existing
+            # A failed or foreign stack under our name; replace it.
+            cf_client = self.orchestrator.cf_client
+            after_event_id = latest_event_id(cf_client, spec.stack_name)
+            cf_client.delete_stack(StackName=spec.stack_name)
+            wait_for_stack(cf_client, spec.stack_name, 'DELETE_COMPLETE', self.orchestrator.timeout,
+                           after_event_id=after_event_id)
+        try:
+            return self.orchestrator.deploy_one(spec)
+        finally:
+            self.orchestrator.release(spec)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stacks': len(self._stacks)}
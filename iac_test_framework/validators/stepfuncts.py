@@ -1,42 +1,13 @@
 import pytest
-import boto3
-from botocore.exceptions import ClientError
-import time
 import json
 
-
-# Utility Functions
-def deploy_stack(template_path, parameters, stack_name):
-    """Deploys a CloudFormation stack from a YAML template."""
-    with open(template_path, 'r') as f:
-        template_body = f.read()
-    cf_client = boto3.client('cloudformation')
-    cf_client.create_stack(
-        StackName=stack_name,
-        TemplateBody=template_body,
-        Parameters=parameters,
-        Capabilities=['CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM']
-    )
-
-
-def wait_for_stack(cf_client, stack_name, status, timeout=600):
-    """Waits for the stack to reach a specified status."""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            stack = cf_client.describe_stacks(StackName=stack_name)['Stacks'][0]
-            if stack['StackStatus'] == status:
-                return stack
-            elif stack['StackStatus'] in ['CREATE_FAILED', 'ROLLBACK_COMPLETE']:
-                raise Exception(f"Stack {stack_name} failed with status {stack['StackStatus']}")
-            time.sleep(10)
-        except ClientError as e:
-            if 'does not exist' in str(e) and status == 'DELETE_COMPLETE':
-                return
-            raise
-    raise TimeoutError(f"Stack {stack_name} did not reach {status} within {timeout} seconds")
+from .aws_client import get_client_pool
+from .snapshot import StackSnapshot
+from .stack_cache import REUSABLE_STATUSES
+from .waiters import wait_for_step_function_execution
 
 
+# Utility Functions
 def get_stack_outputs(stack):
     """Extracts outputs from the stack."""
     return {output['OutputKey']: output['OutputValue'] for output in stack.get('Outputs', [])}
@@ -44,7 +15,7 @@ def get_stack_outputs(stack):
 
 def start_step_function_execution(state_machine_arn):
     """Starts a Step Functions execution."""
-    sfn_client = boto3.client('stepfunctions')
+    sfn_client = get_client_pool().client('stepfunctions')
     response = sfn_client.start_execution(
         stateMachineArn=state_machine_arn,
         input=json.dumps({"example": "input"})
@@ -52,48 +23,18 @@ def start_step_function_execution(state_machine_arn):
     return response['executionArn']
 
 
-def wait_for_step_function_execution(execution_arn, timeout=300):
-    """Waits for the Step Functions execution to succeed."""
-    sfn_client = boto3.client('stepfunctions')
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        response = sfn_client.describe_execution(executionArn=execution_arn)
-        status = response['status']
-        if status == 'SUCCEEDED':
-            return response
-        elif status in ['FAILED', 'TIMED_OUT', 'ABORTED']:
-            raise Exception(f"Execution {execution_arn} failed with status {status}")
-        time.sleep(5)
-    raise TimeoutError(f"Execution {execution_arn} did not succeed within {timeout} seconds")
-
-
-def validate_ec2_instance(instance_id, expected_instance_type, expected_key_name):
-    """Validates minimal EC2 instance properties."""
-    ec2_client = boto3.client('ec2')
-    instance = ec2_client.describe_instances(InstanceIds=[instance_id])['Reservations'][0]['Instances'][0]
+def validate_ec2_instance(instance_id, expected_instance_type, expected_key_name, snapshot=None):
+    """Validates minimal EC2 instance properties, from snapshot when one is given."""
+    if snapshot is not None:
+        instance = snapshot.instance(instance_id)
+    else:
+        ec2_client = get_client_pool().client('ec2')
+        instance = ec2_client.describe_instances(InstanceIds=[instance_id])['Reservations'][0]['Instances'][0]
     assert instance['State']['Name'] == 'running', "Instance is not running"
     assert instance['InstanceType'] == expected_instance_type, f"Expected {expected_instance_type}"
     assert instance['KeyName'] == expected_key_name, f"Expected key {expected_key_name}"
 
 
-# Pytest Fixture
-@pytest.fixture
-def deployed_stack(request):
-    """Deploys and cleans up a CloudFormation stack."""
-    template_path = request.param['template_path']
-    parameters = request.param.get('parameters', [])
-    stack_name = f"test-stack-{int(time.time())}"
-
-    deploy_stack(template_path, parameters, stack_name)
-    cf_client = boto3.client('cloudformation')
-    stack = wait_for_stack(cf_client, stack_name, 'CREATE_COMPLETE')
-
-    yield stack
-
-    cf_client.delete_stack(StackName=stack_name)
-    wait_for_stack(cf_client, stack_name, 'DELETE_COMPLETE')
-
-
 # Test Class
 class TestStepFunctionDeployment:
     @pytest.mark.parametrize('deployed_stack', [{
@@ -102,7 +43,7 @@ class TestStepFunctionDeployment:
     }], indirect=True)
     def test_stack_status(self, deployed_stack):
         """Validates stack creation status."""
-        assert deployed_stack['StackStatus'] == 'CREATE_COMPLETE', "Stack not in CREATE_COMPLETE status"
+        assert deployed_stack['StackStatus'] in REUSABLE_STATUSES, f"Stack is {deployed_stack['StackStatus']}"
 
     @pytest.mark.parametrize('deployed_stack', [{
         'template_path': 'stepfunction_template.yaml',
@@ -121,18 +62,18 @@ class TestStepFunctionDeployment:
         'template_path': 'stepfunction_template.yaml',
         'parameters': [{'ParameterKey': 'KeyName', 'ParameterValue': 'my-key-pair'}]
     }], indirect=True)
-    def test_ec2_instance(self, deployed_stack):
+    def test_ec2_instance(self, deployed_stack, stack_snapshot):
         """Validates EC2 instance properties."""
-        outputs = get_stack_outputs(deployed_stack)
-        validate_ec2_instance(outputs['InstanceId'], 't2.micro', 'my-key-pair')
+        outputs = stack_snapshot.outputs
+        validate_ec2_instance(outputs['InstanceId'], 't2.micro', 'my-key-pair', snapshot=stack_snapshot)
 
     @pytest.mark.parametrize('deployed_stack', [{
         'template_path': 'stepfunction_template.yaml',
         'parameters': [{'ParameterKey': 'KeyName', 'ParameterValue': 'my-key-pair'}]
     }], indirect=True)
-    def test_stack_outputs(self, deployed_stack):
+    def test_stack_outputs(self, deployed_stack, stack_snapshot):
         """Validates stack outputs."""
-        outputs = get_stack_outputs(deployed_stack)
+        outputs = stack_snapshot.outputs
         assert 'InstanceId' in outputs, "Missing InstanceId"
         assert 'PublicIP' in outputs, "Missing PublicIP"
         assert 'StateMachineArn' in outputs, "Missing StateMachineArn"
@@ -141,11 +82,9 @@ class TestStepFunctionDeployment:
         'template_path': 'stepfunction_template.yaml',
         'parameters': [{'ParameterKey': 'KeyName', 'ParameterValue': 'my-key-pair'}]
     }], indirect=True)
-    def test_stack_resources(self, deployed_stack):
+    def test_stack_resources(self, deployed_stack, stack_snapshot):
         """Validates stack resources."""
-        cf_client = boto3.client('cloudformation')
-        resources = cf_client.describe_stack_resources(StackName=deployed_stack['StackName'])['StackResources']
-        resource_types = {res['ResourceType'] for res in resources}
+        resource_types = stack_snapshot.resource_types
         expected_types = {
             'AWS::EC2::Instance',
             'AWS::EC2::SecurityGroup',
@@ -156,26 +95,24 @@ class TestStepFunctionDeployment:
 
 
 # To validate an existing stack independently
-def validate_existing_stack(stack_name):
-    cf_client = boto3.client('cloudformation')
-    sfn_client = boto3.client('stepfunctions')
+def validate_existing_stack(stack_name, snapshot=None):
+    """Validates a stack from one StackSnapshot; pass a loaded snapshot to skip the describe calls."""
+    snapshot = snapshot or StackSnapshot.capture(stack_name)
 
     # Check stack status
-    stack = cf_client.describe_stacks(StackName=stack_name)['Stacks'][0]
-    assert stack['StackStatus'] == 'CREATE_COMPLETE', f"Stack status is {stack['StackStatus']}"
+    assert snapshot.status in REUSABLE_STATUSES, f"Stack status is {snapshot.status}"
 
     # Get outputs and validate Step Functions
-    outputs = get_stack_outputs(stack)
+    outputs = snapshot.outputs
     execution_arn = start_step_function_execution(outputs['StateMachineArn'])
     execution = wait_for_step_function_execution(execution_arn)
     assert execution['status'] == 'SUCCEEDED', "Step Function execution failed"
 
     # Validate EC2
-    validate_ec2_instance(outputs['InstanceId'], 't2.micro', 'my-key-pair')
+    validate_ec2_instance(outputs['InstanceId'], 't2.micro', 'my-key-pair', snapshot=snapshot)
 
     # Check stack resources
-    resources = cf_client.describe_stack_resources(StackName=stack_name)['StackResources']
-    resource_types = {res['ResourceType'] for res in resources}
+    resource_types = snapshot.resource_types
     expected_types = {
         'AWS::EC2::Instance', 'AWS::EC2::SecurityGroup',
         'AWS::IAM::Role', 'AWS::StepFunctions::StateMachine'
@@ -0,0 +1,143 @@
+import yaml
+from yaml.events import (AliasEvent, DocumentStartEvent, MappingEndEvent, MappingStartEvent, ScalarEvent,
+                         SequenceEndEvent, SequenceStartEvent)
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+from .parser import CloudFormationLoader
+
+
+class _Composer:
+    """Turns the events of one matched value into a node, the way yaml.compose would."""
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.anchors = {}
+
+    def _tag(self, kind, event, value=None):
+        if event.tag is None or event.tag == '!':
+            return self.loader.resolve(kind, value, event.implicit)
+        return event.tag
+
+    def compose(self, event, events):
+        if isinstance(event, AliasEvent):
+            if event.anchor not in self.anchors:
+                raise ValueError(f"Alias *{event.anchor} on line {event.start_mark.line + 1} refers to an anchor "
+                                 f"that is not defined earlier in the document")
+            return self.anchors[event.anchor]
+        if isinstance(event, ScalarEvent):
+            node = ScalarNode(self._tag(ScalarNode, event, event.value), event.value, event.start_mark,
+                              event.end_mark, style=event.style)
+        elif isinstance(event, SequenceStartEvent):
+            node = SequenceNode(self._tag(SequenceNode, event), [], event.start_mark, None,
+                                flow_style=event.flow_style)
+            for child in events:
+                if isinstance(child, SequenceEndEvent):
+                    break
+                node.value.append(self.compose(child, events))
+        else:
+            node = MappingNode(self._tag(MappingNode, event), [], event.start_mark, None,
+                               flow_style=event.flow_style)
+            for child in events:
+                if isinstance(child, MappingEndEvent):
+                    break
+                node.value.append((self.compose(child, events), self.compose(next(events), events)))
+        if getattr(event, 'anchor', None):
+            self.anchors[event.anchor] = node
+        return node
+
+
+def _skip(event, events):
+    if isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+        depth = 1
+        for child in events:
+            if isinstance(child, (MappingStartEvent, SequenceStartEvent)):
+                depth += 1
+            elif isinstance(child, (MappingEndEvent, SequenceEndEvent)):
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def _matches(node, path, keys, constructor):
+    """Yields (path, value) for matching keys inside an already composed node."""
+    if isinstance(node, MappingNode):
+        for key_node, value_node in node.value:
+            if not isinstance(key_node, ScalarNode):
+                continue
+            child_path = path + (key_node.value,)
+            if key_node.value in keys:
+                yield child_path, constructor.construct_document(value_node)
+            else:
+                yield from _matches(value_node, child_path, keys, constructor)
+    elif isinstance(node, SequenceNode):
+        for index, item in enumerate(node.value):
+            yield from _matches(item, path + (index,), keys, constructor)
+
+
+def extract(stream, keys, loader=CloudFormationLoader):
+    """Yields (path, value) for every mapping key in keys while the document is being read.
+
+    Only the values of matching keys are built; everything else is skipped at
+    the event level, so memory follows the size of the matches rather than of
+    the document. Paths are tuples of keys and list indices, as in
+    TemplateIndex. Occurrences nested inside a match are part of that match
+    and are not yielded again.
+
+    Anchored values are built whole wherever they are, so that aliases
+    anywhere later in the document resolve as they would in a full load;
+    matches inside them, or inside an alias to them, are still yielded.
+    """
+    keys = set(keys)
+    constructor = loader('')
+    composer = _Composer(constructor)
+    events = iter(yaml.parse(stream, Loader=loader))
+    # One frame per open collection: [path, is_mapping, next list index or pending mapping key]
+    frames = []
+    for event in events:
+        if isinstance(event, (MappingEndEvent, SequenceEndEvent)):
+            frames.pop()
+            continue
+        if not isinstance(event, (ScalarEvent, MappingStartEvent, SequenceStartEvent, AliasEvent)):
+            if isinstance(event, DocumentStartEvent):
+                composer.anchors.clear()
+            continue  # stream and document boundaries
+
+        if frames and frames[-1][1]:
+            frame = frames[-1]
+            if frame[2] is None:
+                # A mapping key; complex keys are skipped along with their value.
+                if isinstance(event, ScalarEvent):
+                    frame[2] = event.value
+                    if event.anchor:
+                        composer.compose(event, events)
+                else:
+                    _skip(event, events)
+                    _skip(next(events), events)
+                continue
+            path = frame[0] + (frame[2],)
+            matched = frame[2] in keys
+            frame[2] = None
+        elif frames:
+            frame = frames[-1]
+            path = frame[0] + (frame[2],)
+            frame[2] += 1
+            matched = False
+        else:
+            path = ()
+            matched = False
+
+        if matched:
+            node = composer.compose(event, events)
+            yield path, constructor.construct_document(node)
+        elif event.anchor:
+            # An alias, or an anchored value later aliases may refer to
+            yield from _matches(composer.compose(event, events), path, keys, constructor)
+        elif isinstance(event, MappingStartEvent):
+            frames.append([path, True, None])
+        elif isinstance(event, SequenceStartEvent):
+            frames.append([path, False, 0])
+
+
+def extract_file(file_path, keys, loader=CloudFormationLoader):
+    with open(file_path, 'rb') as stream:
+        yield from extract(stream, keys, loader)
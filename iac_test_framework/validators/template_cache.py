@@ -0,0 +1,111 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import yaml
+
+from .atomic_file import atomic_write
+
+# Bump when loaders change what they produce, so stale disk entries are ignored.
+CACHE_VERSION = 1
+
+
+class TemplateCache:
+    """Parsed YAML trees keyed by the sha256 of the file content and the loader used.
+
+    Lookups go through an in-memory LRU of max_entries trees and then, when
+    cache_dir is set, through pickled trees on disk, so an unchanged template
+    is parsed once and reused by later calls and later sessions. Cached trees
+    are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=128, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content, loader):
+        # The loader's import path is part of the key: the same class imported under two
+        # module names (validators.parser vs iac_test_framework.validators.parser) must not share pickles.
+        namespace = f"{CACHE_VERSION}:{loader.__module__}.{loader.__qualname__}"
+        return hashlib.sha256(namespace.encode('utf-8') + b'\0' + content).hexdigest()
+
+    def load(self, file_path, loader=yaml.SafeLoader):
+        """Returns the parsed content of file_path, parsing it only if this content was never seen."""
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        key = self.key(content, loader)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        tree = self._read_disk(key)
+        if tree is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            tree = yaml.load(content, Loader=loader)
+            with self._lock:
+                self.misses += 1
+            self._write_disk(key, tree)
+        self._remember(key, tree)
+        return tree
+
+    def _remember(self, key, tree):
+        with self._lock:
+            self._entries[key] = tree
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def _write_disk(self, key, tree):
+        if not self.cache_dir or tree is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Written atomically so concurrent sessions never read a partial pickle.
+        with atomic_write(self._disk_path(key), 'wb') as f:
+            pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_template_cache():
+    """The shared TemplateCache; IAC_TEMPLATE_CACHE_DIR turns on its disk layer."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TemplateCache(cache_dir=os.environ.get('IAC_TEMPLATE_CACHE_DIR') or None)
+        return _default_cache
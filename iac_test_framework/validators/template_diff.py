@@ -0,0 +1,181 @@
+import argparse
+from collections import namedtuple
+
+from .parser import GetAtt, ImportValue, Intrinsic, Ref, Sub, parse_yaml
+from .template_index import format_path
+
+# List items are matched across versions by the first of these keys that
+# identifies every item of both lists, e.g. Tags by Key.
+IDENTITY_KEYS = ('LogicalId', 'Key', 'ParameterKey', 'OutputKey', 'Name', 'Id')
+
+# kind is 'added', 'removed' or 'changed'; path is a tuple of keys and list indices.
+Change = namedtuple('Change', ['kind', 'path', 'old', 'new'])
+
+
+# Scalar types hashed inline rather than through a call per leaf.
+_SCALARS = frozenset([str, int, float, bool, type(None)])
+
+
+class _Hasher:
+    """Structural hashes of every subtree, computed bottom-up once and memoized by node identity."""
+
+    def __init__(self):
+        self._memo = {}
+
+    def _child(self, node):
+        cls = type(node)
+        # type() keeps 1, 1.0 and True apart, as YAML does.
+        return hash((cls, node)) if cls in _SCALARS else self(node)
+
+    def __call__(self, node):
+        if isinstance(node, (dict, list)):
+            key = id(node)
+            entry = self._memo.get(key)
+            if entry is None:
+                child = self._child
+                if isinstance(node, dict):
+                    # Mappings compare regardless of key order.
+                    value = hash((dict, frozenset([(k, child(v)) for k, v in node.items()])))
+                else:
+                    value = hash((list, tuple([child(item) for item in node])))
+                # The node is kept alive alongside its hash so its id cannot be reused.
+                entry = self._memo[key] = (node, value)
+            return entry[1]
+        if isinstance(node, Ref):
+            return hash(('Ref', node.logical_id))
+        if isinstance(node, GetAtt):
+            return hash(('GetAtt', node.logical_id, node.attribute))
+        if isinstance(node, ImportValue):
+            return hash(('ImportValue', self(node.export_name)))
+        if isinstance(node, Sub):
+            return hash(('Sub', self(node.template), self(node.variables)))
+        if isinstance(node, Intrinsic):
+            return hash((node.function, self(node.value)))
+        return hash((type(node), node))
+
+
+def _identity_key(old_items, new_items):
+    items = old_items + new_items
+    if not items or not all(isinstance(item, dict) for item in items):
+        return None
+    for key in IDENTITY_KEYS:
+        if all(key in item for item in items):
+            old_ids = [item[key] for item in old_items]
+            new_ids = [item[key] for item in new_items]
+            try:
+                if len(set(old_ids)) == len(old_ids) and len(set(new_ids)) == len(new_ids):
+                    return key
+            except TypeError:
+                continue  # unhashable identity values
+    return None
+
+
+class TemplateDiff:
+    """Structural diff of two parsed templates (or any parsed YAML/JSON).
+
+    Every subtree is hashed once, so equal subtrees are skipped without being
+    walked. Mappings are compared key by key. List items are matched by an
+    identity key (see IDENTITY_KEYS) when one is available; otherwise equal
+    items are matched regardless of order and the rest are paired in order.
+    """
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+        self._hash = _Hasher()
+
+    def changes(self):
+        changes = []
+        self._diff(self.old, self.new, (), changes)
+        return changes
+
+    def _same(self, old, new):
+        # Equal hashes only make equality likely (hash(-1) == hash(-2)); == confirms it.
+        return old is new or (self._hash(old) == self._hash(new) and type(old) is type(new) and old == new)
+
+    def _diff(self, old, new, path, changes):
+        if self._same(old, new):
+            return
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key, old_value in old.items():
+                if key not in new:
+                    changes.append(Change('removed', path + (key,), old_value, None))
+                else:
+                    self._diff(old_value, new[key], path + (key,), changes)
+            for key, new_value in new.items():
+                if key not in old:
+                    changes.append(Change('added', path + (key,), None, new_value))
+        elif isinstance(old, list) and isinstance(new, list):
+            self._diff_lists(old, new, path, changes)
+        else:
+            changes.append(Change('changed', path, old, new))
+
+    def _diff_lists(self, old, new, path, changes):
+        key = _identity_key(old, new)
+        if key is not None:
+            old_by_id = {item[key]: index for index, item in enumerate(old)}
+            new_ids = set()
+            for new_index, item in enumerate(new):
+                new_ids.add(item[key])
+                if item[key] in old_by_id:
+                    self._diff(old[old_by_id[item[key]]], item, path + (new_index,), changes)
+                else:
+                    changes.append(Change('added', path + (new_index,), None, item))
+            for identity, old_index in old_by_id.items():
+                if identity not in new_ids:
+                    changes.append(Change('removed', path + (old_index,), old[old_index], None))
+            return
+
+        # No identity key: equal items match in any order, leftovers pair up positionally.
+        unmatched_old = {}
+        for index, item in enumerate(old):
+            unmatched_old.setdefault(self._hash(item), []).append(index)
+        leftover_new = []
+        for index, item in enumerate(new):
+            candidates = unmatched_old.get(self._hash(item), ())
+            for position, old_index in enumerate(candidates):
+                if self._same(old[old_index], item):
+                    del candidates[position]
+                    break
+            else:
+                leftover_new.append(index)
+        leftover_old = sorted(index for indices in unmatched_old.values() for index in indices)
+        for old_index, new_index in zip(leftover_old, leftover_new):
+            self._diff(old[old_index], new[new_index], path + (new_index,), changes)
+        for old_index in leftover_old[len(leftover_new):]:
+            changes.append(Change('removed', path + (old_index,), old[old_index], None))
+        for new_index in leftover_new[len(leftover_old):]:
+            changes.append(Change('added', path + (new_index,), None, new[new_index]))
+
+
+def diff(old, new):
+    """Returns the list of Change records turning old into new."""
+    return TemplateDiff(old, new).changes()
+
+
+def diff_files(old_path, new_path):
+    return diff(parse_yaml(old_path), parse_yaml(new_path))
+
+
+def format_change(change):
+    if change.kind == 'added':
+        return f"+ {format_path(change.path)}: {change.new!r}"
+    if change.kind == 'removed':
+        return f"- {format_path(change.path)}: {change.old!r}"
+    return f"~ {format_path(change.path)}: {change.old!r} -> {change.new!r}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structural diff of two CloudFormation templates.")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args()
+    changes = diff_files(args.old, args.new)
+    for change in changes:
+        print(format_change(change))
+    if not changes:
+        print("The two YAML files are identical.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import sys
+
+
+def format_path(path, separator='>'):
+    """Renders a path tuple the way Yxam.py prints it, e.g. Resources>Web>Properties>Tags>[0]>Key."""
+    return separator.join(f"[{part}]" if isinstance(part, int) else str(part) for part in path)
+
+
+class TemplateIndex:
+    """Every mapping key of a parsed template, indexed in one walk over the tree.
+
+    Each occurrence is stored as (path, value) where path is a tuple of keys
+    and list indices, e.g. ('Resources', 'Web', 'Properties', 'Tags', 0, 'Key').
+    String keys are interned, so repeated names like Type or Properties are
+    held once. Lookups by exact key cost O(matches); substring lookups only
+    scan the distinct keys. Results keep document order.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._entries = []
+        self._positions = {}
+        self._build(data)
+
+    def _build(self, data):
+        # Iterative pre-order walk: a key is recorded before anything beneath it and
+        # before its later siblings, the same order the old recursive helpers returned.
+        stack = [((), data, False)]
+        while stack:
+            path, node, is_entry = stack.pop()
+            if is_entry:
+                self._positions.setdefault(path[-1], []).append(len(self._entries))
+                self._entries.append((path, node))
+            if isinstance(node, dict):
+                stack.extend(reversed([(path + (sys.intern(key) if isinstance(key, str) else key,), value, True)
+                                       for key, value in node.items()]))
+            elif isinstance(node, list):
+                stack.extend((path + (index,), item, False) for index, item in reversed(list(enumerate(node)))
+                             if isinstance(item, (dict, list)))
+
+    def keys(self):
+        return self._positions.keys()
+
+    def paths(self, key):
+        """(path, value) for every occurrence of key."""
+        return [self._entries[position] for position in self._positions.get(key, ())]
+
+    def values(self, key):
+        return [self._entries[position][1] for position in self._positions.get(key, ())]
+
+    def search(self, fragment):
+        """(path, value) for every key equal to fragment or, for string keys, containing it."""
+        positions = []
+        for key, key_positions in self._positions.items():
+            if key == fragment or (isinstance(fragment, str) and isinstance(key, str) and fragment in key):
+                positions.extend(key_positions)
+        return [self._entries[position] for position in sorted(positions)]
@@ -1,6 +1,22 @@
+import os
+import threading
+
 import yaml
 
+RESOURCE_CONFIG_PATH = 'config/aws_resources.yaml'
+
+_config_cache = {}
+_config_lock = threading.Lock()
+
 
-def load_resource_config():
-    with open('config/aws_resources.yaml', 'r') as f:
-        return yaml.safe_load(f)
+def load_resource_config(path=RESOURCE_CONFIG_PATH):
+    """Returns the parsed resource config, re-reading the file only when its mtime changes."""
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    with _config_lock:
+        cached = _config_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r') as f:
+                cached = (mtime, yaml.safe_load(f))
+            _config_cache[path] = cached
+        return cached[1]
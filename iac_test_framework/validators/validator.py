@@ -1,11 +1,23 @@
-import yaml
-from aws_client import AWSClient
+import threading
+from concurrent.futures import as_completed
+
+from .aws_client import get_client_pool
+from .parser import Ref, GetAtt, collect_references
+from .utils import load_resource_config
 
 
 class GenericValidator:
-    def __init__(self, config):
+    def __init__(self, config, pool=None):
         self.config = config
-        self.client = AWSClient().get_service_client(config['client'])
+        self.pool = pool
+        self._client = None
+
+    @property
+    def client(self):
+        # Created on first use, so comparing against snapshots never builds a client.
+        if self._client is None:
+            self._client = (self.pool or get_client_pool()).client(self.config['client'])
+        return self._client
 
     def get_resource_details(self, physical_id):
         method = getattr(self.client, self.config['describe_method'])
@@ -21,42 +33,53 @@ class GenericValidator:
                 return response['Listeners'][0]
         raise NotImplementedError(f"Unsupported service: {self.config['client']}")
 
-    def resolve_value(self, value, stack_resources):
+    def get_resource_details_many(self, physical_ids):
+        """Describes many resources in chunks of the service's batch limit, keyed by physical ID."""
+        method_name = self.config['describe_method']
+        details = {}
+        for params in describe_batches(self.config, physical_ids):
+            if self.client.can_paginate(method_name):
+                responses = self.client.get_paginator(method_name).paginate(**params)
+            else:
+                responses = [getattr(self.client, method_name)(**params)]
+            for response in responses:
+                for item in response_items(self.config, response):
+                    details[item[self.config['id_key']]] = item
+        return details
+
+    def resolve_value(self, value, stack_resources, resolver=None):
         if isinstance(value, (str, int)):
             return str(value)
         elif isinstance(value, Ref):
             return stack_resources[value.logical_id]['PhysicalResourceId']
         elif isinstance(value, GetAtt):
-            ref_resource = stack_resources[value.logical_id]
-            ref_physical_id = ref_resource['PhysicalResourceId']
-            ref_type = ref_resource['ResourceType']
-            with open('config/aws_resources.yaml', 'r') as f:
-                resource_config = yaml.safe_load(f)
-            ref_config = resource_config[ref_type]
-            ref_details = GenericValidator(ref_config).get_resource_details(ref_physical_id)
-            attr_key = self.config['attribute_mapping'].get(value.attribute)
-            return ref_details[attr_key]
+            resolver = resolver or StackResolver(stack_resources)
+            return resolver.get_att(value.logical_id, value.attribute)
         raise ValueError(f"Unsupported value type: {type(value)}")
 
-    def validate(self, expected_properties, actual_details, stack_resources):
-        # Validate properties
-        global prop
+    def compare(self, expected_properties, actual_details, stack_resources, resolver=None):
+        """Returns every (kind, key, expected, actual) mismatch instead of stopping at the first one.
+
+        Pass the stack's StackResolver so GetAtt targets are described once
+        per stack; without one, a resolver is made for this call alone.
+        """
+        mismatches = []
+        if resolver is None and any(isinstance(ref, GetAtt) for ref in collect_references(expected_properties)):
+            resolver = StackResolver(stack_resources)
         for prop, value in expected_properties.items():
-            expected_value = self.resolve_value(value, stack_resources)
+            if prop == 'Tags':
+                continue
+            expected_value = self.resolve_value(value, stack_resources, resolver)
             actual_value = actual_details.get(self.config['property_mapping'].get(prop, prop))
             if expected_value != actual_value:
-                raise AssertionError(f"Mismatch for {prop}: expected {expected_value}, got {actual_value}")
+                mismatches.append(('Mismatch', prop, expected_value, actual_value))
 
         for default_prop, default_value in self.config['defaults'].items():
-            if prop not in expected_properties:
+            if default_prop not in expected_properties:
                 actual_value = actual_details.get(default_prop)
-                if isinstance(default_value, dict):
-                    if actual_value != default_value:
-                        raise AssertionError(
-                            f"Default mismatch for {default_prop}: expected {default_value}, got {actual_value}")
-                elif actual_value not in default_value:
-                    raise AssertionError(
-                        f"Default mismatch for {default_prop}: expected {default_value}, got {actual_value}")
+                # Properties the describe call does not return cannot be checked against a default.
+                if actual_value is not None and not matches_default(default_value, actual_value):
+                    mismatches.append(('Default mismatch', default_prop, default_value, actual_value))
 
         # Validate tags (if specified)
         if 'Tags' in expected_properties:
@@ -64,4 +87,159 @@ class GenericValidator:
             expected_tags = {tag['Key']: tag['Value'] for tag in expected_properties['Tags']}
             for key, value in expected_tags.items():
                 if actual_tags.get(key) != value:
-                    raise AssertionError(f"Tag mismatch for {key}: expected {value}, got {actual_tags.get(key)}")
+                    mismatches.append(('Tag mismatch', key, value, actual_tags.get(key)))
+        return mismatches
+
+    def validate(self, expected_properties, actual_details, stack_resources, resolver=None):
+        mismatches = self.compare(expected_properties, actual_details, stack_resources, resolver)
+        if mismatches:
+            kind, key, expected_value, actual_value = mismatches[0]
+            raise AssertionError(f"{kind} for {key}: expected {expected_value}, got {actual_value}")
+
+
+def matches_default(default_value, actual_value):
+    """Whether actual_value satisfies a configured default.
+
+    A dict default only constrains the keys it names, and every item of a
+    list default must match some item of the actual list, so
+    [{Type: forward}] accepts a forward action that also has an ARN and Order.
+    """
+    if isinstance(default_value, dict):
+        return isinstance(actual_value, dict) and all(
+            key in actual_value and matches_default(value, actual_value[key]) for key, value in default_value.items())
+    if isinstance(default_value, list):
+        return isinstance(actual_value, list) and all(
+            any(matches_default(item, actual_item) for actual_item in actual_value) for item in default_value)
+    return actual_value == default_value
+
+
+def describe_batches(config, physical_ids):
+    """Yields describe-call parameters for physical_ids, deduplicated and chunked at batch_size."""
+    ids = list(dict.fromkeys(physical_ids))
+    batch_size = config.get('batch_size', 100)
+    for start in range(0, len(ids), batch_size):
+        yield {config['id_param']: ids[start:start + batch_size]}
+
+
+def response_items(config, response):
+    # response_key may be dotted (e.g. Reservations.Instances) to flatten nested lists
+    items = [response]
+    for key in config['response_key'].split('.'):
+        items = [child for item in items for child in item.get(key, [])]
+    return items
+
+
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def get_validator(resource_type, resource_config=None):
+    """Returns a shared GenericValidator for resource_type, rebuilt only when its config entry changes."""
+    config = (resource_config or load_resource_config())[resource_type]
+    with _validators_lock:
+        validator = _validators.get(resource_type)
+        if validator is None or validator.config is not config:
+            validator = GenericValidator(config)
+            _validators[resource_type] = validator
+        return validator
+
+
+def describe_physical_resources(resource_config, resources):
+    """Describes (resource_type, physical_id) pairs with one batched call per type and chunk."""
+    ids_by_type = {}
+    for resource_type, physical_id in resources:
+        if resource_type in resource_config:
+            ids_by_type.setdefault(resource_type, []).append(physical_id)
+    details = {}
+    for resource_type, physical_ids in ids_by_type.items():
+        details.update(get_validator(resource_type, resource_config).get_resource_details_many(physical_ids))
+    return details
+
+
+class StackResolver:
+    """Per-stack cache of described resources and resolved GetAtt values.
+
+    Every remote resource is described at most once for the lifetime of the
+    resolver, even by concurrent callers. Create one per stack and call
+    prefetch() once to describe a whole template in one batch per type.
+    """
+
+    def __init__(self, stack_resources, resource_config=None):
+        self.stack_resources = stack_resources
+        self.resource_config = resource_config or load_resource_config()
+        self._details = {}
+        self._values = {}
+        # logical ID -> Event set once the thread describing it is done
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, template_resources, pool=None):
+        """Describes every template resource and every GetAtt target in bulk.
+
+        With an executor as pool, each resource type is described as its own task.
+        """
+        logical_ids = set(template_resources)
+        logical_ids.update(ref.logical_id for ref in collect_references(template_resources)
+                           if isinstance(ref, GetAtt))
+        if pool is None:
+            self.describe(logical_ids)
+            return
+        ids_by_type = {}
+        for logical_id in logical_ids & set(self.stack_resources):
+            ids_by_type.setdefault(self.stack_resources[logical_id]['ResourceType'], []).append(logical_id)
+        for future in as_completed([pool.submit(self.describe, ids) for ids in ids_by_type.values()]):
+            future.result()
+
+    def describe(self, logical_ids):
+        """Describes the resources not described yet, waiting on those another thread is describing."""
+        logical_ids = [logical_id for logical_id in logical_ids if logical_id in self.stack_resources]
+        while True:
+            missing, in_flight = [], []
+            with self._lock:
+                for logical_id in logical_ids:
+                    if logical_id in self._details:
+                        continue
+                    if logical_id in self._in_flight:
+                        in_flight.append(self._in_flight[logical_id])
+                    else:
+                        self._in_flight[logical_id] = threading.Event()
+                        missing.append(logical_id)
+            if missing:
+                self._describe_missing(missing)
+            if not in_flight:
+                return
+            # Anything the other thread failed to describe is picked up on the next pass.
+            for event in in_flight:
+                event.wait()
+
+    def _describe_missing(self, missing):
+        pairs = [(self.stack_resources[logical_id]['ResourceType'], self.stack_resources[logical_id]['PhysicalResourceId'])
+                 for logical_id in missing]
+        try:
+            described = describe_physical_resources(self.resource_config, pairs)
+            with self._lock:
+                for logical_id, (_, physical_id) in zip(missing, pairs):
+                    self._details.setdefault(logical_id, described.get(physical_id))
+        finally:
+            with self._lock:
+                for logical_id in missing:
+                    self._in_flight.pop(logical_id).set()
+
+    def seed(self, details):
+        """Adds resource details described elsewhere (e.g. by the async client), keyed by logical ID."""
+        with self._lock:
+            for logical_id, resource_details in details.items():
+                self._details.setdefault(logical_id, resource_details)
+
+    def details(self, logical_id):
+        if logical_id not in self._details:
+            self.describe([logical_id])
+        return self._details.get(logical_id)
+
+    def get_att(self, logical_id, attribute):
+        key = (logical_id, attribute)
+        if key not in self._values:
+            ref_type = self.stack_resources[logical_id]['ResourceType']
+            attr_key = get_validator(ref_type, self.resource_config).config['attribute_mapping'].get(attribute)
+            self._values[key] = self.details(logical_id)[attr_key]
+        return self._values[key]
@@ -0,0 +1,251 @@
+import asyncio
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError, WaiterError
+
+from .aws_client import get_client_pool
+from .cassette import REPLAY
+from .events import StackEventTailer, StackFailedError, is_stack_event, is_terminal_status
+
+PENDING = object()
+
+NATIVE_STACK_WAITERS = {
+    'CREATE_COMPLETE': 'stack_create_complete',
+    'UPDATE_COMPLETE': 'stack_update_complete',
+    'DELETE_COMPLETE': 'stack_delete_complete',
+    'IMPORT_COMPLETE': 'stack_import_complete',
+}
+# The stack event that opens the operation each target status completes.
+OPERATION_START_STATUSES = {
+    'CREATE_COMPLETE': 'CREATE_IN_PROGRESS',
+    'UPDATE_COMPLETE': 'UPDATE_IN_PROGRESS',
+    'DELETE_COMPLETE': 'DELETE_IN_PROGRESS',
+    'IMPORT_COMPLETE': 'IMPORT_IN_PROGRESS',
+}
+
+
+class Backoff:
+    """Exponential backoff with jitter: each delay grows by `factor` up to `cap` seconds."""
+
+    def __init__(self, initial=2.0, factor=1.5, cap=30.0, jitter=0.2):
+        self.initial = initial
+        self.factor = factor
+        self.cap = cap
+        self.jitter = jitter
+
+    def delays(self):
+        delay = self.initial
+        while True:
+            yield delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay = min(self.cap, delay * self.factor)
+
+
+STACK_BACKOFF = Backoff(initial=2.0, factor=1.5, cap=30.0)
+EXECUTION_BACKOFF = Backoff(initial=0.5, factor=2.0, cap=10.0)
+# Replayed responses are already final, so there is nothing to wait for between polls.
+REPLAY_BACKOFF = Backoff(initial=0.0, factor=1.0, cap=0.0, jitter=0.0)
+
+
+class WaitStats:
+    """Time spent waiting and number of polls, per waited-on stack or execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = {}
+
+    def record(self, key, polls, waited, elapsed):
+        with self._lock:
+            record = self.records.setdefault(key, {'waits': 0, 'polls': 0, 'waited': 0.0, 'elapsed': 0.0})
+            record['waits'] += 1
+            record['polls'] += polls or 0
+            record['waited'] += waited
+            record['elapsed'] += elapsed
+
+    def summary(self):
+        with self._lock:
+            lines = [f"{key}: {r['waits']} waits, {r['polls']} polls, {r['elapsed']:.1f}s elapsed, "
+                     f"{r['waited']:.1f}s asleep" for key, r in sorted(self.records.items())]
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+wait_stats = WaitStats()
+
+
+def _backoff_for(backoff):
+    cassette = get_client_pool().cassette
+    if cassette is not None and cassette.mode == REPLAY:
+        return REPLAY_BACKOFF
+    return backoff
+
+
+def poll_until(check, key, timeout, backoff=STACK_BACKOFF, stats=wait_stats):
+    """Calls check() until it returns something other than PENDING, or raises TimeoutError.
+
+    Sleeps between polls follow `backoff` but never run past the overall
+    deadline. Polls and time spent are recorded in `stats` under `key`.
+    """
+    backoff = _backoff_for(backoff)
+    start = time.monotonic()
+    deadline = start + timeout
+    delays = backoff.delays()
+    polls = 0
+    waited = 0.0
+    try:
+        while True:
+            polls += 1
+            result = check()
+            if result is not PENDING:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{key} did not finish within {timeout} seconds")
+            delay = min(next(delays), remaining)
+            time.sleep(delay)
+            waited += delay
+    finally:
+        stats.record(key, polls, waited, time.monotonic() - start)
+
+
+async def poll_until_async(check, key, timeout, backoff=STACK_BACKOFF, stats=wait_stats):
+    """poll_until for a coroutine check(), sleeping with asyncio.sleep so the event loop keeps running."""
+    backoff = _backoff_for(backoff)
+    start = time.monotonic()
+    deadline = start + timeout
+    delays = backoff.delays()
+    polls = 0
+    waited = 0.0
+    try:
+        while True:
+            polls += 1
+            result = await check()
+            if result is not PENDING:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{key} did not finish within {timeout} seconds")
+            delay = min(next(delays), remaining)
+            await asyncio.sleep(delay)
+            waited += delay
+    finally:
+        stats.record(key, polls, waited, time.monotonic() - start)
+
+
+class StackWait:
+    """Decides from a stack's new events whether wait_for_stack is done, whoever fetches the events.
+
+    Feed each poll's events from tailer.poll() or tailer.record() to
+    update(), which returns PENDING until the awaited operation finishes and
+    raises if it fails. Events before the stack event that opens the awaited
+    operation (e.g. DELETE_IN_PROGRESS for DELETE_COMPLETE) are ignored, so
+    the previous deployment's history never ends or fails the wait.
+    """
+
+    def __init__(self, tailer, stack_name, status, fail_fast=True, after_event_id=None):
+        self.tailer = tailer
+        self.stack_name = stack_name
+        self.status = status
+        self.fail_fast = fail_fast
+        if after_event_id is not None:
+            tailer.last_event_ids[stack_name] = after_event_id
+        self.start_status = OPERATION_START_STATUSES.get(status)
+        self.started = self.start_status is None
+
+    def deleted(self, error):
+        """Whether error, raised while polling, means the awaited delete is over."""
+        return 'does not exist' in str(error) and self.status == 'DELETE_COMPLETE'
+
+    def update(self, events):
+        for event in events:
+            if is_stack_event(event) and event['ResourceStatus'] == self.start_status:
+                self.started = True
+            elif self.started and self.fail_fast and event['ResourceStatus'].endswith('_FAILED'):
+                raise StackFailedError(self.stack_name, event)
+        if not self.started:
+            return PENDING
+        current_status = self.tailer.stack_statuses.get(self.stack_name, '')
+        if not is_terminal_status(current_status):
+            return PENDING
+        if current_status != self.status:
+            raise Exception(f"Stack {self.stack_name} failed with status {current_status}")
+        return current_status
+
+
+def _wait_natively(cf_client, stack_name, status, timeout, backoff, stats):
+    delay = max(1, int(backoff.initial))
+    start = time.monotonic()
+    try:
+        cf_client.get_waiter(NATIVE_STACK_WAITERS[status]).wait(
+            StackName=stack_name, WaiterConfig={'Delay': delay, 'MaxAttempts': max(1, int(timeout // delay))})
+    except WaiterError as e:
+        raise Exception(f"Stack {stack_name} did not reach {status}: {e}")
+    finally:
+        stats.record(stack_name, None, 0.0, time.monotonic() - start)
+    if status != 'DELETE_COMPLETE':
+        return cf_client.describe_stacks(StackName=stack_name)['Stacks'][0]
+
+
+def latest_event_id(cf_client, stack_name):
+    """Returns the stack's newest EventId, or None when the stack has no events or does not exist."""
+    try:
+        events = cf_client.describe_stack_events(StackName=stack_name)['StackEvents']
+    except ClientError as e:
+        if 'does not exist' in str(e):
+            return None
+        raise
+    return events[0]['EventId'] if events else None
+
+
+def wait_for_stack(cf_client, stack_name, status, timeout=600, backoff=STACK_BACKOFF, fail_fast=True,
+                   use_native_waiter=False, stats=wait_stats, after_event_id=None):
+    """Waits for the stack to reach a specified status and returns the described stack.
+
+    Polls the stack's event stream with `backoff`, failing at the first
+    *_FAILED event when fail_fast is set; events from before the awaited
+    operation are ignored (see StackWait). Passing latest_event_id() from
+    before the call that starts the operation as after_event_id also skips
+    that history outright. use_native_waiter hands the wait to botocore's
+    built-in waiter instead.
+    """
+    if use_native_waiter and status in NATIVE_STACK_WAITERS:
+        return _wait_natively(cf_client, stack_name, status, timeout, backoff, stats)
+
+    tailer = StackEventTailer(cf_client, [stack_name])
+    stack_wait = StackWait(tailer, stack_name, status, fail_fast, after_event_id)
+
+    def check():
+        try:
+            events = tailer.poll(stack_name)
+        except ClientError as e:
+            if stack_wait.deleted(e):
+                return None
+            raise
+        if stack_wait.update(events) is PENDING:
+            return PENDING
+        if status == 'DELETE_COMPLETE':
+            return None
+        return cf_client.describe_stacks(StackName=stack_name)['Stacks'][0]
+
+    return poll_until(check, stack_name, timeout, backoff, stats)
+
+
+def wait_for_step_function_execution(execution_arn, timeout=300, sfn_client=None, backoff=EXECUTION_BACKOFF,
+                                     stats=wait_stats):
+    """Waits for the Step Functions execution to succeed."""
+    sfn_client = sfn_client or get_client_pool().client('stepfunctions')
+
+    def check():
+        response = sfn_client.describe_execution(executionArn=execution_arn)
+        status = response['status']
+        if status == 'SUCCEEDED':
+            return response
+        elif status in ['FAILED', 'TIMED_OUT', 'ABORTED']:
+            raise Exception(f"Execution {execution_arn} failed with status {status}")
+        return PENDING
+
+    return poll_until(check, execution_arn, timeout, backoff, stats)
@@ -0,0 +1,204 @@
+"""Renders components, parses them and resolves their Fn::Pipeline::* lookups in memory.
+
+    python pipeline.py component.yaml --vars vars.yaml --stub
+
+Fn::Pipeline::ImageId {Name: ...} becomes the ImageId of the newest AMI with
+that name and Fn::Pipeline::SubnetId {NetworkZone: ...} the SubnetId of a
+subnet tagged with that zone. Lookups go through a resolver shared by every
+component a Pipeline expands, so each distinct lookup hits AWS once.
+"""
+import argparse
+import hashlib
+import json
+import pprint
+import threading
+
+import yaml
+
+from iac_test_framework.validators.parser import CloudFormationLoader
+from renderer import Renderer, load_vars
+
+PIPELINE_PREFIX = 'Fn::Pipeline::'
+
+
+def _lookup_key(args):
+    # Single-argument lookups such as {Name: amazon-linux-2} are keyed by the value alone.
+    if isinstance(args, dict) and len(args) == 1:
+        args = next(iter(args.values()))
+    return args if isinstance(args, str) else json.dumps(args, sort_keys=True, default=repr)
+
+
+def collect_lookups(tree):
+    """(container, key, function, args) for every Fn::Pipeline::* block in tree, in document order."""
+    lookups = []
+    # Children are pushed in reverse so they are popped, and their lookups recorded, in document order.
+    stack = [(None, None, tree)]
+    while stack:
+        container, key, node = stack.pop()
+        if (container is not None and isinstance(node, dict) and len(node) == 1
+                and isinstance(next(iter(node)), str) and next(iter(node)).startswith(PIPELINE_PREFIX)):
+            function, args = next(iter(node.items()))
+            lookups.append((container, key, function[len(PIPELINE_PREFIX):], args))
+        elif isinstance(node, dict):
+            stack.extend((node, child_key, value) for child_key, value in reversed(list(node.items())))
+        elif isinstance(node, list):
+            stack.extend((node, index, value) for index, value in reversed(list(enumerate(node))))
+    return lookups
+
+
+class StubResolver:
+    """Resolves lookups from fixed tables, or to stable fake IDs derived from the lookup."""
+
+    PREFIXES = {'ImageId': 'ami', 'SubnetId': 'subnet'}
+
+    def __init__(self, values=None):
+        # values: {'ImageId': {'amazon-linux-2': 'ami-123'}, 'SubnetId': {'private': 'subnet-456'}}
+        self.values = values or {}
+
+    def resolve(self, function, args):
+        key = _lookup_key(args)
+        table = self.values.get(function, {})
+        if key in table:
+            return table[key]
+        digest = hashlib.sha1(f"{function}:{key}".encode('utf-8')).hexdigest()[:17]
+        return f"{self.PREFIXES.get(function, function.lower())}-{digest}"
+
+
+class EC2Resolver:
+    """Resolves ImageId and SubnetId lookups with describe_images / describe_subnets.
+
+    resolve_many answers every lookup of one function with a single request.
+    """
+
+    def __init__(self, pool=None, region_name=None, owners=('self', 'amazon'), network_zone_tag='NetworkZone'):
+        if pool is None:
+            from iac_test_framework.validators.aws_client import get_client_pool
+            pool = get_client_pool()
+        self.ec2 = pool.client('ec2', region_name=region_name)
+        self.owners = list(owners)
+        self.network_zone_tag = network_zone_tag
+
+    def resolve(self, function, args):
+        return self.resolve_many(function, [args])[0]
+
+    def resolve_many(self, function, args_list):
+        if function == 'ImageId':
+            found = self._image_ids({args['Name'] for args in args_list})
+            keys = [args['Name'] for args in args_list]
+        elif function == 'SubnetId':
+            found = self._subnet_ids({args['NetworkZone'] for args in args_list})
+            keys = [args['NetworkZone'] for args in args_list]
+        else:
+            raise LookupError(f"Unsupported pipeline function {PIPELINE_PREFIX}{function}")
+        missing = sorted(set(keys) - set(found))
+        if missing:
+            raise LookupError(f"{PIPELINE_PREFIX}{function} found nothing for {missing}")
+        return [found[key] for key in keys]
+
+    def _image_ids(self, names):
+        response = self.ec2.describe_images(Owners=self.owners, Filters=[{'Name': 'name', 'Values': sorted(names)}])
+        newest = {}
+        for image in response['Images']:
+            current = newest.get(image['Name'])
+            if current is None or image['CreationDate'] > current['CreationDate']:
+                newest[image['Name']] = image
+        return {name: image['ImageId'] for name, image in newest.items()}
+
+    def _subnet_ids(self, zones):
+        tag = f"tag:{self.network_zone_tag}"
+        found = {}
+        paginator = self.ec2.get_paginator('describe_subnets')
+        for page in paginator.paginate(Filters=[{'Name': tag, 'Values': sorted(zones)}]):
+            for subnet in sorted(page['Subnets'], key=lambda subnet: subnet['SubnetId']):
+                tags = {t['Key']: t['Value'] for t in subnet.get('Tags', [])}
+                found.setdefault(tags.get(self.network_zone_tag), subnet['SubnetId'])
+        return found
+
+
+class CachedResolver:
+    """Remembers every answer of the wrapped resolver, so repeated lookups across components are free."""
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.hits = 0
+        self.misses = 0
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, function, args):
+        return self.resolve_many(function, [args])[0]
+
+    def resolve_many(self, function, args_list):
+        keys = [(function, _lookup_key(args)) for args in args_list]
+        with self._lock:
+            pending = {}
+            for key, args in zip(keys, args_list):
+                if key in self._values or key in pending:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    pending[key] = args
+        if pending:
+            if hasattr(self.resolver, 'resolve_many'):
+                values = self.resolver.resolve_many(function, list(pending.values()))
+            else:
+                values = [self.resolver.resolve(function, args) for args in pending.values()]
+            with self._lock:
+                self._values.update(zip(pending, values))
+        with self._lock:
+            return [self._values[key] for key in keys]
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._values)}
+
+
+def resolve_pipeline(tree, resolver):
+    """Replaces every Fn::Pipeline::* block of tree in place with its resolved value; returns tree."""
+    by_function = {}
+    for lookup in collect_lookups(tree):
+        by_function.setdefault(lookup[2], []).append(lookup)
+    for function, lookups in by_function.items():
+        args_list = [args for _, _, _, args in lookups]
+        if hasattr(resolver, 'resolve_many'):
+            values = resolver.resolve_many(function, args_list)
+        else:
+            values = [resolver.resolve(function, args) for args in args_list]
+        for (container, key, _, _), value in zip(lookups, values):
+            container[key] = value
+    return tree
+
+
+class Pipeline:
+    """Render -> parse -> resolve for components, with one renderer and one cached resolver for all of them."""
+
+    def __init__(self, search_path=".", resolver=None, cache_dir=None, loader=CloudFormationLoader):
+        self.renderer = Renderer(search_path, cache_dir)
+        self.resolver = CachedResolver(resolver if resolver is not None else EC2Resolver())
+        self.loader = loader
+
+    def parse(self, template_name, vars_data):
+        """The rendered component as a tree, without resolving anything."""
+        return yaml.load(self.renderer.render(template_name, vars_data), Loader=self.loader)
+
+    def expand(self, template_name, vars_data):
+        return resolve_pipeline(self.parse(template_name, vars_data), self.resolver)
+
+    def expand_file(self, template_name, vars_path):
+        return self.expand(template_name, load_vars(vars_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a component and resolve its Fn::Pipeline lookups.")
+    parser.add_argument('template')
+    parser.add_argument('--vars', required=True, dest='vars_path')
+    parser.add_argument('--search-path', default='.')
+    parser.add_argument('--stub', action='store_true', help="resolve with StubResolver instead of EC2")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(args.search_path, resolver=StubResolver() if args.stub else None)
+    pprint.pprint(pipeline.expand_file(args.template, args.vars_path), sort_dicts=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+"""Renders Jinja2 component templates against environment vars files.
+
+    python renderer.py component.yaml --vars envs/*.yaml --output-dir rendered --cache-dir .jinja_cache
+
+Each template is compiled once per process and, with a cache directory, once
+across processes and runs through Jinja2's on-disk bytecode cache. A matrix of
+templates x vars files is spread over a process pool; every render is streamed
+straight to its output file.
+
+With --incremental, a manifest in the output directory records for every
+output the hashes of its template, of the templates it includes, extends or
+imports, and of the vars keys the render actually read. Outputs whose
+recorded inputs are unchanged are not rendered again.
+"""
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
+
+from iac_test_framework.validators.atomic_file import atomic_write
+
+MANIFEST_NAME = '.render-manifest.json'
+# Recorded in place of key names when a template iterates over the whole of vars.
+ALL_VARS = '*'
+
+
+def load_vars(vars_path):
+    """Variables from a vars file, with the entries of _defaults moved to the top level."""
+    with open(vars_path, 'r') as vars_file:
+        vars_data = yaml.safe_load(vars_file) or {}
+    if "_defaults" in vars_data:
+        for key, value in vars_data["_defaults"].items():
+            vars_data[key] = value
+    return vars_data
+
+
+def _hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+
+def vars_fingerprint(vars_data, keys):
+    """Hash per key of the vars a render read; None stands for a key that was absent."""
+    return {key: _hash(vars_data) if key == ALL_VARS else (_hash(vars_data[key]) if key in vars_data else None)
+            for key in keys}
+
+
+class RecordingVars(dict):
+    """The vars dict handed to templates, remembering which keys they looked up."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.keys_read = set()
+
+    def __getitem__(self, key):
+        self.keys_read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.keys_read.add(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self.keys_read.add(key)
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self.keys_read.add(ALL_VARS)
+        return super().__iter__()
+
+    def keys(self):
+        self.keys_read.add(ALL_VARS)
+        return super().keys()
+
+    def values(self):
+        self.keys_read.add(ALL_VARS)
+        return super().values()
+
+    def items(self):
+        self.keys_read.add(ALL_VARS)
+        return super().items()
+
+    def __len__(self):
+        self.keys_read.add(ALL_VARS)
+        return super().__len__()
+
+
+class Renderer:
+    """One Jinja2 environment over search_path; templates are compiled on first use and kept."""
+
+    def __init__(self, search_path=".", cache_dir=None):
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        self.env = Environment(loader=FileSystemLoader(search_path), trim_blocks=True, lstrip_blocks=True,
+                               bytecode_cache=bytecode_cache)
+        self._dependencies = {}
+
+    def render(self, template_name, vars_data):
+        return self.env.get_template(template_name).render(vars=vars_data)
+
+    def render_to(self, template_name, vars_data, output_path):
+        """Streams the rendered template into output_path, replacing it only once rendering succeeded."""
+        template = self.env.get_template(template_name)
+        output_dir = os.path.dirname(output_path) or "."
+        os.makedirs(output_dir, exist_ok=True)
+        with atomic_write(output_path) as output_file:
+            template.stream(vars=vars_data).dump(output_file)
+        return output_path
+
+    def dependencies(self, template_name):
+        """sha256 of template_name and of every template it includes, extends or imports, by name.
+
+        Returns None when a dependency is computed at render time, since it
+        cannot be known without rendering.
+        """
+        if template_name not in self._dependencies:
+            hashes = {}
+            pending = [template_name]
+            while pending and hashes is not None:
+                name = pending.pop()
+                if name in hashes:
+                    continue
+                source = self.env.loader.get_source(self.env, name)[0]
+                hashes[name] = hashlib.sha256(source.encode('utf-8')).hexdigest()
+                for referenced in meta.find_referenced_templates(self.env.parse(source)):
+                    if referenced is None:
+                        hashes = None
+                        break
+                    pending.append(referenced)
+            self._dependencies[template_name] = hashes
+        return self._dependencies[template_name]
+
+    def is_current(self, entry, template_name, vars_data, output_path):
+        """Whether a manifest entry still describes output_path for these inputs."""
+        return (entry is not None and os.path.exists(output_path)
+                and entry['templates'] is not None and entry['templates'] == self.dependencies(template_name)
+                and entry['vars'] == vars_fingerprint(vars_data, entry['vars']))
+
+    def render_incremental(self, template_name, vars_data, output_path, entry=None):
+        """Renders unless entry shows the inputs are unchanged; returns (manifest entry, rendered)."""
+        if self.is_current(entry, template_name, vars_data, output_path):
+            return entry, False
+        recording = RecordingVars(vars_data)
+        self.render_to(template_name, recording, output_path)
+        return {'templates': self.dependencies(template_name),
+                'vars': vars_fingerprint(vars_data, sorted(recording.keys_read, key=str))}, True
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    os.makedirs(output_dir, exist_ok=True)
+    with atomic_write(os.path.join(output_dir, MANIFEST_NAME)) as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+
+
+def output_path_for(output_dir, template_name, vars_path):
+    """rendered/<vars dir>/<vars file stem>/<template name>, e.g. rendered/envs/prod/component.yaml.
+
+    The vars file's directory is kept so envs/a/prod.yaml and envs/b/prod.yaml
+    do not write, and record in the manifest, the same output.
+    """
+    vars_dir, vars_name = os.path.split(os.path.normpath(vars_path))
+    stem = os.path.splitext(vars_name)[0]
+    return os.path.join(output_dir, os.path.basename(vars_dir), stem, template_name)
+
+
+# Per-process renderer, created once by _init_worker so each worker compiles each template once.
+_worker_renderer = None
+
+
+def _init_worker(search_path, cache_dir):
+    global _worker_renderer
+    _worker_renderer = Renderer(search_path, cache_dir)
+
+
+def _render_vars_file(task):
+    """[(output path, manifest entry or None, rendered)] for one vars file."""
+    vars_path, template_names, output_dir, entries = task
+    vars_data = load_vars(vars_path)
+    results = []
+    for name in template_names:
+        output_path = output_path_for(output_dir, name, vars_path)
+        if entries is None:
+            results.append((_worker_renderer.render_to(name, vars_data, output_path), None, True))
+        else:
+            entry, rendered = _worker_renderer.render_incremental(name, vars_data, output_path, entries.get(output_path))
+            results.append((output_path, entry, rendered))
+    return results
+
+
+def _collect(results, manifest):
+    rendered_paths = []
+    for results_of_file in results:
+        for output_path, entry, rendered in results_of_file:
+            if manifest is not None:
+                manifest[output_path] = entry
+            if rendered:
+                rendered_paths.append(output_path)
+    return rendered_paths
+
+
+def render_matrix(template_names, vars_paths, output_dir, search_path=".", cache_dir=None, workers=None,
+                  incremental=False):
+    """Renders every template against every vars file and returns the paths it wrote.
+
+    Work is split per vars file, so each file is read once. workers=1 renders
+    in this process; otherwise a process pool of workers (default: CPU count)
+    is used. With incremental, outputs whose manifest entry is still current
+    are skipped and the manifest is updated afterwards.
+    """
+    template_names = list(template_names)
+    manifest = load_manifest(output_dir) if incremental else None
+    tasks = []
+    for vars_path in vars_paths:
+        entries = None
+        if manifest is not None:
+            entries = {path: manifest[path] for path in
+                       (output_path_for(output_dir, name, vars_path) for name in template_names) if path in manifest}
+        tasks.append((vars_path, template_names, output_dir, entries))
+
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(search_path, cache_dir)
+        rendered_paths = _collect(map(_render_vars_file, tasks), manifest)
+    else:
+        rendered_paths = _render_in_pool(tasks, template_names, manifest, search_path, cache_dir, workers)
+    if manifest is not None:
+        save_manifest(output_dir, manifest)
+    return rendered_paths
+
+
+def _render_in_pool(tasks, template_names, manifest, search_path, cache_dir, workers):
+    # Warm the bytecode cache once so the workers load compiled templates instead of each compiling them.
+    if cache_dir:
+        renderer = Renderer(search_path, cache_dir)
+        for name in template_names:
+            renderer.env.get_template(name)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(search_path, cache_dir)) as executor:
+        return _collect(executor.map(_render_vars_file, tasks, chunksize=chunksize), manifest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render component templates against vars files.")
+    parser.add_argument('templates', nargs='+', help="template names relative to --search-path")
+    parser.add_argument('--vars', nargs='+', required=True, dest='vars_paths', help="vars files")
+    parser.add_argument('--output-dir', default='rendered')
+    parser.add_argument('--search-path', default='.')
+    parser.add_argument('--cache-dir', default=os.environ.get('IAC_JINJA_CACHE_DIR'),
+                        help="Jinja2 bytecode cache directory (default: $IAC_JINJA_CACHE_DIR)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"skip outputs whose inputs are unchanged since the last run ({MANIFEST_NAME})")
+    args = parser.parse_args()
+
+    outputs = render_matrix(args.templates, args.vars_paths, args.output_dir, args.search_path,
+                            args.cache_dir, args.workers, args.incremental)
+    total = len(args.templates) * len(args.vars_paths)
+    print(f"Rendered {len(outputs)} files into {args.output_dir} ({total - len(outputs)} unchanged)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import enum
+
+
+class Status(enum.Enum):
+    """Normalized test status; the value doubles as the CSS class of a result row."""
+    PASS = "pass"
+    FAIL = "fail"
+    SKIP = "skip"
+    UNKNOWN = ""
+
+    @classmethod
+    def of(cls, status):
+        """Status for a raw status string such as Pass, passed or PASSED."""
+        return _ALIASES.get(status.strip().lower(), cls.UNKNOWN)
+
+
+_ALIASES = {"pass": Status.PASS, "passed": Status.PASS,
+            "fail": Status.FAIL, "failed": Status.FAIL,
+            "skip": Status.SKIP, "skipped": Status.SKIP}
+
+
+def execution_time(test):
+    """Seconds from a test's execution_time, 0.0 when it is missing or not a number (e.g. N/A)."""
+    try:
+        return float(test.get("execution_time"))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Counts:
+    """Pass/fail/skip tallies and total execution time of a group of tests."""
+
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.total = 0
+        self.duration = 0.0
+
+    def add(self, status, duration=0.0):
+        if status is Status.PASS:
+            self.passed += 1
+        elif status is Status.FAIL:
+            self.failed += 1
+        elif status is Status.SKIP:
+            self.skipped += 1
+        self.total += 1
+        self.duration += duration
+
+    def merge(self, other):
+        self.passed += other.passed
+        self.failed += other.failed
+        self.skipped += other.skipped
+        self.total += other.total
+        self.duration += other.duration
+
+    def __repr__(self):
+        return (f"Counts(passed={self.passed}, failed={self.failed}, skipped={self.skipped}, "
+                f"total={self.total}, duration={self.duration:.2f})")
+
+
+class ReportResults:
+    """Per-version, per-suite and overall Counts of a report, computed in one pass over the tests.
+
+    Versions are keyed by (suite name, index of the version), the same index
+    the reports use in their section IDs. total counts every test, including
+    those whose status is neither pass, fail nor skip.
+    """
+
+    def __init__(self):
+        self.overall = Counts()
+        self.suites = {}
+        self.versions = {}
+
+    def add_version(self, suite_name, index, test_results):
+        counts = Counts()
+        for test in test_results:
+            counts.add(Status.of(test["status"]), execution_time(test))
+        self.versions[(suite_name, index)] = counts
+        self.suites.setdefault(suite_name, Counts()).merge(counts)
+        self.overall.merge(counts)
+        return counts
+
+    def version(self, suite_name, index):
+        return self.versions[(suite_name, index)]
+
+    @classmethod
+    def from_suites(cls, test_suites):
+        """From {suite name: [(version, test_results), ...]}, as sextendthtml, test_2, test_3 and gtx take."""
+        results = cls()
+        for suite_name, versions in test_suites.items():
+            for index, (_, test_results) in enumerate(versions):
+                results.add_version(suite_name, index, test_results)
+        return results
+
+    @classmethod
+    def from_sets(cls, test_result_sets):
+        """From [(set name, version, test_results), ...], as html_report takes; index is the position in the list."""
+        results = cls()
+        for index, (set_name, _, test_results) in enumerate(test_result_sets):
+            results.add_version(set_name, index, test_results)
+        return results
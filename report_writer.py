@@ -0,0 +1,39 @@
+import contextlib
+
+from iac_test_framework.validators.atomic_file import atomic_write
+
+# Bytes buffered before the sink is written to; rows are small, so this batches hundreds of them per write.
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class ReportWriter:
+    """Writes a report to a file-like sink piece by piece instead of building the page as one string.
+
+    Memory stays bounded by the sink's buffer whatever the number of tests,
+    and every piece is written once, so time is linear in the report size.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def write(self, *parts):
+        for part in parts:
+            self.sink.write(part)
+
+    def write_rows(self, items, render_row):
+        """Writes render_row(item) for every item, without collecting the rows first."""
+        write = self.sink.write
+        for item in items:
+            write(render_row(item))
+
+
+@contextlib.contextmanager
+def open_report(output_file, buffer_size=DEFAULT_BUFFER_SIZE):
+    """ReportWriter over output_file, written through a buffer of buffer_size bytes.
+
+    The report is streamed into a temporary file next to output_file, which
+    replaces it only once the report is complete, so a failure part way
+    through leaves any previous report in place rather than a truncated one.
+    """
+    with atomic_write(output_file, "w", encoding="utf-8", buffering=buffer_size) as sink:
+        yield ReportWriter(sink)
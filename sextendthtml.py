@@ -1,6 +1,9 @@
 import os
 import datetime
 
+from report_results import ReportResults, Status
+from report_writer import open_report
+
 
 def generate_html_report(test_suites, report_title="QA Test Report", output_file="qa_test_report.html"):
     """
@@ -11,22 +14,15 @@ def generate_html_report(test_suites, report_title="QA Test Report", output_file
     """
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Current date: 2025-03-18
 
+    results = ReportResults.from_suites(test_suites)
+
     def get_status_class(status):
-        return {"pass": "pass", "fail": "fail", "skip": "skip"}.get(status.lower(), "")
+        return Status.of(status).value
 
     def generate_sidebar():
         """Generates the collapsible sidebar for test suites with circles aligned in a straight line."""
-        total_cases = 0
-        passed = 0
-        failed = 0
-        skipped = 0
-
-        for suite_name, versions in test_suites.items():
-            for version, test_results in versions:
-                total_cases += len(test_results)
-                passed += sum(1 for test in test_results if test["status"].lower() == "pass")
-                failed += sum(1 for test in test_results if test["status"].lower() == "fail")
-                skipped += sum(1 for test in test_results if test["status"].lower() == "skip")
+        overall = results.overall
+        total_cases, passed, failed, skipped = overall.total, overall.passed, overall.failed, overall.skipped
         side_content = f"""
             <div style="text-align:center; padding-left: 20px;">
                 <span style="background-color: green; display: inline-block; width: 15px; height: 15px; border-radius: 50%; margin-right: 5px;"></span> Pass: {passed} / {total_cases} 
@@ -36,9 +32,21 @@ def generate_html_report(test_suites, report_title="QA Test Report", output_file
         """
         return side_content
 
-    def generate_test_table(test_results):
-        """Generates an HTML table for test results."""
-        return """
+    def render_test_row(test):
+        return f"""
+            <tr class='{get_status_class(test['status'])}'>
+                <td>{test['test_name']}</td>
+                <td>{test['status']}</td>
+                <td>{test.get('execution_time', 'N/A')}</td>
+                <td>{test['expected_results']}</td>
+                <td>{test['actual_results']}</td>
+                <td>{test['remarks']}</td>
+            </tr>
+            """
+
+    def write_test_table(out, test_results):
+        """Writes the HTML table for test results, one row at a time."""
+        out.write("""
         <table>
             <tr style="background-color: #4CAF50; color: white;">
                 <th>Test Name</th>
@@ -48,27 +56,15 @@ def generate_html_report(test_suites, report_title="QA Test Report", output_file
                 <th>Actual</th>
                 <th>Remarks</th>
             </tr>
-            {}
+            """)
+        out.write_rows(test_results, render_test_row)  # for test in sorted(test_results, key=lambda x: x['test_name'])
+        out.write("""
         </table>
-        """.format("".join(
-            f"""
-            <tr class='{get_status_class(test['status'])}'>
-                <td>{test['test_name']}</td>
-                <td>{test['status']}</td>
-                <td>{test.get('execution_time', 'N/A')}</td>
-                <td>{test['expected_results']}</td>
-                <td>{test['actual_results']}</td>
-                <td>{test['remarks']}</td>
-            </tr>
-            """ for test in test_results # for test in sorted(test_results, key=lambda x: x['test_name'])
-        ))
+        """)
 
-    def generate_test_suite_summary(test_results):
+    def generate_test_suite_summary(counts):
         """Generates the summary of pass/fail/skip for a test suite."""
-        total = len(test_results)
-        passed = sum(1 for test in test_results if test["status"].lower() == "pass")
-        failed = sum(1 for test in test_results if test["status"].lower() == "fail")
-        skipped = sum(1 for test in test_results if test["status"].lower() == "skip")
+        total, passed, failed, skipped = counts.total, counts.passed, counts.failed, counts.skipped
 
         return f"""
         <div style="text-align:left;">
@@ -78,22 +74,22 @@ def generate_html_report(test_suites, report_title="QA Test Report", output_file
         </div>
         """
 
-    def generate_test_sections():
-        """Generates test sections dynamically."""
-        sections = []
+    def write_test_sections(out):
+        """Writes test sections dynamically."""
         for suite_name, versions in test_suites.items():
             suite_id = suite_name.replace(" ", "_").lower()
             for i, (version, test_results) in enumerate(versions):
-                sections.append(f"""
+                out.write(f"""
                 <div id='report_{suite_id}_{i}' class='report-section hidden'>
                     <h3><u>{suite_name} - Version {version}</u></h3>
-                    {generate_test_suite_summary(test_results)}
-                    {generate_test_table(test_results)}
+                    {generate_test_suite_summary(results.version(suite_name, i))}
+                    """)
+                write_test_table(out, test_results)
+                out.write("""
                 </div>
                 """)
-        return "".join(sections)
 
-    html_template = f"""
+    html_head = f"""
         <!DOCTYPE html>
         <html lang="en">
         <head>
@@ -116,14 +112,16 @@ def generate_html_report(test_suites, report_title="QA Test Report", output_file
                 <h2 align="center">{report_title}</h2>
                 <p align="center">Generated on: {timestamp}</p>
                 {generate_sidebar()}
-                {generate_test_sections()}
+                """
+
+    with open_report(output_file) as out:
+        out.write(html_head)
+        write_test_sections(out)
+        out.write("""
             </div>
         </body>
         </html>
-        """
-
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write(html_template)
+        """)
 
     print(f"Report generated successfully: {output_file}")
 
@@ -153,4 +151,5 @@ test_suites = {
 }
 
 # Generate the report
-generate_html_report(test_suites, report_title="QA Test Report", output_file="qa_test_report.html")
+if __name__ == '__main__':
+    generate_html_report(test_suites, report_title="QA Test Report", output_file="qa_test_report.html")
@@ -5,23 +5,23 @@ import string
 import html
 
 
+from report_results import ReportResults, Status
+from report_writer import open_report
+
 def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output_file="qa_test_report.html",
                          runner_version="v1.0"):
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    results = ReportResults.from_suites(test_suites)
+
     def get_status_class(status):
-        return {"passed": "pass", "failed": "fail", "skipped": "skip"}.get(status.lower(), "")
+        return Status.of(status).value
 
-    def generate_sidebar():
-        total_cases = passed = failed = skipped = 0
-        for versions in test_suites.values():
-            for _, test_results in versions:
-                total_cases += len(test_results)
-                passed += sum(1 for t in test_results if t["status"].lower() == "passed")
-                failed += sum(1 for t in test_results if t["status"].lower() == "failed")
-                skipped += sum(1 for t in test_results if t["status"].lower() == "skipped")
+    def write_sidebar(out):
+        overall = results.overall
+        total_cases, passed, failed, skipped = overall.total, overall.passed, overall.failed, overall.skipped
 
-        sidebar = f"""
+        out.write(f"""
         <div class="sidebar">
             <h3 style="text-align:center; color: white;">Test Suites</h3>
             <div class="summary-circles" style="text-align:left; padding-left: 20px; color: white">
@@ -31,19 +31,18 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
                 <span class="smcircle skip" onclick="filterByStatus('skip')"><center>Skip: {skipped}</center></span>
             </div>
             <ul class="suite-list">
-        """
+        """)
         for suite_name, versions in test_suites.items():
             suite_id = suite_name.replace(" ", "_").lower()
-            sidebar += f"""
+            out.write(f"""
             <li>
                 <span class="suite-header" onclick="toggleSuite('{suite_id}')">{suite_name}</span>
                 <ul id="{suite_id}" class="suite-items hidden">
-            """
+            """)
             for i, (version, _) in enumerate(versions):
-                sidebar += f"<li><a href='#' onclick='showReport(\"report_{suite_id}_{i}\")'>{suite_name} - v{version}</a></li>"
-            sidebar += "</ul></li>"
-        sidebar += "</ul></div>"
-        return sidebar
+                out.write(f"<li><a href='#' onclick='showReport(\"report_{suite_id}_{i}\")'>{suite_name} - v{version}</a></li>")
+            out.write("</ul></li>")
+        out.write("</ul></div>")
 
     def format_results(results):
         if results:
@@ -61,24 +60,19 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
     def get_random_id():
         return ''.join(random.choices(string.ascii_letters + string.digits, k=8))
 
-    def generate_test_table(test_results):
-        def get_random_id():
-            return ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-
-        rows = ""
-        test_no = 1
-        for test in test_results:
-            remarks = test['remarks']
-            if len(remarks) > 25:
-                popup_id = get_random_id()
-                short_text = html.escape(remarks[:25]) + "..."
-                full_text = html.escape(remarks).replace('\n', '<br>')
-                link = f"<a href='#' onclick=\"showLogDialog('{popup_id}')\">view log</a>"
-                remarks_html = f"{short_text} {link}<div id='{popup_id}' class='modal hidden'><div class='modal-content'><span class='close' onclick='closeLogDialog(\"{popup_id}\")'>&times;</span><pre>{full_text}</pre></div></div>"
-            else:
-                remarks_html = html.escape(remarks)
+    def render_test_row(numbered_test):
+        test_no, test = numbered_test
+        remarks = test['remarks']
+        if len(remarks) > 25:
+            popup_id = get_random_id()
+            short_text = html.escape(remarks[:25]) + "..."
+            full_text = html.escape(remarks).replace('\n', '<br>')
+            link = f"<a href='#' onclick=\"showLogDialog('{popup_id}')\">view log</a>"
+            remarks_html = f"{short_text} {link}<div id='{popup_id}' class='modal hidden'><div class='modal-content'><span class='close' onclick='closeLogDialog(\"{popup_id}\")'>&times;</span><pre>{full_text}</pre></div></div>"
+        else:
+            remarks_html = html.escape(remarks)
 
-            rows += f"""
+        return f"""
             <tr class='{get_status_class(test['status'])}'>
                 <td style="width: 3%">{str(test_no)}</td>
                 <td style="width: 20%">{test['test_name']}</td>
@@ -88,8 +82,9 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
                 <td style="width: 20%">{remarks_html}</td>
             </tr>
             """
-            test_no += 1
-        return f"""
+
+    def write_test_table(out, test_results):
+        out.write("""
         <table>
             <tr class="table-header">
                 <th style="width: 3%">Tno</th>
@@ -99,15 +94,14 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
                 <th style="width: 27%">Actual</th>
                 <th style="width: 20%">Remarks</th>
             </tr>
-            {rows}
+            """)
+        out.write_rows(enumerate(test_results, 1), render_test_row)
+        out.write("""
         </table>
-        """
+        """)
 
-    def generate_test_suite_summary(test_results, suite_block_id):
-        total = len(test_results)
-        passed = sum(1 for t in test_results if t["status"].lower() == "passed")
-        failed = sum(1 for t in test_results if t["status"].lower() == "failed")
-        skipped = sum(1 for t in test_results if t["status"].lower() == "skipped")
+    def generate_test_suite_summary(counts, suite_block_id):
+        total, passed, failed, skipped = counts.total, counts.passed, counts.failed, counts.skipped
 
         return f"""
         <div class="summary-circles" data-suite="{suite_block_id}">
@@ -118,22 +112,22 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
         </div>
         """
 
-    def generate_test_sections():
-        sections = []
+    def write_test_sections(out):
         for suite_name, versions in test_suites.items():
             suite_id = suite_name.replace(" ", "_").lower()
             for i, (version, test_results) in enumerate(versions):
                 block_id = f"report_{suite_id}_{i}"
-                sections.append(f"""
+                out.write(f"""
                 <div id="{block_id}" class="report-section hidden" data-statuses="{' '.join([get_status_class(t['status']) for t in test_results])}">
                     <h3><u>{suite_name} - Version {version}</u></h3>
-                    {generate_test_suite_summary(test_results, block_id)}
-                    {generate_test_table(test_results)}
+                    {generate_test_suite_summary(results.version(suite_name, i), block_id)}
+                    """)
+                write_test_table(out, test_results)
+                out.write("""
                 </div>
                 """)
-        return "".join(sections)
 
-    html_template = f"""
+    html_head = f"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -262,19 +256,23 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
         </script>
     </head>
     <body>
-        {generate_sidebar()}
+        """
+
+    with open_report(output_file) as out:
+        out.write(html_head)
+        write_sidebar(out)
+        out.write(f"""
         <div class="content">
             <h2 align="center">{report_title}</h2>
             <h3 align="center">Runner-Version: {runner_version}</h3>
             <p align="center">Generated on: {timestamp}</p>
-            {generate_test_sections()}
+            """)
+        write_test_sections(out)
+        out.write("""
         </div>
     </body>
     </html>
-    """
-
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write(html_template)
+    """)
 
     print(f"✅ Enhanced report generated: {output_file}")
 
@@ -308,4 +306,5 @@ test_suites = {
 }
 
 # Generate the report
-generate_html_report(test_suites)
+if __name__ == '__main__':
+    generate_html_report(test_suites)
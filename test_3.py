@@ -2,22 +2,22 @@ import os
 import datetime
 
 
+from report_results import ReportResults, Status
+from report_writer import open_report
+
 def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output_file="qa_test_report.html", runner_version="v1.0"):
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    results = ReportResults.from_suites(test_suites)
+
     def get_status_class(status):
-        return {"passed": "pass", "failed": "fail", "skipped": "skip"}.get(status.lower(), "")
-
-    def generate_sidebar():
-        total_cases = passed = failed = skipped = 0
-        for versions in test_suites.values():
-            for _, test_results in versions:
-                total_cases += len(test_results)
-                passed += sum(1 for t in test_results if t["status"].lower() == "passed")
-                failed += sum(1 for t in test_results if t["status"].lower() == "failed")
-                skipped += sum(1 for t in test_results if t["status"].lower() == "skipped")
-
-        sidebar = f"""
+        return Status.of(status).value
+
+    def write_sidebar(out):
+        overall = results.overall
+        total_cases, passed, failed, skipped = overall.total, overall.passed, overall.failed, overall.skipped
+
+        out.write(f"""
         <div class="sidebar">
             <h3 style="text-align:center; color: white;">Test Suites</h3>
             <div class="summary-circles" style="text-align:left; padding-left: 20px; color: white">
@@ -27,19 +27,18 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
                 <span class="smcircle skip" onclick="filterByStatus('skip')"><center>Skip: {skipped}</center></span>
             </div>
             <ul class="suite-list">
-        """
+        """)
         for suite_name, versions in test_suites.items():
             suite_id = suite_name.replace(" ", "_").lower()
-            sidebar += f"""
+            out.write(f"""
             <li>
                 <span class="suite-header" onclick="toggleSuite('{suite_id}')">{suite_name}</span>
                 <ul id="{suite_id}" class="suite-items hidden">
-            """
+            """)
             for i, (version, _) in enumerate(versions):
-                sidebar += f"<li><a href='#' onclick='showReport(\"report_{suite_id}_{i}\")'>{suite_name} - v{version}</a></li>"
-            sidebar += "</ul></li>"
-        sidebar += "</ul></div>"
-        return sidebar
+                out.write(f"<li><a href='#' onclick='showReport(\"report_{suite_id}_{i}\")'>{suite_name} - v{version}</a></li>")
+            out.write("</ul></li>")
+        out.write("</ul></div>")
 
     def format_results(results):
         if results:
@@ -54,8 +53,19 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
         else:
             return ''
 
-    def generate_test_table(test_results):
-        return """
+    def render_test_row(test):
+        return f"""
+            <tr class='{get_status_class(test['status'])}'>
+                <td style="width: 20%">{test['test_name']}</td>
+                <td style="width: 10%"><b>{test['status']}</b></td>
+                <td style="width: 25%">{test['expected_results']}</td>
+                <td style="width: 30%">{test['actual_results']}</td>
+                <td style="width: 20%">{test['remarks']}</td>
+            </tr>
+            """
+
+    def write_test_table(out, test_results):
+        out.write("""
         <table>
             <tr class="table-header">
                 <th style="width: 20%">Test Name</th>
@@ -64,25 +74,14 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
                 <th style="width: 30%">Actual</th>
                 <th style="width: 20%">Remarks</th>
             </tr>
-            {}
+            """)
+        out.write_rows(test_results, render_test_row)  # for test in sorted(test_results, key=lambda x: x['test_name'])
+        out.write("""
         </table>
-        """.format("".join(
-            f"""
-            <tr class='{get_status_class(test['status'])}'>
-                <td style="width: 20%">{test['test_name']}</td>
-                <td style="width: 10%"><b>{test['status']}</b></td>
-                <td style="width: 25%">{test['expected_results']}</td>
-                <td style="width: 30%">{test['actual_results']}</td>
-                <td style="width: 20%">{test['remarks']}</td>
-            </tr>
-            """ for test in test_results  # for test in sorted(test_results, key=lambda x: x['test_name'])
-        ))
+        """)
 
-    def generate_test_suite_summary(test_results, suite_block_id):
-        total = len(test_results)
-        passed = sum(1 for t in test_results if t["status"].lower() == "passed")
-        failed = sum(1 for t in test_results if t["status"].lower() == "failed")
-        skipped = sum(1 for t in test_results if t["status"].lower() == "skipped")
+    def generate_test_suite_summary(counts, suite_block_id):
+        total, passed, failed, skipped = counts.total, counts.passed, counts.failed, counts.skipped
 
         return f"""
         <div class="summary-circles" data-suite="{suite_block_id}">
@@ -93,22 +92,22 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
         </div>
         """
 
-    def generate_test_sections():
-        sections = []
+    def write_test_sections(out):
         for suite_name, versions in test_suites.items():
             suite_id = suite_name.replace(" ", "_").lower()
             for i, (version, test_results) in enumerate(versions):
                 block_id = f"report_{suite_id}_{i}"
-                sections.append(f"""
+                out.write(f"""
                 <div id="{block_id}" class="report-section hidden" data-statuses="{' '.join([get_status_class(t['status']) for t in test_results])}">
                     <h3><u>{suite_name} - Version {version}</u></h3>
-                    {generate_test_suite_summary(test_results, block_id)}
-                    {generate_test_table(test_results)}
+                    {generate_test_suite_summary(results.version(suite_name, i), block_id)}
+                    """)
+                write_test_table(out, test_results)
+                out.write("""
                 </div>
                 """)
-        return "".join(sections)
 
-    html_template = f"""
+    html_head = f"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -195,19 +194,23 @@ def generate_html_report(test_suites, report_title="AMI Test Report(QA)", output
         </script>
     </head>
     <body>
-        {generate_sidebar()}
+        """
+
+    with open_report(output_file) as out:
+        out.write(html_head)
+        write_sidebar(out)
+        out.write(f"""
         <div class="content">
             <h2 align="center">{report_title}</h2>
             <h3 align="center">Runner-Version: {runner_version}</h3>
             <p align="center">Generated on: {timestamp}</p>
-            {generate_test_sections()}
+            """)
+        write_test_sections(out)
+        out.write("""
         </div>
     </body>
     </html>
-    """
-
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write(html_template)
+    """)
 
     print(f"✅ Enhanced report generated: {output_file}")
 
@@ -237,4 +240,5 @@ test_suites = {
 }
 
 # Generate the report
-generate_html_report(test_suites)
+if __name__ == '__main__':
+    generate_html_report(test_suites)
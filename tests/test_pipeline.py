@@ -0,0 +1,94 @@
+import boto3
+from botocore.stub import Stubber
+
+from pipeline import CachedResolver, EC2Resolver, Pipeline, StubResolver, collect_lookups, resolve_pipeline
+
+COMPONENT = """Resources:
+  web:
+    Properties:
+      ImageId:
+        Fn::Pipeline::ImageId:
+          Name: {{ vars.Image }}
+      SubnetIds:
+        - Fn::Pipeline::SubnetId:
+            NetworkZone: private
+        - Fn::Pipeline::SubnetId:
+            NetworkZone: public
+      InstanceType: {{ vars.InstanceType }}
+"""
+
+
+class CountingResolver(StubResolver):
+    def __init__(self, values=None):
+        super().__init__(values)
+        self.calls = []
+
+    def resolve_many(self, function, args_list):
+        self.calls.append((function, len(args_list)))
+        return [self.resolve(function, args) for args in args_list]
+
+
+class StubbedPool:
+    def __init__(self):
+        self.ec2 = boto3.client('ec2', region_name='us-east-1',
+                                aws_access_key_id='testing', aws_secret_access_key='testing')
+
+    def client(self, service_name, region_name=None):
+        return self.ec2
+
+
+def test_collect_lookups_in_document_order():
+    tree = {'a': {'Fn::Pipeline::ImageId': {'Name': 'x'}},
+            'b': [{'Fn::Pipeline::SubnetId': {'NetworkZone': 'private'}}, {'Ref': 'Vpc'}]}
+    assert [(key, function, args) for _, key, function, args in collect_lookups(tree)] == [
+        ('a', 'ImageId', {'Name': 'x'}), (0, 'SubnetId', {'NetworkZone': 'private'})]
+
+
+def test_resolve_pipeline_replaces_blocks_with_one_call_per_function():
+    resolver = CountingResolver({'SubnetId': {'private': 'subnet-1', 'public': 'subnet-2'}})
+    tree = {'Image': {'Fn::Pipeline::ImageId': {'Name': 'x'}},
+            'Subnets': [{'Fn::Pipeline::SubnetId': {'NetworkZone': 'private'}},
+                        {'Fn::Pipeline::SubnetId': {'NetworkZone': 'public'}}]}
+    assert resolve_pipeline(tree, resolver) is tree
+    assert tree['Subnets'] == ['subnet-1', 'subnet-2']
+    assert tree['Image'].startswith('ami-')
+    assert sorted(resolver.calls) == [('ImageId', 1), ('SubnetId', 2)]
+
+
+def test_pipeline_shares_lookups_across_components(tmp_path):
+    (tmp_path / 'component.yaml').write_text(COMPONENT)
+    resolver = CountingResolver({'ImageId': {'amazon-linux-2': 'ami-1'}})
+    pipeline = Pipeline(str(tmp_path), resolver=resolver)
+    first = pipeline.expand('component.yaml', {'Image': 'amazon-linux-2', 'InstanceType': 't3.small'})
+    second = pipeline.expand('component.yaml', {'Image': 'amazon-linux-2', 'InstanceType': 't3.large'})
+    assert first['Resources']['web']['Properties']['ImageId'] == 'ami-1'
+    assert second['Resources']['web']['Properties']['InstanceType'] == 't3.large'
+    assert first['Resources']['web']['Properties']['SubnetIds'] == second['Resources']['web']['Properties']['SubnetIds']
+    assert len(resolver.calls) == 2
+    assert pipeline.resolver.stats() == {'hits': 3, 'misses': 3, 'entries': 3}
+
+
+def test_cached_resolver_asks_once_per_distinct_lookup():
+    resolver = CountingResolver()
+    cached = CachedResolver(resolver)
+    values = cached.resolve_many('ImageId', [{'Name': 'a'}, {'Name': 'b'}, {'Name': 'a'}])
+    assert values[0] == values[2] != values[1]
+    assert cached.resolve('ImageId', {'Name': 'b'}) == values[1]
+    assert resolver.calls == [('ImageId', 2)]
+
+
+def test_ec2_resolver_picks_the_newest_image_and_tagged_subnet():
+    pool = StubbedPool()
+    resolver = EC2Resolver(pool=pool)
+    with Stubber(pool.ec2) as stubber:
+        stubber.add_response('describe_images', {'Images': [
+            {'Name': 'al2', 'ImageId': 'ami-old', 'CreationDate': '2023-01-01T00:00:00.000Z'},
+            {'Name': 'al2', 'ImageId': 'ami-new', 'CreationDate': '2024-01-01T00:00:00.000Z'}]},
+            {'Owners': ['self', 'amazon'], 'Filters': [{'Name': 'name', 'Values': ['al2']}]})
+        stubber.add_response('describe_subnets', {'Subnets': [
+            {'SubnetId': 'subnet-2', 'Tags': [{'Key': 'NetworkZone', 'Value': 'private'}]},
+            {'SubnetId': 'subnet-1', 'Tags': [{'Key': 'NetworkZone', 'Value': 'private'}]}]},
+            {'Filters': [{'Name': 'tag:NetworkZone', 'Values': ['private']}]})
+        assert resolver.resolve_many('ImageId', [{'Name': 'al2'}, {'Name': 'al2'}]) == ['ami-new', 'ami-new']
+        assert resolver.resolve('SubnetId', {'NetworkZone': 'private'}) == 'subnet-1'
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from renderer import MANIFEST_NAME, load_manifest, output_path_for, render_matrix
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / 'templates').mkdir()
+    (tmp_path / 'envs').mkdir()
+    write(tmp_path / 'templates' / 'component.yaml', "Type: {{ vars.InstanceType }}\n{% include 'tags.yaml' %}\n")
+    write(tmp_path / 'templates' / 'tags.yaml', "Owner: {{ vars.Owner }}\n")
+    write(tmp_path / 'envs' / 'prod.yaml', "InstanceType: t3.large\nOwner: ops\nUnused: 1\n")
+    return tmp_path
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def render(workspace):
+    return render_matrix(['component.yaml'], [str(workspace / 'envs' / 'prod.yaml')], str(workspace / 'rendered'),
+                         search_path=str(workspace / 'templates'), workers=1, incremental=True)
+
+
+def test_output_path_keeps_the_vars_directory():
+    assert output_path_for('rendered', 'component.yaml', 'envs/prod.yaml') == os.path.join(
+        'rendered', 'envs', 'prod', 'component.yaml')
+    assert output_path_for('rendered', 'component.yaml', 'a/prod.yaml') != output_path_for(
+        'rendered', 'component.yaml', 'b/prod.yaml')
+
+
+def test_unchanged_inputs_are_skipped(workspace):
+    output_path = output_path_for(str(workspace / 'rendered'), 'component.yaml', str(workspace / 'envs' / 'prod.yaml'))
+    assert render(workspace) == [output_path]
+    with open(output_path) as output_file:
+        assert output_file.read() == "Type: t3.large\nOwner: ops"
+    entry = load_manifest(str(workspace / 'rendered'))[output_path]
+    assert sorted(entry['templates']) == ['component.yaml', 'tags.yaml']
+    assert sorted(entry['vars']) == ['InstanceType', 'Owner']
+    assert render(workspace) == []
+
+
+def test_vars_the_template_does_not_read_are_ignored(workspace):
+    render(workspace)
+    write(workspace / 'envs' / 'prod.yaml', "InstanceType: t3.large\nOwner: ops\nUnused: 2\nAdded: 3\n")
+    assert render(workspace) == []
+
+
+@pytest.mark.parametrize('path, text', [
+    ('envs/prod.yaml', "InstanceType: t3.xlarge\nOwner: ops\n"),
+    ('envs/prod.yaml', "_defaults:\n  InstanceType: t3.large\n"),
+    ('templates/tags.yaml', "Team: {{ vars.Owner }}\n"),
+    ('templates/component.yaml', "Type: {{ vars.InstanceType }}\n"),
+])
+def test_changed_inputs_are_rendered_again(workspace, path, text):
+    render(workspace)
+    write(workspace / path, text)
+    assert len(render(workspace)) == 1
+
+
+def test_missing_output_is_rendered_again(workspace):
+    (output_path,) = render(workspace)
+    os.remove(output_path)
+    assert render(workspace) == [output_path]
+    assert os.path.exists(output_path)
+
+
+def test_vars_files_sharing_a_stem_do_not_collide(workspace):
+    for env in ('a', 'b'):
+        (workspace / 'envs' / env).mkdir()
+        write(workspace / 'envs' / env / 'prod.yaml', f"InstanceType: {env}\nOwner: ops\n")
+    vars_paths = [str(workspace / 'envs' / env / 'prod.yaml') for env in ('a', 'b')]
+    rendered = render_matrix(['component.yaml'], vars_paths, str(workspace / 'rendered'),
+                             search_path=str(workspace / 'templates'), workers=1, incremental=True)
+    assert len(set(rendered)) == 2
+    assert sorted(load_manifest(str(workspace / 'rendered'))) == sorted(rendered)
+    assert [name for name in os.listdir(workspace / 'rendered') if name.endswith('.tmp')] == []
+    assert os.path.exists(workspace / 'rendered' / MANIFEST_NAME)
@@ -0,0 +1,68 @@
+import pytest
+
+from report_results import ReportResults, Status, execution_time
+
+
+def _test(status, execution_time="1.5"):
+    return {"test_name": "t", "status": status, "execution_time": execution_time}
+
+
+@pytest.mark.parametrize("raw, status", [
+    ("Pass", Status.PASS),
+    ("passed", Status.PASS),
+    ("PASSED", Status.PASS),
+    ("Failed", Status.FAIL),
+    (" skipped ", Status.SKIP),
+    ("Blocked", Status.UNKNOWN),
+    ("", Status.UNKNOWN),
+])
+def test_status_of_normalizes_spellings(raw, status):
+    assert Status.of(raw) is status
+
+
+def test_unknown_status_has_no_css_class():
+    assert Status.UNKNOWN.value == ""
+
+
+@pytest.mark.parametrize("value, seconds", [("2.25", 2.25), (3, 3.0), ("N/A", 0.0), (None, 0.0)])
+def test_execution_time(value, seconds):
+    assert execution_time({"execution_time": value}) == seconds
+
+
+def test_execution_time_missing():
+    assert execution_time({}) == 0.0
+
+
+def test_from_suites_counts_versions_suites_and_overall():
+    results = ReportResults.from_suites({
+        "EC2": [("v1", [_test("Pass"), _test("Fail", "N/A")]),
+                ("v2", [_test("passed", "2"), _test("Skipped"), _test("Blocked")])],
+        "S3": [("v1", [_test("FAILED", "0.5")])],
+    })
+
+    v1 = results.version("EC2", 0)
+    assert (v1.passed, v1.failed, v1.skipped, v1.total, v1.duration) == (1, 1, 0, 2, 1.5)
+    v2 = results.version("EC2", 1)
+    assert (v2.passed, v2.failed, v2.skipped, v2.total, v2.duration) == (1, 0, 1, 3, 5.0)
+
+    ec2 = results.suites["EC2"]
+    assert (ec2.passed, ec2.failed, ec2.skipped, ec2.total, ec2.duration) == (2, 1, 1, 5, 6.5)
+    s3 = results.suites["S3"]
+    assert (s3.passed, s3.failed, s3.skipped, s3.total, s3.duration) == (0, 1, 0, 1, 0.5)
+
+    overall = results.overall
+    assert (overall.passed, overall.failed, overall.skipped, overall.total, overall.duration) == (2, 2, 1, 6, 7.0)
+
+
+def test_from_sets_indexes_versions_by_position():
+    results = ReportResults.from_sets([
+        ("EC2", "v1", [_test("Pass")]),
+        ("S3", "v1", [_test("Fail")]),
+        ("EC2", "v2", [_test("Skip")]),
+    ])
+
+    assert results.version("EC2", 0).passed == 1
+    assert results.version("S3", 1).failed == 1
+    assert results.version("EC2", 2).skipped == 1
+    assert results.suites["EC2"].total == 2
+    assert results.overall.total == 3